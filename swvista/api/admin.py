@@ -1,7 +1,19 @@
 from django.contrib import admin
 
-from .models import Venue
+from .models import ApprovalPipeline, ApprovalStage, Venue
 
 # Register your models here.
 
+
+class ApprovalStageInline(admin.TabularInline):
+    model = ApprovalStage
+    extra = 1
+
+
+@admin.register(ApprovalPipeline)
+class ApprovalPipelineAdmin(admin.ModelAdmin):
+    list_display = ["name", "event_type", "venue", "updated_at"]
+    inlines = [ApprovalStageInline]
+
+
 admin.site.register(Venue)
@@ -0,0 +1,120 @@
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models.approval_latency import (
+    LATENCY_BUCKETS,
+    ApprovalLatencyWeekly,
+    empty_latency_histogram,
+)
+from .models.booking_approval import BookingApproval
+
+
+def week_of(moment):
+    """Local date of the Monday starting the week `moment` falls in"""
+    day = timezone.localdate(moment)
+    return day - timedelta(days=day.weekday())
+
+
+def percentile(histogram, fraction):
+    """
+    Approximate percentile in seconds of a LATENCY_BUCKETS histogram,
+    interpolated linearly within the bucket it falls in. None when empty;
+    the lower bound of the open-ended last bucket when it falls there.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = fraction * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index else 0
+            if index == len(LATENCY_BUCKETS):
+                return lower
+            return lower + (LATENCY_BUCKETS[index] - lower) * (rank - seen) / count
+        seen += count
+    return LATENCY_BUCKETS[-1]
+
+
+class LatencyDelta:
+    """Decisions to add to ApprovalLatencyWeekly, summed in memory per row"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, venue_id, role, stage, entered_at, decided_at):
+        if entered_at is None or decided_at is None:
+            return
+        seconds = max(0, round((decided_at - entered_at).total_seconds()))
+        row = self.rows.setdefault(
+            (venue_id, week_of(decided_at), role, stage),
+            {
+                "decision_count": 0,
+                "total_seconds": 0,
+                "histogram": empty_latency_histogram(),
+            },
+        )
+        row["decision_count"] += 1
+        row["total_seconds"] += seconds
+        row["histogram"][bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def save(self):
+        """Apply the changes, locking each touched row"""
+        with transaction.atomic():
+            for (venue_id, week, role, stage), change in sorted(self.rows.items()):
+                (
+                    latency,
+                    _,
+                ) = ApprovalLatencyWeekly.objects.select_for_update().get_or_create(
+                    venue_id=venue_id, week=week, approver_role=role, stage=stage
+                )
+                latency.decision_count += change["decision_count"]
+                latency.total_seconds += change["total_seconds"]
+                latency.histogram = [
+                    total + value
+                    for total, value in zip(latency.histogram, change["histogram"])
+                ]
+                latency.save()
+        self.rows.clear()
+
+
+def record_decision(venue_id, role, stage, entered_at, decided_at):
+    delta = LatencyDelta()
+    delta.add(venue_id, role, stage, entered_at, decided_at)
+    delta.save()
+
+
+def rebuild(chunk_size=2000):
+    """Recompute every ApprovalLatencyWeekly row from the approval records"""
+    delta = LatencyDelta()
+    rows = (
+        BookingApproval.objects.filter(
+            approver__isnull=False, entered_at__isnull=False, decided_at__isnull=False
+        )
+        # Records of bookings and of series alike
+        .annotate(venue_id=Coalesce("booking__venue_id", "series__venue_id"))
+        .values_list("venue_id", "approver_role", "stage", "entered_at", "decided_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    for decision in rows:
+        delta.add(*decision)
+    with transaction.atomic():
+        ApprovalLatencyWeekly.objects.all().delete()
+        ApprovalLatencyWeekly.objects.bulk_create(
+            [
+                ApprovalLatencyWeekly(
+                    venue_id=venue_id,
+                    week=week,
+                    approver_role=role,
+                    stage=stage,
+                    **change
+                )
+                for (venue_id, week, role, stage), change in sorted(delta.rows.items())
+            ],
+            batch_size=chunk_size,
+        )
+    return len(delta.rows)
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models.booking_series import BookingSeries
+from .models.venuebooking import VenueBooking
+
+STAGE_COUNTS_CACHE_KEY = "api:approval-queue:stage-counts"
+
+
+def _counts(model):
+    counts = {}
+    for approval_role, stage, count in (
+        model.objects.filter(status=model.STATUS_PENDING)
+        .values_list("approval_role", "approval_stage")
+        .annotate(count=Count("id"))
+        .order_by()
+    ):
+        counts.setdefault(approval_role, {})[stage] = count
+    return counts
+
+
+def stage_counts(role, model=VenueBooking):
+    """
+    {stage: number of pending bookings (or BookingSeries) awaiting `role`}.
+    The counts of all roles come from one GROUP BY per model over its
+    (status, approval_role, ...) queue index, cached for
+    APPROVAL_QUEUE_COUNT_TTL seconds and dropped whenever a booking or series
+    changes.
+    """
+    counts = cache.get(STAGE_COUNTS_CACHE_KEY)
+    if counts is None:
+        counts = {
+            VenueBooking._meta.label: _counts(VenueBooking),
+            BookingSeries._meta.label: _counts(BookingSeries),
+        }
+        cache.set(STAGE_COUNTS_CACHE_KEY, counts, settings.APPROVAL_QUEUE_COUNT_TTL)
+    return counts[model._meta.label].get(role, {})
+
+
+def invalidate_stage_counts():
+    cache.delete(STAGE_COUNTS_CACHE_KEY)
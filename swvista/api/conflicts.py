@@ -0,0 +1,151 @@
+from dataclasses import dataclass, field
+from itertools import groupby
+
+from .models.booking_hold import BookingHold
+from .models.booking_series import BookingSeries
+from .models.venuebooking import VenueBooking
+from .scheduling import IntervalIndex, booking_end
+
+# Keys used for entries of a busy IntervalIndex
+BOOKING = "booking"
+SERIES = "series"
+HOLD = "hold"
+
+
+@dataclass
+class Conflicts:
+    """Bookings, recurring series and holds clashing with a requested slot"""
+
+    bookings: list = field(default_factory=list)
+    series: list = field(default_factory=list)
+    holds: list = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.bookings or self.series or self.holds)
+
+    @classmethod
+    def from_keys(cls, keys):
+        keys = set(keys)
+        return cls(
+            bookings=sorted(key for kind, key in keys if kind == BOOKING),
+            series=sorted(key for kind, key in keys if kind == SERIES),
+            holds=sorted(key for kind, key in keys if kind == HOLD),
+        )
+
+    def as_dict(self):
+        return {
+            "conflicts": self.bookings,
+            "series_conflicts": self.series,
+            "hold_conflicts": self.holds,
+        }
+
+
+def find_conflicts(
+    venue,
+    start,
+    duration,
+    exclude_booking_id=None,
+    exclude_series_id=None,
+    exclude_hold_id=None,
+):
+    """Active bookings, series occurrences and live holds of `venue` overlapping the slot"""
+    end = booking_end(start, duration)
+    series = BookingSeries.objects.active().overlapping(start, end).filter(venue=venue)
+    if exclude_series_id is not None:
+        series = series.exclude(id=exclude_series_id)
+    holds = BookingHold.objects.live().overlapping(start, end).filter(venue=venue)
+    if exclude_hold_id is not None:
+        holds = holds.exclude(id=exclude_hold_id)
+    return Conflicts(
+        bookings=VenueBooking.objects.find_conflicts(
+            venue, start, duration, exclude_id=exclude_booking_id
+        ),
+        series=[item.id for item in series if item.occurrences(start, end)],
+        holds=list(holds.order_by("id").values_list("id", flat=True)),
+    )
+
+
+def busy_index(venue, start, end, exclude_series_id=None):
+    """
+    IntervalIndex of everything holding `venue` during [start, end), keyed by
+    (BOOKING, id), (SERIES, id) or (HOLD, id). Loaded with one range query
+    per kind so a whole batch of slots can be checked in memory.
+    """
+    index = IntervalIndex(
+        (booking_start, booking_stop, (BOOKING, booking_id))
+        for booking_start, booking_stop, booking_id in VenueBooking.objects.active()
+        .filter(venue=venue)
+        .overlapping(start, end)
+        .values_list("booking_date", "booking_end", "id")
+    )
+    series = BookingSeries.objects.active().overlapping(start, end).filter(venue=venue)
+    if exclude_series_id is not None:
+        series = series.exclude(id=exclude_series_id)
+    for item in series:
+        for occurrence_start, occurrence_end in item.occurrences(start, end):
+            index.add(occurrence_start, occurrence_end, (SERIES, item.id))
+    for hold_start, hold_end, hold_id in (
+        BookingHold.objects.live()
+        .filter(venue=venue)
+        .overlapping(start, end)
+        .values_list("booking_date", "booking_end", "id")
+    ):
+        index.add(hold_start, hold_end, (HOLD, hold_id))
+    return index
+
+
+def busy_intervals_by_venue(start, end, min_capacity=None):
+    """
+    Sorted (start, end) intervals held by active bookings, series
+    occurrences and live holds during [start, end), grouped by venue id.
+    Only the columns needed for the sweep are loaded.
+    """
+    bookings = VenueBooking.objects.active().overlapping(start, end)
+    series = BookingSeries.objects.active().overlapping(start, end)
+    holds = BookingHold.objects.live().overlapping(start, end)
+    if min_capacity is not None:
+        bookings = bookings.filter(venue__capacity__gte=min_capacity)
+        series = series.filter(venue__capacity__gte=min_capacity)
+        holds = holds.filter(venue__capacity__gte=min_capacity)
+
+    rows = (
+        bookings.order_by("venue_id", "booking_date")
+        # Durations are cheaper to load than a second datetime column
+        .values_list("venue_id", "booking_date", "booking_duration")
+    )
+    busy = {
+        venue_id: [(row[1], booking_end(row[1], row[2])) for row in venue_rows]
+        for venue_id, venue_rows in groupby(rows, key=lambda row: row[0])
+    }
+    changed = set()
+    for item in series:
+        busy.setdefault(item.venue_id, []).extend(item.occurrences(start, end))
+        changed.add(item.venue_id)
+    for venue_id, hold_start, hold_end in holds.values_list(
+        "venue_id", "booking_date", "booking_end"
+    ):
+        busy.setdefault(venue_id, []).append((hold_start, hold_end))
+        changed.add(venue_id)
+    for venue_id in changed:
+        busy[venue_id].sort()
+    return busy
+
+
+def busy_venue_ids(start, end):
+    """IDs of venues held by an active booking, series occurrence or live hold during [start, end)"""
+    busy = set(
+        VenueBooking.objects.active()
+        .overlapping(start, end)
+        .values_list("venue_id", flat=True)
+        .distinct()
+    )
+    busy.update(
+        BookingHold.objects.live()
+        .overlapping(start, end)
+        .values_list("venue_id", flat=True)
+        .distinct()
+    )
+    for item in BookingSeries.objects.active().overlapping(start, end):
+        if item.venue_id not in busy and item.occurrences(start, end):
+            busy.add(item.venue_id)
+    return busy
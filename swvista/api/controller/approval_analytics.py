@@ -0,0 +1,187 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import ensure_csrf_cookie
+from rbac.constants import roles
+from rbac.decorators import session_login_required
+
+from ..approval_latency import percentile
+from ..decorators import check_user_permission
+from ..models.approval_latency import ApprovalLatencyWeekly, empty_latency_histogram
+from ..models.venuebooking import VenueBooking
+from ..query_params import get_date_param, get_int_param
+
+# ?group_by= value: rollup fields identifying a group
+GROUPINGS = {
+    "role": ["approver_role"],
+    "venue": ["venue_id", "venue__name"],
+    "week": ["week"],
+}
+
+
+def _hours(seconds):
+    return None if seconds is None else round(seconds / 3600, 2)
+
+
+def sla_hours(role):
+    return settings.APPROVAL_SLA_HOURS_BY_ROLE.get(role, settings.APPROVAL_SLA_HOURS)
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "read")
+def get_approval_analytics(request):
+    """
+    Time bookings spent in approval stages before a reviewer decided them,
+    for decisions between the dates ?start= and ?end= (whole weeks), per
+    ?group_by=role|venue|week. Optional ?venue= and ?stage= filters.
+    Percentiles are interpolated from the ApprovalLatencyWeekly histograms.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        start = get_date_param(request, "start")
+        end = get_date_param(request, "end")
+        venue_id = get_int_param(request, "venue")
+        stage = get_int_param(request, "stage")
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    group_by = request.GET.get("group_by", "role")
+    if group_by not in GROUPINGS:
+        return JsonResponse(
+            {"error": f"'group_by' must be one of {', '.join(GROUPINGS)}."},
+            status=400,
+        )
+    if end < start:
+        return JsonResponse({"error": "'end' cannot be before 'start'."}, status=400)
+    if (end - start).days >= settings.APPROVAL_ANALYTICS_MAX_DAYS:
+        return JsonResponse(
+            {
+                "error": f"Range cannot exceed {settings.APPROVAL_ANALYTICS_MAX_DAYS} days."
+            },
+            status=400,
+        )
+
+    rows = ApprovalLatencyWeekly.objects.filter(
+        week__range=(start - timedelta(days=start.weekday()), end)
+    )
+    if venue_id is not None:
+        rows = rows.filter(venue_id=venue_id)
+    if stage is not None:
+        rows = rows.filter(stage=stage)
+
+    fields = GROUPINGS[group_by]
+    groups = {}
+    for row in rows.order_by(*fields).values_list(
+        *fields, "decision_count", "total_seconds", "histogram"
+    ):
+        *key, decisions, seconds, histogram = row
+        group = groups.setdefault(
+            tuple(key), {"decisions": 0, "seconds": 0, "histogram": None}
+        )
+        group["decisions"] += decisions
+        group["seconds"] += seconds
+        group["histogram"] = [
+            total + count
+            for total, count in zip(
+                group["histogram"] or empty_latency_histogram(), histogram
+            )
+        ]
+
+    results = []
+    for key, group in groups.items():
+        if group_by == "role":
+            label = {"role": key[0], "sla_hours": sla_hours(key[0])}
+        elif group_by == "venue":
+            label = {"venue": key[0], "venue_name": key[1]}
+        else:
+            label = {"week": key[0].isoformat()}
+        results.append(
+            {
+                **label,
+                "decisions": group["decisions"],
+                "avg_hours": _hours(group["seconds"] / group["decisions"]),
+                "p50_hours": _hours(percentile(group["histogram"], 0.5)),
+                "p95_hours": _hours(percentile(group["histogram"], 0.95)),
+            }
+        )
+    return JsonResponse(
+        {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "group_by": group_by,
+            "results": results,
+        }
+    )
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "read")
+def get_sla_breaches(request):
+    """
+    Pending bookings that have been at their current approval stage longer
+    than the SLA of the role reviewing it (APPROVAL_SLA_HOURS, overridden per
+    role by APPROVAL_SLA_HOURS_BY_ROLE), longest waiting first. Optional
+    ?role= filter and ?limit=.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        limit = min(
+            get_int_param(
+                request, "limit", default=settings.APPROVAL_QUEUE_PAGE_SIZE, minimum=1
+            ),
+            settings.APPROVAL_QUEUE_MAX_PAGE_SIZE,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    now = timezone.now()
+
+    def waiting_since(cutoff):
+        # Bookings from before stage_entered_at was recorded count from creation
+        return Q(stage_entered_at__lt=cutoff) | Q(
+            stage_entered_at__isnull=True, created_at__lt=cutoff
+        )
+
+    overrides = settings.APPROVAL_SLA_HOURS_BY_ROLE
+    breached = ~Q(approval_role__in=overrides) & waiting_since(
+        now - timedelta(hours=settings.APPROVAL_SLA_HOURS)
+    )
+    for role, hours in overrides.items():
+        breached |= Q(approval_role=role) & waiting_since(now - timedelta(hours=hours))
+
+    breaches = VenueBooking.objects.filter(breached, status=VenueBooking.STATUS_PENDING)
+    role = request.GET.get("role")
+    if role:
+        breaches = breaches.filter(approval_role=role)
+    count = breaches.count()
+    page = breaches.order_by("stage_entered_at", "created_at", "id").values(
+        "id",
+        "venue_id",
+        "venue__name",
+        "approval_stage",
+        "approval_role",
+        "stage_entered_at",
+        "created_at",
+    )[:limit]
+
+    results = []
+    for booking in page:
+        entered_at = booking["stage_entered_at"] or booking["created_at"]
+        results.append(
+            {
+                "id": booking["id"],
+                "venue": booking["venue_id"],
+                "venue_name": booking["venue__name"],
+                "approval_stage": booking["approval_stage"],
+                "approval_role": booking["approval_role"],
+                "stage_entered_at": entered_at.isoformat(),
+                "hours_in_stage": _hours((now - entered_at).total_seconds()),
+                "sla_hours": sla_hours(booking["approval_role"]),
+            }
+        )
+    return JsonResponse({"count": count, "results": results})
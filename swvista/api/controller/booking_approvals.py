@@ -1,16 +1,46 @@
 import json
 
+from django.conf import settings
 from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rbac.constants import roles
 from rbac.decorators import session_login_required
 
-from ..decorators import check_user_permission
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+
+from ..approval_latency import LatencyDelta
+from ..approval_queue import invalidate_stage_counts, stage_counts
+from ..decorators import check_user_permission, has_permission
+from ..locks import VenueLockTimeout, locked_venues
 from ..models.booking_approval import BookingApproval
+from ..models.booking_series import BookingSeries
 from ..models.venuebooking import VenueBooking
-from ..serializers import BookingApprovalSerializer, VenueBookingSerializer
+from ..notifications import Review, enqueue_reviews
+from ..pipelines import auto_approval_records, next_transition, stages_for
+from ..query_params import get_int_param
+from ..scheduling import booking_end
+from ..serializers import (
+    ApprovalQueueSerializer,
+    BookingApprovalSerializer,
+    SeriesApprovalQueueSerializer,
+    VenueBookingSerializer,
+)
+from ..usage import UsageDelta
+from ..values_serializers import serialize_page
+from ..waitlist import promote_freed
+from .venue_booking import booking_listing, lock_timeout_response
+
+
+def _lost_race_response():
+    return JsonResponse(
+        {"error": "Booking was changed by another approver. Reload it and try again."},
+        status=409,
+    )
 
 
 @ensure_csrf_cookie
@@ -20,57 +50,44 @@ def approve_booking(request, booking_id):
     """Approve a booking at the current stage"""
     if request.method == "POST":
         try:
-            with transaction.atomic():
-                booking = get_object_or_404(VenueBooking, id=booking_id)
-
-                # Check if booking is already approved or rejected
-                if booking.status != VenueBooking.STATUS_PENDING:
-                    return JsonResponse(
-                        {
-                            "error": f"Booking is already {booking.get_status_display().lower()}."
-                        },
-                        status=400,
-                    )
-
-                # Get comments from request
-                data = json.loads(request.body)
-                comments = data.get("comments", "")
-
-                # Create approval record for current stage
-                approval, created = BookingApproval.objects.update_or_create(
-                    booking=booking,
-                    stage=booking.approval_stage,
-                    defaults={
-                        "approver_id": request.session.get("user_id"),
-                        "status": BookingApproval.APPROVAL_STATUS[1][0],
-                        "comments": comments,
+            booking = get_object_or_404(VenueBooking, id=booking_id)
+
+            # Check if booking is already approved or rejected
+            if booking.status != VenueBooking.STATUS_PENDING:
+                return JsonResponse(
+                    {
+                        "error": f"Booking is already {booking.get_status_display().lower()}."
                     },
+                    status=400,
                 )
 
-                # If this is the final approval stage (stage 3)
-                if booking.approval_stage == 3:
-                    booking.status = VenueBooking.STATUS_APPROVED
-                    booking.save()
-                    return JsonResponse(
-                        {
-                            "message": "Booking has been fully approved.",
-                            "booking_id": booking.id,
-                            "status": booking.get_status_display(),
-                        }
-                    )
-
-                # Move to next approval stage
-                booking.approval_stage += 1
-                booking.save()
+            # Get comments from request
+            data = json.loads(request.body)
+            comments = data.get("comments", "")
 
+            # Conditional on the stage just read, so concurrent approvers
+            # cannot skip or repeat a stage
+            stage = booking.approval_stage
+            if not booking.approve(request.session.get("user_id"), comments):
+                return _lost_race_response()
+
+            if booking.status == VenueBooking.STATUS_APPROVED:
                 return JsonResponse(
                     {
-                        "message": f"Booking approved at stage {booking.approval_stage - 1}. Now at stage {booking.approval_stage}.",
+                        "message": "Booking has been fully approved.",
                         "booking_id": booking.id,
-                        "current_stage": booking.approval_stage,
+                        "status": booking.get_status_display(),
                     }
                 )
 
+            return JsonResponse(
+                {
+                    "message": f"Booking approved at stage {stage}. Now at stage {booking.approval_stage}.",
+                    "booking_id": booking.id,
+                    "current_stage": booking.approval_stage,
+                }
+            )
+
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format."}, status=400)
         except Exception as e:
@@ -85,54 +102,43 @@ def reject_booking(request, booking_id):
     """Reject a booking at any stage"""
     if request.method == "POST":
         try:
-            with transaction.atomic():
-                booking = get_object_or_404(VenueBooking, id=booking_id)
-
-                # Check if booking is already approved or rejected
-                if booking.status != VenueBooking.STATUS_PENDING:
-                    return JsonResponse(
-                        {
-                            "error": f"Booking is already {booking.get_status_display().lower()}."
-                        },
-                        status=400,
-                    )
-
-                # Get comments from request
-                data = json.loads(request.body)
-                comments = data.get("comments")
-
-                # Comments are required for rejection
-                if not comments:
-                    return JsonResponse(
-                        {"error": "Comments are required when rejecting a booking."},
-                        status=400,
-                    )
-
-                # Create rejection record
-                approval, created = BookingApproval.objects.update_or_create(
-                    booking=booking,
-                    stage=booking.approval_stage,
-                    defaults={
-                        "approver_id": request.session.get("user_id"),
-                        "status": BookingApproval.APPROVAL_STATUS[2][0],
-                        "comments": comments,
+            booking = get_object_or_404(VenueBooking, id=booking_id)
+
+            # Check if booking is already approved or rejected
+            if booking.status != VenueBooking.STATUS_PENDING:
+                return JsonResponse(
+                    {
+                        "error": f"Booking is already {booking.get_status_display().lower()}."
                     },
+                    status=400,
                 )
 
-                # Update booking status
-                booking.status = VenueBooking.STATUS_REJECTED
-                booking.save()
+            # Get comments from request
+            data = json.loads(request.body)
+            comments = data.get("comments")
 
+            # Comments are required for rejection
+            if not comments:
                 return JsonResponse(
-                    {
-                        "message": "Booking rejected.",
-                        "booking_id": booking.id,
-                        "status": booking.get_status_display(),
-                        "rejection_stage": booking.approval_stage,
-                        "rejection_comments": comments,
-                    }
+                    {"error": "Comments are required when rejecting a booking."},
+                    status=400,
                 )
 
+            if not booking.reject(request.session.get("user_id"), comments):
+                return _lost_race_response()
+
+            return JsonResponse(
+                {
+                    "message": "Booking rejected.",
+                    "booking_id": booking.id,
+                    "status": booking.get_status_display(),
+                    "rejection_stage": booking.approval_stage,
+                    "rejection_comments": comments,
+                }
+            )
+
+        except VenueLockTimeout:
+            return lock_timeout_response()
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format."}, status=400)
         except Exception as e:
@@ -140,6 +146,360 @@ def reject_booking(request, booking_id):
     return JsonResponse({"error": "Only POST method is allowed."}, status=405)
 
 
+BULK_APPROVE = "approve"
+BULK_REJECT = "reject"
+BULK_REVIEW_ATTEMPTS = 3
+
+
+class _StaleReview(Exception):
+    """A booking changed between being read and being updated"""
+
+
+@ensure_csrf_cookie
+@session_login_required
+def bulk_review_bookings(request):
+    """
+    Approve or reject many bookings in one transaction.
+    Expects {"action": "approve" | "reject", "comments": "...",
+    "bookings": [{"id": 1, "comments": "..."}, ...]}; per-booking comments
+    override the shared ones, and rejections need one or the other.
+    Bookings that are missing or no longer pending are reported and skipped.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "Expected a JSON object."}, status=400)
+
+    action = data.get("action")
+    if action not in (BULK_APPROVE, BULK_REJECT):
+        return JsonResponse(
+            {"error": f"'action' must be '{BULK_APPROVE}' or '{BULK_REJECT}'."},
+            status=400,
+        )
+    if not has_permission(request, roles["admin"], "venue", action):
+        return JsonResponse({"error": "Unauthorized"}, status=401)
+
+    items = data.get("bookings")
+    if not isinstance(items, list) or not items:
+        return JsonResponse(
+            {"error": "'bookings' must be a non-empty list."}, status=400
+        )
+    if len(items) > settings.BOOKING_BULK_MAX_ITEMS:
+        return JsonResponse(
+            {
+                "error": f"At most {settings.BOOKING_BULK_MAX_ITEMS} bookings can be reviewed at once."
+            },
+            status=400,
+        )
+
+    results = [None] * len(items)
+    comments_by_id = {}
+    for index, item in enumerate(items):
+        booking_id = item.get("id") if isinstance(item, dict) else None
+        comments = (
+            item.get("comments") if isinstance(item, dict) else None
+        ) or data.get("comments")
+        if not isinstance(booking_id, int):
+            error = "Expected an object with an integer 'id'."
+        elif booking_id in comments_by_id:
+            error = "Booking is listed more than once."
+        elif action == BULK_REJECT and not comments:
+            error = "Comments are required when rejecting a booking."
+        else:
+            comments_by_id[booking_id] = comments or ""
+            continue
+        results[index] = {"index": index, "id": booking_id, "error": error}
+
+    # Rejections hand their slots to the waitlist, so their venues are locked
+    # before the bookings like for any other write that checks conflicts
+    venue_ids = []
+    if action == BULK_REJECT:
+        venue_ids = list(
+            VenueBooking.objects.filter(id__in=comments_by_id).values_list(
+                "venue_id", flat=True
+            )
+        )
+    for _ in range(BULK_REVIEW_ATTEMPTS):
+        try:
+            with locked_venues(*venue_ids):
+                reviewed = _bulk_review(
+                    action,
+                    comments_by_id,
+                    request.session.get("user_id"),
+                )
+            break
+        except _StaleReview:
+            continue
+        except VenueLockTimeout:
+            return lock_timeout_response()
+    else:
+        return JsonResponse(
+            {"error": "Bookings kept changing during the review. Try again."},
+            status=409,
+        )
+
+    for index, item in enumerate(items):
+        if results[index] is None:
+            results[index] = {"index": index, "id": item["id"], **reviewed[item["id"]]}
+    updated = sum(1 for result in results if "error" not in result)
+    return JsonResponse(
+        {"action": action, "updated": updated, "results": results},
+        status=200 if updated == len(items) else 207 if updated else 400,
+    )
+
+
+def _bulk_review(action, comments_by_id, approver_id):
+    """
+    Apply one approval step to every listed pending booking with set-based
+    statements: one locking read, one conditional UPDATE per (stage, target,
+    comment), one insert of the approval rows and one insert into the
+    outbox, then the waitlist behind rejected bookings is promoted. Returns
+    an outcome per booking ID, or raises _StaleReview if a booking left its
+    stage since it was read.
+    """
+    rows = (
+        VenueBooking.objects.select_for_update(of=("self",))
+        .filter(id__in=comments_by_id)
+        .values(
+            "id",
+            "approval_stage",
+            "approval_role",
+            "stage_entered_at",
+            "created_at",
+            "requester_id",
+            "event_type",
+            "venue__name",
+            "venue__capacity",
+            *VenueBooking.USAGE_FIELDS,
+        )
+    )
+    outcomes = {
+        booking_id: {"error": "Booking not found."} for booking_id in comments_by_id
+    }
+    pending = {}
+    for row in rows:
+        booking_id, stage, status = row["id"], row["approval_stage"], row["status"]
+        if status != VenueBooking.STATUS_PENDING:
+            outcomes[booking_id] = {
+                "error": f"Booking is already {dict(VenueBooking.STATUS_CHOICES)[status].lower()}."
+            }
+            continue
+        if action == BULK_REJECT:
+            transition = None
+        else:
+            transition = next_transition(
+                stages_for(row["event_type"], row["venue_id"]),
+                stage,
+                row["booking_duration"],
+                row["venue__capacity"],
+            )
+        review = BookingApproval(
+            booking_id=booking_id,
+            stage=stage,
+            approver_role=row["approval_role"],
+            entered_at=row["stage_entered_at"] or row["created_at"],
+        )
+        pending[booking_id] = (review, transition, row)
+    if not pending:
+        return outcomes
+
+    # Compare-and-swap per stage, target and comment, like
+    # VenueBooking._transition
+    now = timezone.now()
+    approval_status = (
+        BookingApproval.APPROVAL_STATUS[1][0]
+        if action == BULK_APPROVE
+        else BookingApproval.APPROVAL_STATUS[2][0]
+    )
+    groups = {}
+    for booking_id, (review, transition, _) in pending.items():
+        key = (review.stage, transition, comments_by_id[booking_id])
+        groups.setdefault(key, []).append(booking_id)
+    for (stage, transition, comments), booking_ids in groups.items():
+        if transition is None:
+            changes = {"status": VenueBooking.STATUS_REJECTED}
+        else:
+            changes = {
+                "approval_stage": transition.stage,
+                "approval_role": transition.role,
+                "stage_entered_at": now,
+            }
+            if transition.approved:
+                changes["status"] = VenueBooking.STATUS_APPROVED
+        updated = VenueBooking.objects.filter(
+            id__in=booking_ids,
+            status=VenueBooking.STATUS_PENDING,
+            approval_stage=stage,
+        ).update(
+            **changes,
+            last_approver_id=approver_id,
+            last_decision=approval_status,
+            last_comment=comments,
+            last_decided_at=now,
+            updated_at=now,
+        )
+        if updated != len(booking_ids):
+            raise _StaleReview()
+
+    approvals = []
+    latency = LatencyDelta()
+    for booking_id, (review, transition, row) in pending.items():
+        review.approver_id = approver_id
+        review.status = approval_status
+        review.comments = comments_by_id[booking_id]
+        review.decided_at = now
+        approvals.append(review)
+        latency.add(
+            row["venue_id"], review.approver_role, review.stage, review.entered_at, now
+        )
+        if transition is not None:
+            approvals += auto_approval_records(
+                booking_id, transition.auto_approved, now
+            )
+    BookingApproval.objects.bulk_create(approvals)
+    latency.save()
+
+    # update() bypasses the signals that maintain the daily usage rollup
+    # and drop the cached queue counts
+    transaction.on_commit(invalidate_stage_counts)
+    usage = UsageDelta()
+    reviews = []
+    for booking_id, (review, transition, row) in pending.items():
+        if transition is None:
+            new_status = VenueBooking.STATUS_REJECTED
+            stage, role = review.stage, review.approver_role
+            outcomes[booking_id] = {
+                "status": "Rejected",
+                "rejection_stage": stage,
+                "rejection_comments": comments_by_id[booking_id],
+            }
+        else:
+            new_status = (
+                VenueBooking.STATUS_APPROVED
+                if transition.approved
+                else VenueBooking.STATUS_PENDING
+            )
+            stage, role = transition.stage, transition.role
+            outcomes[booking_id] = {
+                "status": dict(VenueBooking.STATUS_CHOICES)[new_status],
+                "current_stage": stage,
+            }
+        reviews.append(
+            Review(
+                booking_id,
+                row["requester_id"],
+                row["venue__name"],
+                row["booking_date"],
+                new_status,
+                stage,
+                role,
+                comments_by_id[booking_id],
+            )
+        )
+        if new_status != VenueBooking.STATUS_PENDING:
+            snapshot = tuple(row[name] for name in VenueBooking.USAGE_FIELDS)
+            usage.add(snapshot, sign=-1)
+            usage.add((*snapshot[:-1], new_status))
+    usage.save()
+    enqueue_reviews(reviews)
+    promote_freed(
+        (
+            row["venue_id"],
+            row["booking_date"],
+            booking_end(row["booking_date"], row["booking_duration"]),
+        )
+        for _, transition, row in pending.values()
+        if transition is None
+    )
+    return outcomes
+
+
+# What approvals/queue/ lists for each ?kind=: model, approval record
+# field, serializer, how to load the rows and the column they are ordered by
+QUEUE_KINDS = {
+    "booking": (
+        VenueBooking,
+        "booking",
+        ApprovalQueueSerializer,
+        lambda queue: queue.for_listing(),
+        "booking_date",
+    ),
+    "series": (
+        BookingSeries,
+        "series",
+        SeriesApprovalQueueSerializer,
+        lambda queue: queue.select_related("venue", "requester"),
+        "start",
+    ),
+}
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_approval_queue(request):
+    """
+    Pending bookings (or, with ?kind=series, recurring series) awaiting the
+    caller's role in their approval pipeline (optionally at one ?stage=),
+    soonest first, ?limit= per page. Pass the returned next_cursor as
+    ?cursor= for the next page. Each row carries only its latest approval;
+    per-stage counts come from a cache.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    role = request.session.get("role")
+    kind = request.GET.get("kind", "booking")
+    if kind not in QUEUE_KINDS:
+        return JsonResponse(
+            {"error": f"kind must be one of: {', '.join(QUEUE_KINDS)}."}, status=400
+        )
+    model, approval_field, serializer_class, for_listing, order_by = QUEUE_KINDS[kind]
+    try:
+        stage = get_int_param(request, "stage")
+        fieldsets = fieldset_context(request, serializer_class)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    latest_approval = BookingApproval.objects.filter(
+        **{approval_field: OuterRef("pk")}
+    ).order_by("-approval_date", "-id")
+    queue = for_listing(
+        model.objects.filter(status=model.STATUS_PENDING, approval_role=role)
+    ).annotate(latest_approval_id=Subquery(latest_approval.values("id")[:1]))
+    if stage is not None:
+        queue = queue.filter(approval_stage=stage)
+    try:
+        page, meta = paginate(
+            request,
+            serializer_class.sparse_queryset(queue, fieldsets),
+            ordering=(order_by,),
+            page_size=settings.APPROVAL_QUEUE_PAGE_SIZE,
+            max_page_size=settings.APPROVAL_QUEUE_MAX_PAGE_SIZE,
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    latest_approvals = {}
+    if "latest_approval" in fieldsets.get("fields", ["latest_approval"]):
+        latest_approvals = BookingApproval.objects.select_related("approver").in_bulk(
+            [row.latest_approval_id for row in page if row.latest_approval_id]
+        )
+    serializer = serializer_class(
+        page, many=True, context={**fieldsets, "latest_approvals": latest_approvals}
+    )
+    counts = stage_counts(role, model)
+    return JsonResponse(
+        {
+            "results": serializer.data,
+            **meta,
+            "counts": counts,
+        }
+    )
+
+
 @ensure_csrf_cookie
 @session_login_required
 def get_pending_approvals(request):
@@ -147,13 +507,21 @@ def get_pending_approvals(request):
     if request.method == "GET":
         try:
 
-            pending_bookings = VenueBooking.objects.filter(
-                status=VenueBooking.STATUS_PENDING
+            pending_bookings, context = booking_listing(
+                request,
+                VenueBooking.objects.filter(status=VenueBooking.STATUS_PENDING),
             )
+            data, page = serialize_page(
+                request,
+                pending_bookings,
+                VenueBookingSerializer,
+                context,
+                ordering=("booking_date",),
+            )
+            return JsonResponse({"results": data, **page})
 
-            serializer = VenueBookingSerializer(pending_bookings, many=True)
-            return JsonResponse(serializer.data, safe=False)
-
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Only GET method is allowed."}, status=405)
@@ -164,8 +532,21 @@ def get_pending_approvals(request):
 def get_approval_history(request, booking_id):
     """Get the full approval history for a booking"""
     if request.method == "GET":
-        booking = get_object_or_404(VenueBooking, id=booking_id)
-        approvals = booking.approvals.all()
-        serializer = BookingApprovalSerializer(approvals, many=True)
+        try:
+            fieldsets = fieldset_context(request, BookingApprovalSerializer)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        # Served from the (booking, approval_date) index
+        approvals = list(
+            BookingApprovalSerializer.sparse_queryset(
+                BookingApproval.objects.filter(booking_id=booking_id).select_related(
+                    "approver"
+                ),
+                fieldsets,
+            )
+        )
+        if not approvals:
+            get_object_or_404(VenueBooking, id=booking_id)
+        serializer = BookingApprovalSerializer(approvals, many=True, context=fieldsets)
         return JsonResponse(serializer.data, safe=False)
     return JsonResponse({"error": "Only GET method is allowed."}, status=405)
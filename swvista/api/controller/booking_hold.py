@@ -0,0 +1,178 @@
+import json
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import ensure_csrf_cookie
+from rbac.constants import roles
+from rbac.decorators import session_login_required
+
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+
+from ..conflicts import find_conflicts
+from ..decorators import check_user_permission
+from ..locks import VenueLockTimeout, locked_venues
+from ..models.booking_hold import BookingHold
+from ..serializers import BookingHoldSerializer, VenueBookingSerializer
+from ..waitlist import promote
+from .venue_booking import conflict_response, lock_timeout_response
+
+
+def _own_hold(request, hold_id):
+    """The hold, or an error response when it belongs to someone else"""
+    hold = get_object_or_404(BookingHold, id=hold_id)
+    if hold.holder_id != request.session.get("user_id"):
+        return None, JsonResponse(
+            {"error": "You can only manage your own holds."}, status=403
+        )
+    return hold, None
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_my_holds(request):
+    """Live holds of the logged-in user, oldest first, a page at a time"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        fieldsets = fieldset_context(request, BookingHoldSerializer)
+        holds, page = paginate(
+            request,
+            BookingHoldSerializer.sparse_queryset(
+                BookingHold.objects.live()
+                .filter(holder_id=request.session.get("user_id"))
+                .select_related("venue"),
+                fieldsets,
+            ),
+            ordering=("created_at",),
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    serializer = BookingHoldSerializer(holds, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page})
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "write")
+def create_hold(request):
+    """
+    Hold a venue slot for "ttl_minutes" (default BOOKING_HOLD_TTL_MINUTES)
+    while the booking is being prepared. The slot is checked and held under
+    the venue lock, so the hold itself cannot double-book.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    holder_id = request.session.get("user_id")
+    data["holder"] = holder_id
+
+    serializer = BookingHoldSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    if (
+        BookingHold.objects.live().filter(holder_id=holder_id).count()
+        >= settings.BOOKING_HOLD_MAX_PER_USER
+    ):
+        return JsonResponse(
+            {
+                "error": f"At most {settings.BOOKING_HOLD_MAX_PER_USER} holds can be live at once."
+            },
+            status=400,
+        )
+
+    venue = serializer.validated_data["venue"]
+    try:
+        with locked_venues(venue.id):
+            conflicts = find_conflicts(
+                venue,
+                serializer.validated_data["booking_date"],
+                serializer.validated_data["booking_duration"],
+            )
+            if conflicts:
+                return conflict_response(conflicts)
+            serializer.save()
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse(serializer.data, status=201)
+
+
+@ensure_csrf_cookie
+@session_login_required
+def release_hold(request, hold_id):
+    """Give a held slot back before the hold expires"""
+    if request.method != "DELETE":
+        return JsonResponse({"error": "Only DELETE method is allowed."}, status=405)
+    hold, error = _own_hold(request, hold_id)
+    if error:
+        return error
+    try:
+        # The freed slot goes to the waitlist in the same transaction
+        with locked_venues(hold.venue_id):
+            hold.delete()
+            promote(hold.venue_id, hold.booking_date, hold.booking_end)
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse({"message": "Hold released."})
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "write")
+def convert_hold(request, hold_id):
+    """
+    Turn a live hold into a pending VenueBooking for the same slot. The
+    booking is created and the hold deleted in one transaction.
+    Accepts the optional booking fields "event_type" and "proposal".
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    hold, error = _own_hold(request, hold_id)
+    if error:
+        return error
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+
+    serializer = VenueBookingSerializer(
+        data={
+            "event_type": data.get("event_type", 0),
+            "proposal": data.get("proposal", hold.proposal_id),
+            "venue": hold.venue_id,
+            "booking_date": hold.booking_date,
+            "booking_duration": hold.booking_duration,
+            "requester": hold.holder_id,
+        }
+    )
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        with locked_venues(hold.venue_id):
+            # Re-read under the lock: the hold may have expired or been
+            # reaped since it was fetched
+            if not BookingHold.objects.live().filter(id=hold.id).exists():
+                return JsonResponse(
+                    {"error": "Hold has expired or was released."}, status=409
+                )
+            conflicts = find_conflicts(
+                hold.venue,
+                hold.booking_date,
+                hold.booking_duration,
+                exclude_hold_id=hold.id,
+            )
+            if conflicts:
+                return conflict_response(conflicts)
+            serializer.save()
+            hold.delete()
+            # The slot passes straight to the new booking, so there is nothing
+            # to promote: the waitlist now queues behind that booking and is
+            # promoted if it is rejected or deleted
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse(serializer.data, status=201)
@@ -0,0 +1,326 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import ensure_csrf_cookie
+from rbac.constants import roles
+from rbac.decorators import session_login_required
+
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+
+from ..conflicts import Conflicts, busy_index
+from ..decorators import check_user_permission
+from ..formatting import datetime_formatter
+from ..locks import VenueLockTimeout, locked_venues
+from ..models.booking_approval import BookingApproval
+from ..models.booking_series import BookingSeries
+from ..query_params import get_int_param, get_window_params
+from ..serializers import BookingApprovalSerializer, BookingSeriesSerializer
+from ..waitlist import promote
+from .venue_booking import conflict_response, lock_timeout_response
+
+
+def _series_conflicts(series, exclude_series_id=None):
+    """
+    Check every occurrence of an unsaved series against the bookings and
+    other series of its venue, loaded once for the whole span.
+    """
+    start, end = series.start, series.last_end()
+    busy = busy_index(series.venue, start, end, exclude_series_id=exclude_series_id)
+    keys = []
+    clashing = []
+    for occurrence_start, occurrence_end in series.occurrences(start, end):
+        overlapping = busy.overlapping(occurrence_start, occurrence_end)
+        if overlapping:
+            keys.extend(overlapping)
+            clashing.append(occurrence_start)
+    return Conflicts.from_keys(keys), clashing
+
+
+def _series_conflict_response(conflicts, clashing):
+    as_json = datetime_formatter()
+    return conflict_response(
+        conflicts, conflicting_occurrences=[as_json(start) for start in clashing]
+    )
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_all_series(request):
+    """Retrieve recurring booking series by start, one page at a time"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        fieldsets = fieldset_context(request, BookingSeriesSerializer)
+        series, page = paginate(
+            request,
+            BookingSeriesSerializer.sparse_queryset(
+                BookingSeries.objects.select_related("venue", "requester"), fieldsets
+            ),
+            ordering=("start",),
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    serializer = BookingSeriesSerializer(series, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page})
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_series_by_id(request, series_id):
+    """Retrieve a specific recurring booking series by ID"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        fieldsets = fieldset_context(request, BookingSeriesSerializer)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    series = get_object_or_404(
+        BookingSeriesSerializer.sparse_queryset(
+            BookingSeries.objects.select_related("venue", "requester"), fieldsets
+        ),
+        id=series_id,
+    )
+    serializer = BookingSeriesSerializer(series, context=fieldsets)
+    return JsonResponse(serializer.data)
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_series_occurrences(request):
+    """
+    Expand the occurrences of active series within ?start=&end=, optionally
+    for one ?venue=. Only occurrences inside the window are generated.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        start, end = get_window_params(
+            request, max_days=settings.BOOKING_AVAILABILITY_MAX_DAYS
+        )
+        venue_id = get_int_param(request, "venue")
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    series = (
+        BookingSeries.objects.active()
+        .overlapping(start, end)
+        .select_related("venue")
+        .order_by("start")
+    )
+    if venue_id is not None:
+        series = series.filter(venue_id=venue_id)
+
+    as_json = datetime_formatter()
+    occurrences = [
+        {
+            "series": item.id,
+            "venue": item.venue_id,
+            "venue_name": item.venue.name,
+            "event_type": item.event_type,
+            "status": item.status,
+            "start": occurrence_start,
+            "end": occurrence_end,
+        }
+        for item in series
+        for occurrence_start, occurrence_end in item.occurrences(start, end)
+    ]
+    occurrences.sort(key=lambda occurrence: occurrence["start"])
+    for occurrence in occurrences:
+        occurrence["start"] = as_json(occurrence["start"])
+        occurrence["end"] = as_json(occurrence["end"])
+    return JsonResponse(occurrences, safe=False)
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "write")
+def create_series(request):
+    """Create a recurring booking series after checking every occurrence"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    data["requester"] = request.session.get("user_id")
+
+    serializer = BookingSeriesSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    try:
+        with locked_venues(serializer.validated_data["venue"].id):
+            conflicts, clashing = _series_conflicts(
+                BookingSeries(**serializer.validated_data)
+            )
+            if conflicts:
+                return _series_conflict_response(conflicts, clashing)
+            serializer.save()
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse(serializer.data, status=201)
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "write")
+def update_series(request, series_id):
+    """Update a pending recurring booking series, e.g. to add exceptions"""
+    if request.method != "PUT":
+        return JsonResponse({"error": "Only PUT method is allowed."}, status=405)
+    series = get_object_or_404(BookingSeries, id=series_id)
+    if series.status != BookingSeries.STATUS_PENDING:
+        return JsonResponse(
+            {"error": "Cannot update a series that is already approved or rejected."},
+            status=400,
+        )
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+
+    serializer = BookingSeriesSerializer(series, data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    freed = (series.venue_id, series.start, series.series_end)
+    try:
+        with locked_venues(serializer.validated_data["venue"].id, series.venue_id):
+            # Unsaved copy, so the old rule's cached expansions are not touched
+            conflicts, clashing = _series_conflicts(
+                BookingSeries(**serializer.validated_data),
+                exclude_series_id=series.id,
+            )
+            if conflicts:
+                return _series_conflict_response(conflicts, clashing)
+            serializer.save()
+            # Occurrences the new rule dropped go to the waitlist
+            promote(*freed)
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse(serializer.data)
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "delete")
+def delete_series(request, series_id):
+    """Delete a pending recurring booking series"""
+    if request.method != "DELETE":
+        return JsonResponse({"error": "Only DELETE method is allowed."}, status=405)
+    series = get_object_or_404(BookingSeries, id=series_id)
+    if series.status != BookingSeries.STATUS_PENDING:
+        return JsonResponse(
+            {"error": "Cannot delete a series that is already approved or rejected."},
+            status=400,
+        )
+    try:
+        # The freed occurrences go to the waitlist in the same transaction
+        with locked_venues(series.venue_id):
+            series.delete()
+            promote(series.venue_id, series.start, series.series_end)
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse({"message": "Series deleted successfully."})
+
+
+def _review_failed_response(series):
+    if series.status != BookingSeries.STATUS_PENDING:
+        return JsonResponse(
+            {"error": f"Series is already {series.get_status_display().lower()}."},
+            status=400,
+        )
+    return JsonResponse(
+        {"error": "Series was changed by another approver. Reload it and try again."},
+        status=409,
+    )
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "approve")
+def approve_series(request, series_id):
+    """Approve a series at its current stage, covering every occurrence"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    series = get_object_or_404(
+        BookingSeries.objects.select_related("venue"), id=series_id
+    )
+    try:
+        data = json.loads(request.body or b"{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    if not series.approve(request.session.get("user_id"), data.get("comments", "")):
+        return _review_failed_response(series)
+    return JsonResponse(
+        {
+            "message": (
+                "Series has been fully approved."
+                if series.status == BookingSeries.STATUS_APPROVED
+                else f"Series approved. Now at stage {series.approval_stage}."
+            ),
+            "series_id": series.id,
+            "status": series.get_status_display(),
+            "current_stage": series.approval_stage,
+        }
+    )
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "reject")
+def reject_series(request, series_id):
+    """Reject a series at any stage"""
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    series = get_object_or_404(
+        BookingSeries.objects.select_related("venue"), id=series_id
+    )
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    try:
+        rejected = series.reject(request.session.get("user_id"), data.get("comments"))
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages[0]}, status=400)
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    if not rejected:
+        return _review_failed_response(series)
+    return JsonResponse(
+        {
+            "message": "Series rejected.",
+            "series_id": series.id,
+            "status": series.get_status_display(),
+            "rejection_stage": series.approval_stage,
+            "rejection_comments": series.rejection_comments,
+        }
+    )
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_series_approval_history(request, series_id):
+    """Get the full approval history for a series"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        fieldsets = fieldset_context(request, BookingApprovalSerializer)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    # Served from the (series, approval_date) index
+    approvals = list(
+        BookingApprovalSerializer.sparse_queryset(
+            BookingApproval.objects.filter(series_id=series_id).select_related(
+                "approver"
+            ),
+            fieldsets,
+        )
+    )
+    if not approvals:
+        get_object_or_404(BookingSeries, id=series_id)
+    serializer = BookingApprovalSerializer(approvals, many=True, context=fieldsets)
+    return JsonResponse(serializer.data, safe=False)
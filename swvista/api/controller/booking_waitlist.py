@@ -0,0 +1,122 @@
+import json
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views.decorators.csrf import ensure_csrf_cookie
+from rbac.constants import roles
+from rbac.decorators import session_login_required
+
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+
+from ..conflicts import find_conflicts
+from ..decorators import check_user_permission
+from ..locks import VenueLockTimeout, locked_venues
+from ..models.waitlist_entry import WaitlistEntry
+from ..serializers import WaitlistEntrySerializer
+from .venue_booking import lock_timeout_response
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_my_waitlist(request):
+    """Waitlist entries of the logged-in user, oldest first, a page at a time"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        fieldsets = fieldset_context(request, WaitlistEntrySerializer)
+        entries, page = paginate(
+            request,
+            WaitlistEntrySerializer.sparse_queryset(
+                WaitlistEntry.objects.filter(
+                    requester_id=request.session.get("user_id")
+                ).select_related("venue"),
+                fieldsets,
+            ),
+            ordering=("created_at",),
+        )
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    serializer = WaitlistEntrySerializer(entries, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page})
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "write")
+def join_waitlist(request):
+    """
+    Queue a booking request behind the bookings, series or holds taking its
+    slot. When one of them is rejected, deleted, released or reaped, the
+    request is booked automatically if the slot is then free (see
+    api.waitlist.promote). Slots that are free
+    now should be booked directly, so they are refused with the usual 400.
+    Only admins may set a priority; other requests wait at priority 0.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+    requester_id = request.session.get("user_id")
+    data["requester"] = requester_id
+
+    serializer = WaitlistEntrySerializer(
+        data=data,
+        context={"can_set_priority": request.session.get("role") == roles["admin"]},
+    )
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=400)
+    if (
+        WaitlistEntry.objects.waiting().filter(requester_id=requester_id).count()
+        >= settings.WAITLIST_MAX_PER_USER
+    ):
+        return JsonResponse(
+            {
+                "error": f"At most {settings.WAITLIST_MAX_PER_USER} requests can wait at once."
+            },
+            status=400,
+        )
+
+    venue = serializer.validated_data["venue"]
+    try:
+        with locked_venues(venue.id):
+            conflicts = find_conflicts(
+                venue,
+                serializer.validated_data["booking_date"],
+                serializer.validated_data["booking_duration"],
+            )
+            if not conflicts:
+                return JsonResponse(
+                    {"error": "The slot is free; book it directly."}, status=400
+                )
+            serializer.save()
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    return JsonResponse({**serializer.data, **conflicts.as_dict()}, status=201)
+
+
+@ensure_csrf_cookie
+@session_login_required
+def leave_waitlist(request, entry_id):
+    """Withdraw a waiting request"""
+    if request.method != "DELETE":
+        return JsonResponse({"error": "Only DELETE method is allowed."}, status=405)
+    entry = get_object_or_404(WaitlistEntry, id=entry_id)
+    if entry.requester_id != request.session.get("user_id"):
+        return JsonResponse(
+            {"error": "You can only manage your own waitlist entries."}, status=403
+        )
+    updated = (
+        WaitlistEntry.objects.waiting()
+        .filter(id=entry.id)
+        .update(status=WaitlistEntry.STATUS_CANCELLED)
+    )
+    if not updated:
+        return JsonResponse(
+            {"error": f"Entry is already {entry.get_status_display().lower()}."},
+            status=400,
+        )
+    return JsonResponse({"message": "Left the waitlist."})
@@ -0,0 +1,257 @@
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Max
+from django.http import JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rbac.constants import roles
+from rbac.decorators import session_login_required
+from rbac.models import User
+
+from .. import ical
+from ..models.booking_series import BookingSeries
+from ..models.club import Club
+from ..models.club_members import ClubMember
+from ..models.venue import Venue
+from ..models.venuebooking import VenueBooking
+from ..scheduling import booking_end
+
+FEED_SALT = "api.calendar_feed"
+FEED_CHUNK_SIZE = 500
+FEED_KINDS = {
+    "venue": (Venue, "get_venue_calendar"),
+    "club": (Club, "get_club_calendar"),
+    "user": (User, "get_user_calendar"),
+}
+
+
+def may_view_feed(user_id, is_admin, kind, id):
+    """
+    Whether a user may read a feed: their own bookings, the bookings of a
+    club they belong to, or any venue's. Admins may read every feed.
+    """
+    if is_admin or kind == "venue":
+        return True
+    if kind == "user":
+        return user_id == id
+    return ClubMember.objects.filter(club_id=id, user_id=user_id).exists()
+
+
+def feed_access(kind):
+    """
+    Let calendar apps, which cannot log in, subscribe with the signed ?token=
+    from booking/ics/token/. Logged-in sessions are accepted as well. Tokens
+    expire after CALENDAR_TOKEN_MAX_AGE_DAYS and stop working once the user
+    they were issued to may no longer read the feed, e.g. after leaving the
+    club.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, id, *args, **kwargs):
+            user_id = request.session.get("user_id")
+            if user_id:
+                is_admin = request.session.get("role") == roles["admin"]
+            else:
+                try:
+                    claims = signing.loads(
+                        request.GET.get("token", ""),
+                        salt=FEED_SALT,
+                        max_age=settings.CALENDAR_TOKEN_MAX_AGE_DAYS * 86400,
+                    )
+                except signing.SignatureExpired:
+                    return JsonResponse({"error": "Token has expired."}, status=401)
+                except signing.BadSignature:
+                    return JsonResponse(
+                        {"error": "Authentication required."}, status=401
+                    )
+                user_id = claims.get("user")
+                if user_id is None or claims != {
+                    "feed": kind,
+                    "id": id,
+                    "user": user_id,
+                }:
+                    return JsonResponse(
+                        {"error": "Token is not valid for this feed."}, status=403
+                    )
+                is_admin = User.objects.filter(
+                    id=user_id, role__name=roles["admin"]
+                ).exists()
+            if not may_view_feed(user_id, is_admin, kind, id):
+                return JsonResponse(
+                    {"error": "You may not read this calendar feed."}, status=403
+                )
+            return view_func(request, id, *args, **kwargs)
+
+        return _wrapped_view
+
+    return decorator
+
+
+def _calendar_response(request, name, bookings, series):
+    """
+    Stream bookings and series as an iCalendar feed.
+
+    The validators come from max(updated_at) and the row count, so a poll
+    with an unchanged feed is answered with 304 before any rows are read.
+    """
+    booking_state = bookings.aggregate(changed=Max("updated_at"), rows=Count("id"))
+    series_state = series.aggregate(changed=Max("updated_at"), rows=Count("id"))
+    changed = [
+        state["changed"] for state in (booking_state, series_state) if state["changed"]
+    ]
+    last_modified = int(max(changed).timestamp()) if changed else 0
+    etag = quote_etag(f"{last_modified}-{booking_state['rows']}-{series_state['rows']}")
+
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified or None
+    )
+    if not_modified is not None:
+        return not_modified
+
+    response = StreamingHttpResponse(
+        _stream_events(name, bookings, series),
+        content_type="text/calendar; charset=utf-8",
+    )
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _stream_events(name, bookings, series):
+    yield ical.calendar_header(name)
+    event_types = dict(VenueBooking.EVENT_TYPE)
+    rows = (
+        bookings.filter(
+            status__in=[VenueBooking.STATUS_PENDING, VenueBooking.STATUS_APPROVED]
+        )
+        .order_by("booking_date")
+        .values_list(
+            "id",
+            "booking_date",
+            "booking_end",
+            "updated_at",
+            "status",
+            "event_type",
+            "venue__name",
+            "proposal__name",
+        )
+        .iterator(chunk_size=FEED_CHUNK_SIZE)
+    )
+    for (
+        booking_id,
+        start,
+        end,
+        updated_at,
+        status,
+        event_type,
+        venue_name,
+        proposal_name,
+    ) in rows:
+        yield ical.event(
+            uid=f"booking-{booking_id}@swvista",
+            start=start,
+            end=end,
+            summary=proposal_name or event_types[event_type].capitalize(),
+            location=venue_name,
+            confirmed=status == VenueBooking.STATUS_APPROVED,
+            last_modified=updated_at,
+        )
+    for item in (
+        series.active()
+        .select_related("venue", "proposal")
+        .iterator(chunk_size=FEED_CHUNK_SIZE)
+    ):
+        yield ical.event(
+            uid=f"series-{item.id}@swvista",
+            start=item.start,
+            end=booking_end(item.start, item.duration),
+            summary=(
+                item.proposal.name
+                if item.proposal
+                else item.get_event_type_display().capitalize()
+            ),
+            location=item.venue.name,
+            confirmed=item.status == BookingSeries.STATUS_APPROVED,
+            last_modified=item.updated_at,
+            extra_lines=ical.recurrence_lines(item),
+        )
+    yield ical.calendar_footer()
+
+
+@feed_access("venue")
+def get_venue_calendar(request, id):
+    """iCalendar feed of a venue's pending and approved bookings"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    venue = get_object_or_404(Venue, id=id)
+    return _calendar_response(
+        request,
+        venue.name,
+        VenueBooking.objects.filter(venue=venue),
+        BookingSeries.objects.filter(venue=venue),
+    )
+
+
+@feed_access("club")
+def get_club_calendar(request, id):
+    """iCalendar feed of the bookings requested by a club's members"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    club = get_object_or_404(Club, id=id)
+    members = ClubMember.objects.filter(club=club).values("user_id")
+    return _calendar_response(
+        request,
+        club.name,
+        VenueBooking.objects.filter(requester__in=members),
+        BookingSeries.objects.filter(requester__in=members),
+    )
+
+
+@feed_access("user")
+def get_user_calendar(request, id):
+    """iCalendar feed of the bookings requested by a user"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    user = get_object_or_404(User, id=id)
+    return _calendar_response(
+        request,
+        user.username,
+        VenueBooking.objects.filter(requester=user),
+        BookingSeries.objects.filter(requester=user),
+    )
+
+
+@session_login_required
+def get_calendar_token(request, feed, id):
+    """
+    Issue the subscription URL of a venue calendar, the caller's own
+    calendar or that of a club they belong to
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    if feed not in FEED_KINDS:
+        return JsonResponse({"error": "Unknown calendar feed."}, status=404)
+    model, url_name = FEED_KINDS[feed]
+    get_object_or_404(model, id=id)
+    user_id = request.session["user_id"]
+    if not may_view_feed(
+        user_id, request.session.get("role") == roles["admin"], feed, id
+    ):
+        return JsonResponse(
+            {"error": "You may not read this calendar feed."}, status=403
+        )
+    token = signing.dumps({"feed": feed, "id": id, "user": user_id}, salt=FEED_SALT)
+    url = request.build_absolute_uri(reverse(url_name, args=[id]))
+    expires_at = timezone.now() + timedelta(days=settings.CALENDAR_TOKEN_MAX_AGE_DAYS)
+    return JsonResponse(
+        {"token": token, "url": f"{url}?token={token}", "expires_at": expires_at}
+    )
@@ -6,6 +6,9 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
 from rbac.models import User  # Assuming User model is in rbac app
 
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+
 from ..models.club import Club
 from ..models.club_members import ClubMember
 
@@ -56,13 +59,19 @@ def create_club(request):
 # Example permission: @check_user_permission([roles["admin"], roles["user"]], "club", "read")
 def get_all_clubs(request):
     """
-    Retrieves a list of all clubs.
+    Retrieves clubs one page at a time (see swvista.pagination), with only
+    the ?fields= asked for (see swvista.fieldsets).
     Requires appropriate read permissions.
-    Consider adding pagination for large datasets.
     """
-    clubs = Club.objects.all()
-    serializer = ClubSerializer(clubs, many=True)
-    return JsonResponse(serializer.data, safe=False, status=200)  # safe=False for list
+    try:
+        fieldsets = fieldset_context(request, ClubSerializer)
+        clubs, page = paginate(
+            request, ClubSerializer.sparse_queryset(Club.objects.all(), fieldsets)
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    serializer = ClubSerializer(clubs, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page}, status=200)
 
 
 @require_http_methods(["GET"])
@@ -74,8 +83,14 @@ def get_club_by_id(request, id):
     Requires appropriate read permissions.
     Returns 404 if the club is not found.
     """
-    club = get_object_or_404(Club, id=id)
-    serializer = ClubSerializer(club)
+    try:
+        fieldsets = fieldset_context(request, ClubSerializer)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    club = get_object_or_404(
+        ClubSerializer.sparse_queryset(Club.objects.all(), fieldsets), id=id
+    )
+    serializer = ClubSerializer(club, context=fieldsets)
     return JsonResponse(serializer.data, status=200)
 
 
@@ -220,15 +235,25 @@ def remove_member_from_club(request):
 # Example permission: @check_user_permission([roles["admin"], roles["user"]], "club_member", "read") # Or just club members
 def get_all_members_of_club(request, id):
     """
-    Retrieves a list of all members (ClubMember details) for a specific club.
+    Retrieves the members (ClubMember details) of a specific club, one page
+    at a time (see swvista.pagination).
     Requires appropriate read permissions.
     Returns 404 if the club is not found.
     """
     club = get_object_or_404(Club, id=id)
-    # Consider optimization: .select_related('user') if User details are nested in serializer
-    memberships = ClubMember.objects.filter(club=club)
-    serializer = ClubMemberSerializer(memberships, many=True)
-    return JsonResponse(serializer.data, safe=False, status=200)  # safe=False for list
+    try:
+        fieldsets = fieldset_context(request, ClubMemberSerializer)
+        memberships, page = paginate(
+            request,
+            ClubMemberSerializer.sparse_queryset(
+                ClubMember.objects.filter(club=club).select_related("club", "user"),
+                fieldsets,
+            ),
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    serializer = ClubMemberSerializer(memberships, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page}, status=200)
 
 
 @require_http_methods(["GET"])
@@ -249,10 +274,19 @@ def get_my_clubs(request):
     # Verify the user from the session exists
     user = get_object_or_404(User, id=user_id)
 
-    # Retrieve the ClubMember records associated with this user
-    # Consider optimization: .select_related('club') if Club details are nested in serializer
-    memberships = ClubMember.objects.filter(user=user)
+    # Retrieve the ClubMember records associated with this user, one page at a time
+    try:
+        fieldsets = fieldset_context(request, ClubMemberSerializer)
+        memberships, page = paginate(
+            request,
+            ClubMemberSerializer.sparse_queryset(
+                ClubMember.objects.filter(user=user).select_related("club", "user"),
+                fieldsets,
+            ),
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
     # Note: This serializes the *membership* records (role, join date, etc.),
     # potentially including nested club/user info depending on the serializer config.
-    serializer = ClubMemberSerializer(memberships, many=True)
-    return JsonResponse(serializer.data, safe=False, status=200)  # safe=False for list
+    serializer = ClubMemberSerializer(memberships, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page}, status=200)
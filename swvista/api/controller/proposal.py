@@ -1,13 +1,26 @@
 import json
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.views.decorators.http import require_http_methods
 from rbac.decorators import check_user_permission
 from rbac.models import User
 
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+from swvista.streaming import StreamingJsonResponse
+
+from ..conflicts import busy_venue_ids
+from ..locks import VenueLockTimeout
 from ..models.proposal import Proposal
+from ..proposal_bookings import approve_proposals
+from ..query_params import get_float_param, get_int_param
+from ..scheduling import booking_end
 from ..serializers import ProposalSerializer
+from ..values_serializers import serialize_all
+from ..venue_index import get_capacity_index, haversine_km
+from .venue_booking import lock_timeout_response
 
 # UserSerializer is removed as it's not directly used in these views
 # It might be used within ProposalSerializer, which is imported
@@ -28,35 +41,75 @@ def get_all_proposals_by_user(request):
     except User.DoesNotExist:
         # Return 404 if the user associated with the session ID doesn't exist
         return JsonResponse({"message": "User not found."}, status=404)
-    # Filter proposals for the specific user
-    proposals = Proposal.objects.filter(user=user)
-    serializer = ProposalSerializer(proposals, many=True)
-    # Use safe=False for list serialization
-    return JsonResponse(serializer.data, safe=False)
+    # Filter proposals for the specific user, newest first, one page at a time
+    try:
+        fieldsets = fieldset_context(request, ProposalSerializer)
+        proposals, page = paginate(
+            request,
+            ProposalSerializer.sparse_queryset(
+                Proposal.objects.filter(user=user), fieldsets
+            ),
+            ordering=("-created_at",),
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    serializer = ProposalSerializer(proposals, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page})
 
 
 @require_http_methods(["GET"])
 @ensure_csrf_cookie
 @check_user_permission([{"subject": "proposal", "action": "read"}])
 def get_all_proposals(request):
-    # Retrieve all proposal objects
-    proposals = Proposal.objects.all()
-    serializer = ProposalSerializer(proposals, many=True)
-    # Use safe=False for list serialization
-    return JsonResponse(serializer.data, safe=False)
+    # Retrieve proposals newest first, one page at a time
+    try:
+        fieldsets = fieldset_context(request, ProposalSerializer)
+        proposals, page = paginate(
+            request,
+            ProposalSerializer.sparse_queryset(Proposal.objects.all(), fieldsets),
+            ordering=("-created_at",),
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    serializer = ProposalSerializer(proposals, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page})
+
+
+@require_http_methods(["GET"])
+@ensure_csrf_cookie
+@check_user_permission([{"subject": "proposal", "action": "read"}])
+def export_proposals(request):
+    # Every proposal newest first as one JSON array, streamed a chunk at a
+    # time (see swvista.streaming)
+    try:
+        fieldsets = fieldset_context(request, ProposalSerializer)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    proposals = ProposalSerializer.sparse_queryset(
+        Proposal.objects.order_by("-created_at", "-id"), fieldsets
+    )
+    return StreamingJsonResponse(
+        serialize_all(proposals, ProposalSerializer, fieldsets)
+    )
 
 
 @require_http_methods(["GET"])
 @ensure_csrf_cookie
 @check_user_permission([{"subject": "proposal", "action": "read"}])
 def get_proposal_by_id(request, id):
+    try:
+        fieldsets = fieldset_context(request, ProposalSerializer)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
     try:
         # Retrieve a specific proposal by its ID
-        proposal = Proposal.objects.get(id=id)
+        proposal = ProposalSerializer.sparse_queryset(
+            Proposal.objects.all(), fieldsets
+        ).get(id=id)
     except Proposal.DoesNotExist:
         # Return 404 if the proposal with the given ID is not found
         return JsonResponse({"message": "Proposal not found."}, status=404)
-    serializer = ProposalSerializer(proposal)
+    serializer = ProposalSerializer(proposal, context=fieldsets)
     # safe=False is not strictly necessary for single object serialization but doesn't hurt
     return JsonResponse(serializer.data, safe=False)
 
@@ -164,3 +217,131 @@ def delete_proposal(request, id):
     proposal.delete()
     # Return 200 OK with a success message
     return JsonResponse({"message": "Proposal deleted successfully"}, status=200)
+
+
+@require_http_methods(["POST"])
+@ensure_csrf_cookie
+@check_user_permission([{"subject": "proposal", "action": "approve"}])
+def approve_proposal(request, id):
+    """
+    Approve a pending proposal. When it names a venue and a duration, its
+    event is booked in the same transaction, or put on the waitlist if the
+    slot is taken.
+    """
+    try:
+        outcome = approve_proposals([id])[id]
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    if "error" in outcome:
+        status = 404 if outcome["error"] == "Proposal not found." else 400
+        return JsonResponse({"message": outcome["error"]}, status=status)
+    return JsonResponse({"proposal": id, **outcome})
+
+
+@require_http_methods(["POST"])
+@ensure_csrf_cookie
+@check_user_permission([{"subject": "proposal", "action": "approve"}])
+def bulk_approve_proposals(request):
+    """
+    Approve many proposals and book their events in one batch.
+    Expects {"proposals": [1, 2, ...]}; proposals that are missing or no
+    longer pending are reported and skipped.
+    """
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"message": "Invalid JSON format"}, status=400)
+    ids = data.get("proposals") if isinstance(data, dict) else None
+    if (
+        not isinstance(ids, list)
+        or not ids
+        or not all(isinstance(proposal_id, int) for proposal_id in ids)
+    ):
+        return JsonResponse(
+            {"message": "'proposals' must be a non-empty list of IDs."}, status=400
+        )
+    if len(ids) > settings.BOOKING_BULK_MAX_ITEMS:
+        return JsonResponse(
+            {
+                "message": f"At most {settings.BOOKING_BULK_MAX_ITEMS} proposals can be approved at once."
+            },
+            status=400,
+        )
+
+    try:
+        outcomes = approve_proposals(ids)
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    results = [{"id": proposal_id, **outcomes[proposal_id]} for proposal_id in ids]
+    approved = sum(1 for result in results if "error" not in result)
+    return JsonResponse(
+        {"approved": approved, "results": results},
+        status=200 if approved == len(ids) else 207 if approved else 400,
+    )
+
+
+@require_http_methods(["GET"])
+@ensure_csrf_cookie
+@check_user_permission([{"subject": "proposal", "action": "read"}])
+def recommend_venues(request, id):
+    """
+    Rank the venues that seat the proposal's attendees and are free at its
+    requested date and duration. With ?lat=&lng= the closest venues come
+    first, otherwise the smallest venues that fit. ?limit= caps the list.
+    """
+    try:
+        proposal = Proposal.objects.get(id=id)
+    except Proposal.DoesNotExist:
+        return JsonResponse({"message": "Proposal not found."}, status=404)
+    try:
+        latitude = get_float_param(request, "lat")
+        longitude = get_float_param(request, "lng")
+        limit = get_int_param(request, "limit", default=10, minimum=1)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    if (latitude is None) != (longitude is None):
+        return JsonResponse(
+            {"message": "'lat' and 'lng' must be given together."}, status=400
+        )
+
+    start = proposal.requested_date
+    busy = busy_venue_ids(
+        start, booking_end(start, max(proposal.duration_in_minutes, 1))
+    )
+    venues = [
+        venue
+        for venue in get_capacity_index().fitting(proposal.attendees)
+        if venue.id not in busy
+    ]
+
+    distances = {}
+    if latitude is not None:
+        for venue in venues:
+            if venue.latitude is not None and venue.longitude is not None:
+                distances[venue.id] = haversine_km(
+                    latitude, longitude, venue.latitude, venue.longitude
+                )
+        # Venues without coordinates go last; ties favour the snuggest fit
+        venues.sort(
+            key=lambda venue: (distances.get(venue.id, float("inf")), venue.capacity)
+        )
+
+    return JsonResponse(
+        {
+            "proposal": proposal.id,
+            "attendees": proposal.attendees,
+            "venues": [
+                {
+                    "id": venue.id,
+                    "name": venue.name,
+                    "capacity": venue.capacity,
+                    "latitude": venue.latitude,
+                    "longitude": venue.longitude,
+                    "distance_km": (
+                        round(distances[venue.id], 3) if venue.id in distances else None
+                    ),
+                }
+                for venue in venues[: min(limit, settings.VENUE_RECOMMEND_MAX_RESULTS)]
+            ],
+        }
+    )
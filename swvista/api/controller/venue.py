@@ -2,8 +2,12 @@ import json
 
 # api.models and api.serializers suggests these might be in a different app
 # Adjust the import path if 'api' is the same app as these views
-from api.models import Venue
+from api.models import Venue, VenueDailyUsage
+from api.query_params import get_date_param, get_float_param, get_int_param
 from api.serializers import VenueSerializer
+from api.values_serializers import serialize_page
+from api.venue_index import get_spatial_index
+from django.conf import settings
 from django.http import JsonResponse  # Import Http404
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import ensure_csrf_cookie
@@ -12,6 +16,8 @@ from django.views.decorators.http import require_http_methods
 # Assuming the decorators module is one level up from the current views file
 from rbac.decorators import check_user_permission
 
+from swvista.fieldsets import fieldset_context
+
 # Note on Controllers: In Django's MVT pattern, these view functions often act
 # as the "Controller" logic. They handle the request, interact with models,
 # and return responses, often using serializers for data transformation.
@@ -22,19 +28,162 @@ from rbac.decorators import check_user_permission
 @check_user_permission([{"subject": "venue", "action": "read"}])
 def get_all_venues(request):
     """
-    Retrieves a list of all venues.
+    Retrieves venues one page at a time (see swvista.pagination), with only
+    the ?fields= asked for (see swvista.fieldsets).
     Requires 'read' permission on 'venue'.
     """
-    venues = Venue.objects.all()
-    # Consider pagination here if the number of venues can be large
-    # from django.core.paginator import Paginator
-    # paginator = Paginator(venues, 25) # Example: 25 venues per page
-    # page_number = request.GET.get('page')
-    # page_obj = paginator.get_page(page_number)
-    # serializer = VenueSerializer(page_obj, many=True)
-    serializer = VenueSerializer(venues, many=True)
-    # safe=False is required because the top-level object is a list
-    return JsonResponse(serializer.data, safe=False)
+    try:
+        fieldsets = fieldset_context(request, VenueSerializer)
+        data, page = serialize_page(
+            request,
+            VenueSerializer.sparse_queryset(Venue.objects.all(), fieldsets),
+            VenueSerializer,
+            fieldsets,
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    return JsonResponse({"results": data, **page})
+
+
+@require_http_methods(["GET"])
+@ensure_csrf_cookie
+@check_user_permission([{"subject": "venue", "action": "read"}])
+def get_nearby_venues(request):
+    """
+    Retrieves venues near ?lat=&lng=, closest first.
+    With ?radius= (km) returns venues within that distance, otherwise the
+    ?k= nearest venues (default 10). Venues without coordinates are skipped.
+    Requires 'read' permission on 'venue'.
+    """
+    try:
+        latitude = get_float_param(request, "lat")
+        longitude = get_float_param(request, "lng")
+        radius = get_float_param(request, "radius")
+        k = get_int_param(request, "k", default=10, minimum=1)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    if latitude is None or longitude is None:
+        return JsonResponse({"message": "'lat' and 'lng' are required."}, status=400)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return JsonResponse({"message": "Coordinates are out of range."}, status=400)
+    if radius is not None and not 0 < radius <= settings.VENUE_NEARBY_MAX_RADIUS_KM:
+        return JsonResponse(
+            {
+                "message": f"'radius' must be between 0 and {settings.VENUE_NEARBY_MAX_RADIUS_KM} km."
+            },
+            status=400,
+        )
+    k = min(k, settings.VENUE_NEARBY_MAX_RESULTS)
+
+    index = get_spatial_index()
+    if radius is not None:
+        found = index.within_radius(latitude, longitude, radius)[:k]
+    else:
+        found = index.nearest(latitude, longitude, k)
+    return JsonResponse(
+        [
+            {
+                "id": venue.id,
+                "name": venue.name,
+                "capacity": venue.capacity,
+                "latitude": venue.latitude,
+                "longitude": venue.longitude,
+                "distance_km": round(distance, 3),
+            }
+            for distance, venue in found
+        ],
+        safe=False,
+    )
+
+
+@require_http_methods(["GET"])
+@ensure_csrf_cookie
+@check_user_permission([{"subject": "venue", "action": "read"}])
+def get_venue_utilization(request):
+    """
+    Occupancy of each venue (or only ?venue=) between the dates ?start= and
+    ?end= (inclusive), read from the VenueDailyUsage rollup. ?daily=true
+    adds the per-day rows.
+    Requires 'read' permission on 'venue'.
+    """
+    try:
+        start = get_date_param(request, "start")
+        end = get_date_param(request, "end")
+        venue_id = get_int_param(request, "venue")
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    if end < start:
+        return JsonResponse({"message": "'end' cannot be before 'start'."}, status=400)
+    days = (end - start).days + 1
+    if days > settings.VENUE_USAGE_MAX_DAYS:
+        return JsonResponse(
+            {"message": f"Range cannot exceed {settings.VENUE_USAGE_MAX_DAYS} days."},
+            status=400,
+        )
+    daily = request.GET.get("daily") == "true"
+
+    venues = Venue.objects.order_by("id")
+    rows = VenueDailyUsage.objects.filter(date__range=(start, end)).order_by(
+        "venue_id", "date"
+    )
+    if venue_id is not None:
+        venues = venues.filter(id=venue_id)
+        rows = rows.filter(venue_id=venue_id)
+
+    report = {
+        pk: {
+            "venue": pk,
+            "venue_name": name,
+            "booking_count": 0,
+            "booked_minutes": 0,
+            "approved_minutes": 0,
+            "hourly_minutes": [0] * 24,
+            **({"daily": []} if daily else {}),
+        }
+        for pk, name in venues.values_list("id", "name")
+    }
+    for usage in rows.values(
+        "venue_id",
+        "date",
+        "booking_count",
+        "booked_minutes",
+        "approved_minutes",
+        "hourly_minutes",
+    ):
+        entry = report.get(usage["venue_id"])
+        if entry is None:
+            continue
+        entry["booking_count"] += usage["booking_count"]
+        entry["booked_minutes"] += usage["booked_minutes"]
+        entry["approved_minutes"] += usage["approved_minutes"]
+        entry["hourly_minutes"] = [
+            total + minutes
+            for total, minutes in zip(entry["hourly_minutes"], usage["hourly_minutes"])
+        ]
+        if daily:
+            entry["daily"].append(
+                {
+                    "date": usage["date"].isoformat(),
+                    "booking_count": usage["booking_count"],
+                    "booked_minutes": usage["booked_minutes"],
+                    "approved_minutes": usage["approved_minutes"],
+                }
+            )
+
+    minutes_in_range = days * 24 * 60
+    for entry in report.values():
+        busiest = max(entry["hourly_minutes"])
+        entry["peak_hour"] = entry["hourly_minutes"].index(busiest) if busiest else None
+        entry["utilization"] = round(entry["booked_minutes"] / minutes_in_range, 4)
+
+    return JsonResponse(
+        {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "days": days,
+            "venues": list(report.values()),
+        }
+    )
 
 
 @require_http_methods(["GET"])
@@ -46,9 +195,15 @@ def get_venue_by_id(request, id):
     Requires 'read' permission on 'venue'.
     Returns 404 if the venue is not found.
     """
+    try:
+        fieldsets = fieldset_context(request, VenueSerializer)
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
     # get_object_or_404 handles the DoesNotExist exception and raises Http404
-    venue = get_object_or_404(Venue, id=id)
-    serializer = VenueSerializer(venue)
+    venue = get_object_or_404(
+        VenueSerializer.sparse_queryset(Venue.objects.all(), fieldsets), id=id
+    )
+    serializer = VenueSerializer(venue, context=fieldsets)
     # safe=False is not strictly needed for a single object (dict), but harmless
     return JsonResponse(serializer.data, safe=False)
     # Removed the broad try...except Exception as get_object_or_404 handles the primary error case (not found).
@@ -1,34 +1,172 @@
 import json
+from datetime import timedelta
 
+from django.conf import settings
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import ensure_csrf_cookie
 from rbac.constants import roles
 from rbac.decorators import session_login_required
 
+from swvista.fieldsets import fieldset_context
+from swvista.streaming import StreamingJsonResponse
+
+from ..conflicts import Conflicts, busy_index, busy_intervals_by_venue, find_conflicts
 from ..decorators import check_user_permission
+from ..formatting import datetime_formatter
+from ..locks import VenueLockTimeout, locked_venues
+from ..models.venue import Venue
 from ..models.venuebooking import VenueBooking
+from ..query_params import get_int_param, get_window_params
+from ..scheduling import IntervalIndex, booking_end, free_slots
 from ..serializers import VenueBookingSerializer
+from ..values_serializers import serialize_all, serialize_page
+from ..waitlist import promote
+
+
+def conflict_response(conflicts, **extra):
+    return JsonResponse(
+        {
+            "error": "Venue is already booked for the requested time.",
+            **conflicts.as_dict(),
+            **extra,
+        },
+        status=409,
+    )
+
+
+def lock_timeout_response():
+    return JsonResponse(
+        {"error": "Venue is busy with another booking request, please retry."},
+        status=409,
+    )
+
+
+def booking_listing(request, bookings):
+    """
+    `bookings` planned for the ?fields=, ?expand= and ?include_approvals= of
+    the request, and the VenueBookingSerializer context for them. The
+    approval history is only prefetched when it is serialized. Raises
+    ValueError for unknown fields.
+    """
+    context = fieldset_context(request, VenueBookingSerializer)
+    include_approvals = request.GET.get("include_approvals") == "true"
+    if "expand" in context:
+        include_approvals = "approvals" in context["expand"]
+    context["include_approvals"] = include_approvals
+    bookings = VenueBookingSerializer.sparse_queryset(
+        bookings.for_listing(include_approvals), context
+    )
+    return bookings, context
 
 
 @ensure_csrf_cookie
 @session_login_required
 def get_all_bookings(request):
-    """Retrieve all venue bookings"""
+    """
+    Retrieve venue bookings by date, one page at a time, with their latest
+    decision; pass ?expand=approvals (or ?include_approvals=true) for the
+    full approval history of each and ?fields= to pick the fields.
+    """
     if request.method == "GET":
-        bookings = VenueBooking.objects.all()
-        serializer = VenueBookingSerializer(bookings, many=True)
-        return JsonResponse(serializer.data, safe=False)
+        try:
+            bookings, context = booking_listing(request, VenueBooking.objects.all())
+            data, page = serialize_page(
+                request,
+                bookings,
+                VenueBookingSerializer,
+                context,
+                ordering=("booking_date",),
+            )
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        return JsonResponse({"results": data, **page})
     return JsonResponse({"error": "Only GET method is allowed."}, status=405)
 
 
+@ensure_csrf_cookie
+@session_login_required
+def export_bookings(request):
+    """
+    Every venue booking by date as one JSON array, streamed a chunk at a
+    time (see swvista.streaming). Takes ?fields= and ?expand= like
+    booking/get-all/.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        bookings, context = booking_listing(request, VenueBooking.objects.all())
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    return StreamingJsonResponse(
+        serialize_all(
+            bookings.order_by("booking_date", "id"), VenueBookingSerializer, context
+        )
+    )
+
+
+@ensure_csrf_cookie
+@session_login_required
+def get_availability(request):
+    """
+    Free slots per venue within ?start=&end=, at least ?min_duration= minutes
+    long (default 30), optionally only for venues seating ?min_capacity=.
+    """
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method is allowed."}, status=405)
+    try:
+        start, end = get_window_params(
+            request, max_days=settings.BOOKING_AVAILABILITY_MAX_DAYS
+        )
+        min_duration = get_int_param(request, "min_duration", default=30, minimum=1)
+        min_capacity = get_int_param(request, "min_capacity", minimum=0)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    venues = Venue.objects.order_by("id")
+    if min_capacity is not None:
+        venues = venues.filter(capacity__gte=min_capacity)
+    busy_by_venue = busy_intervals_by_venue(start, end, min_capacity=min_capacity)
+
+    as_json = datetime_formatter()
+    minimum = timedelta(minutes=min_duration)
+    results = []
+    for venue_id, name, capacity in venues.values_list("id", "name", "capacity"):
+        slots = free_slots(busy_by_venue.get(venue_id, []), start, end, minimum)
+        results.append(
+            {
+                "venue": venue_id,
+                "venue_name": name,
+                "capacity": capacity,
+                "free_slots": [
+                    {"start": as_json(slot_start), "end": as_json(slot_end)}
+                    for slot_start, slot_end in slots
+                ],
+            }
+        )
+    return JsonResponse(results, safe=False)
+
+
 @ensure_csrf_cookie
 @session_login_required
 def get_booking_by_id(request, booking_id):
-    """Retrieve a specific booking by ID"""
+    """
+    Retrieve a specific booking by ID, with its approval history unless
+    ?expand= leaves it out; ?fields= picks the fields.
+    """
     if request.method == "GET":
-        booking = get_object_or_404(VenueBooking, id=booking_id)
-        serializer = VenueBookingSerializer(booking)
+        try:
+            context = fieldset_context(request, VenueBookingSerializer)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+        include_approvals = "approvals" in context.get("expand", ["approvals"])
+        booking = get_object_or_404(
+            VenueBookingSerializer.sparse_queryset(
+                VenueBooking.objects.for_listing(include_approvals), context
+            ),
+            id=booking_id,
+        )
+        serializer = VenueBookingSerializer(booking, context=context)
         return JsonResponse(serializer.data, safe=False)
     return JsonResponse({"error": "Only GET method is allowed."}, status=405)
 
@@ -46,16 +184,166 @@ def create_booking(request):
 
             serializer = VenueBookingSerializer(data=data)
             if serializer.is_valid():
-                serializer.save()
+                venue = serializer.validated_data["venue"]
+                with locked_venues(venue.id):
+                    conflicts = find_conflicts(
+                        venue,
+                        serializer.validated_data["booking_date"],
+                        serializer.validated_data["booking_duration"],
+                    )
+                    if conflicts:
+                        return conflict_response(conflicts)
+                    serializer.save()
                 return JsonResponse(serializer.data, status=201)
             return JsonResponse(serializer.errors, status=400)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format."}, status=400)
+        except VenueLockTimeout:
+            return lock_timeout_response()
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Only POST method is allowed."}, status=405)
 
 
+BULK_ALL_OR_NOTHING = "all_or_nothing"
+BULK_BEST_EFFORT = "best_effort"
+
+
+@ensure_csrf_cookie
+@session_login_required
+@check_user_permission(roles["admin"], "venue", "write")
+def bulk_create_bookings(request):
+    """
+    Create several bookings in one request and one transaction.
+    Expects {"bookings": [...], "mode": "all_or_nothing" | "best_effort"}.
+    In all_or_nothing mode (the default) nothing is created unless every
+    booking is valid and free; best_effort creates the ones that are.
+    """
+    if request.method != "POST":
+        return JsonResponse({"error": "Only POST method is allowed."}, status=405)
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON format."}, status=400)
+
+    items = data.get("bookings") if isinstance(data, dict) else None
+    mode = data.get("mode", BULK_ALL_OR_NOTHING) if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return JsonResponse(
+            {"error": "'bookings' must be a non-empty list."}, status=400
+        )
+    if len(items) > settings.BOOKING_BULK_MAX_ITEMS:
+        return JsonResponse(
+            {
+                "error": f"At most {settings.BOOKING_BULK_MAX_ITEMS} bookings can be created at once."
+            },
+            status=400,
+        )
+    if mode not in (BULK_ALL_OR_NOTHING, BULK_BEST_EFFORT):
+        return JsonResponse(
+            {
+                "error": f"'mode' must be '{BULK_ALL_OR_NOTHING}' or '{BULK_BEST_EFFORT}'."
+            },
+            status=400,
+        )
+
+    requester_id = request.session.get("user_id")
+    results = [None] * len(items)
+    valid = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {
+                "index": index,
+                "status": "invalid",
+                "errors": {"non_field_errors": ["Expected a booking object."]},
+            }
+            continue
+        serializer = VenueBookingSerializer(data={**item, "requester": requester_id})
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            results[index] = {
+                "index": index,
+                "status": "invalid",
+                "errors": serializer.errors,
+            }
+
+    try:
+        with locked_venues(*(booking["venue"].id for booking in valid.values())):
+            accepted = _check_batch_conflicts(valid, results)
+
+            failed = len(accepted) < len(items)
+            if failed and mode == BULK_ALL_OR_NOTHING:
+                for index in accepted:
+                    results[index] = {"index": index, "status": "not_created"}
+                has_conflicts = any(
+                    result["status"] == "conflict" for result in results
+                )
+                return JsonResponse(
+                    {"mode": mode, "created": 0, "results": results},
+                    status=409 if has_conflicts else 400,
+                )
+
+            created = VenueBooking.objects.bulk_create(
+                [VenueBooking(**valid[index]) for index in accepted]
+            )
+    except VenueLockTimeout:
+        return lock_timeout_response()
+    for index, booking in zip(accepted, created):
+        results[index] = {"index": index, "status": "created", "id": booking.id}
+
+    return JsonResponse(
+        {"mode": mode, "created": len(created), "results": results},
+        status=207 if failed else 201,
+    )
+
+
+def _check_batch_conflicts(valid, results):
+    """
+    Check validated bookings against existing bookings and against each other.
+
+    Existing bookings and series are loaded with one range query per venue
+    covering the whole batch; earlier items in the batch win over later ones. Records a
+    conflict result for rejected items and returns the accepted indexes.
+    """
+    by_venue = {}
+    for index, booking in valid.items():
+        by_venue.setdefault(booking["venue"], []).append(index)
+
+    accepted = []
+    for venue, indexes in by_venue.items():
+        spans = {
+            index: (
+                valid[index]["booking_date"],
+                booking_end(
+                    valid[index]["booking_date"], valid[index]["booking_duration"]
+                ),
+            )
+            for index in indexes
+        }
+        existing = busy_index(
+            venue,
+            min(start for start, _ in spans.values()),
+            max(end for _, end in spans.values()),
+        )
+        batch = IntervalIndex()
+        for index in indexes:
+            start, end = spans[index]
+            conflicts = existing.overlapping(start, end)
+            batch_conflicts = batch.overlapping(start, end)
+            if conflicts or batch_conflicts:
+                results[index] = {
+                    "index": index,
+                    "status": "conflict",
+                    **Conflicts.from_keys(conflicts).as_dict(),
+                    "batch_conflicts": sorted(batch_conflicts),
+                }
+            else:
+                batch.add(start, end, index)
+                accepted.append(index)
+    return sorted(accepted)
+
+
 @ensure_csrf_cookie
 @session_login_required
 @check_user_permission(roles["admin"], "venue", "write")
@@ -78,7 +366,18 @@ def update_booking(request, booking_id):
 
             serializer = VenueBookingSerializer(booking, data=data)
             if serializer.is_valid():
-                serializer.save()
+                venue = serializer.validated_data["venue"]
+                # Lock the old venue too when the booking moves
+                with locked_venues(venue.id, booking.venue_id):
+                    conflicts = find_conflicts(
+                        venue,
+                        serializer.validated_data["booking_date"],
+                        serializer.validated_data["booking_duration"],
+                        exclude_booking_id=booking.id,
+                    )
+                    if conflicts:
+                        return conflict_response(conflicts)
+                    serializer.save()
                 # Log the update (example)
                 # logger.info(f"Booking {booking_id} updated by user {request.user.id}")
                 return JsonResponse(serializer.data, status=200)
@@ -88,6 +387,8 @@ def update_booking(request, booking_id):
                 return JsonResponse(serializer.errors, status=400)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format."}, status=400)
+        except VenueLockTimeout:
+            return lock_timeout_response()
         except VenueBooking.DoesNotExist:  # Specific exception
             return JsonResponse({"error": "Booking not found."}, status=404)
         except Exception as e:
@@ -115,10 +416,15 @@ def delete_booking(request, booking_id):
                     status=400,
                 )
 
-            booking.delete()
+            # The freed slot goes to the waitlist in the same transaction
+            with locked_venues(booking.venue_id):
+                booking.delete()
+                promote(booking.venue_id, booking.booking_date, booking.booking_end)
             return JsonResponse(
                 {"message": "Booking deleted successfully."}, status=200
             )
+        except VenueLockTimeout:
+            return lock_timeout_response()
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Only DELETE method is allowed."}, status=405)
@@ -1,24 +1,27 @@
 from django.http import JsonResponse
 
 
-def check_user_permission(required_role, p1, p2):
-    def decorator(view_func):
-        def wrapper(request, *args, **kwargs):
-            # Check if user is logged in
-            if not request.session.get("user_id"):
-                return JsonResponse({"message": "Unauthorized"}, status=401)
+def has_permission(request, required_role, p1, p2):
+    """Whether the logged-in user has `required_role` or the (p1, p2) permission"""
+    if not request.session.get("user_id"):
+        return False
 
-            # Check role or permission
-            user_role = request.session.get("role")
-            user_permissions = request.session.get("permissions", [])
+    # Check role or permission
+    user_role = request.session.get("role")
+    user_permissions = request.session.get("permissions", [])
 
-            if user_role in required_role:
-                return view_func(request, *args, **kwargs)
+    if user_role in required_role:
+        return True
+
+    return any(
+        perm.get("P1") == p1 and perm.get("P2") == p2 for perm in user_permissions
+    )
 
-            if any(
-                perm.get("P1") == p1 and perm.get("P2") == p2
-                for perm in user_permissions
-            ):
+
+def check_user_permission(required_role, p1, p2):
+    def decorator(view_func):
+        def wrapper(request, *args, **kwargs):
+            if has_permission(request, required_role, p1, p2):
                 return view_func(request, *args, **kwargs)
 
             return JsonResponse({"message": "Unauthorized"}, status=401)
@@ -0,0 +1,17 @@
+from django.utils import timezone
+
+
+def datetime_formatter():
+    """
+    Return a function formatting datetimes the way DRF's DateTimeField does,
+    resolving the current timezone once instead of per value.
+    """
+    current_timezone = timezone.get_current_timezone()
+
+    def format_datetime(value):
+        formatted = value.astimezone(current_timezone).isoformat()
+        if formatted.endswith("+00:00"):
+            formatted = formatted[:-6] + "Z"
+        return formatted
+
+    return format_datetime
@@ -0,0 +1,97 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from django.utils import timezone
+
+PRODID = "-//SW-VISTA//Venue Bookings//EN"
+
+
+def escape_text(value):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Fold a content line to 75 octets, continuation lines starting with a space"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 sequence
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_header(name):
+    return (
+        fold("BEGIN:VCALENDAR")
+        + fold("VERSION:2.0")
+        + fold(f"PRODID:{PRODID}")
+        + fold("CALSCALE:GREGORIAN")
+        + fold(f"X-WR-CALNAME:{escape_text(name)}")
+    )
+
+
+def calendar_footer():
+    return fold("END:VCALENDAR")
+
+
+def event(uid, start, end, summary, location, confirmed, last_modified, extra_lines=()):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{format_utc(last_modified)}",
+        f"LAST-MODIFIED:{format_utc(last_modified)}",
+        f"DTSTART:{format_utc(start)}",
+        f"DTEND:{format_utc(end)}",
+        f"SUMMARY:{escape_text(summary)}",
+        f"LOCATION:{escape_text(location)}",
+        f"STATUS:{'CONFIRMED' if confirmed else 'TENTATIVE'}",
+        *extra_lines,
+        "END:VEVENT",
+    ]
+    return "".join(fold(line) for line in lines)
+
+
+def recurrence_lines(series):
+    """RRULE and EXDATE lines describing a BookingSeries"""
+    rule = f"RRULE:FREQ={series.frequency.upper()};INTERVAL={series.interval}"
+    # RFC 5545 forbids COUNT and UNTIL in the same rule; when a series has
+    # both, whichever ends it first becomes the count
+    if series.count and series.until:
+        rule += f";COUNT={series.last_index() + 1}"
+    elif series.count:
+        rule += f";COUNT={series.count}"
+    elif series.until:
+        rule += f";UNTIL={format_utc(series.until)}"
+    lines = [rule]
+    if series.exceptions:
+        start_time = timezone.localtime(series.start).time()
+        excluded = [
+            format_utc(
+                timezone.make_aware(
+                    datetime.combine(datetime.fromisoformat(day).date(), start_time)
+                )
+            )
+            for day in series.exceptions
+        ]
+        lines.append(f"EXDATE:{','.join(excluded)}")
+    return lines
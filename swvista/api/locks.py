@@ -0,0 +1,54 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from django.db.models import F
+
+from .models.venue import Venue
+
+
+class VenueLockTimeout(Exception):
+    """Another request held a venue lock for longer than BOOKING_LOCK_TIMEOUT_MS"""
+
+
+@contextmanager
+def locked_venues(*venue_ids):
+    """
+    Transaction holding exclusive locks on the given venues, so a conflict
+    check and the write that follows it cannot interleave with another
+    request booking the same venue. Venues are locked in id order so
+    multi-venue requests cannot deadlock each other.
+    """
+    with transaction.atomic():
+        venue_ids = sorted(set(venue_ids))
+        if venue_ids:
+            try:
+                _lock(venue_ids)
+            except OperationalError as e:
+                raise VenueLockTimeout(
+                    "Venue is busy with another booking request."
+                ) from e
+        yield
+
+
+def _lock(venue_ids):
+    timeout_ms = int(settings.BOOKING_LOCK_TIMEOUT_MS)
+    if connection.vendor == "sqlite":
+        # SQLite has no row locks. Writing takes its database-wide write lock
+        # for the rest of the transaction, waiting up to busy_timeout for it.
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA busy_timeout = {timeout_ms}")
+        Venue.objects.filter(id__in=venue_ids).update(id=F("id"))
+        return
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('lock_timeout', %s, true)", [f"{timeout_ms}ms"]
+            )
+    list(
+        Venue.objects.select_for_update()
+        .filter(id__in=venue_ids)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ...models import VenueBooking
+from ...scheduling import booking_end
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute booking_end (booking_date + booking_duration) on every "
+        "booking and fix the rows where it is missing or wrong. save() and "
+        "bulk_create() fill it in for new rows. Run this right after the "
+        "migration adding the column: makemigrations asks for a one-off "
+        "default for the existing rows, and the conflict checks trust "
+        "booking_end until this has replaced that default."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        if chunk_size < 1:
+            raise CommandError("Expected --chunk-size of at least 1.")
+        checked = updated = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                # Walked in id order, a chunk at a time, so every row is
+                # checked once however many need fixing
+                chunk = list(
+                    VenueBooking.objects.filter(id__gt=last_id)
+                    .order_by("id")
+                    .only("id", "booking_date", "booking_duration", "booking_end")[
+                        :chunk_size
+                    ]
+                )
+                if not chunk:
+                    break
+                stale = []
+                for booking in chunk:
+                    end = booking_end(booking.booking_date, booking.booking_duration)
+                    if booking.booking_end != end:
+                        booking.booking_end = end
+                        stale.append(booking)
+                VenueBooking.objects.bulk_update(stale, ["booking_end"])
+            checked += len(chunk)
+            updated += len(stale)
+            last_id = chunk[-1].id
+        self.stdout.write(f"Checked {checked} bookings, fixed booking_end on {updated}")
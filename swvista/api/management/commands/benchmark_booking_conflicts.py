@@ -0,0 +1,98 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rbac.models import Role, User
+
+from ...models import Venue, VenueBooking
+from ...scheduling import booking_end
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark venue booking conflict detection against a full scan. "
+        "Seeds one venue with synthetic bookings inside a transaction that is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=100_000)
+        parser.add_argument("--lookups", type=int, default=200)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        with transaction.atomic():
+            venue = self._seed(rng, options["bookings"])
+            windows = [self._random_window(rng) for _ in range(options["lookups"])]
+
+            started = time.perf_counter()
+            indexed = [
+                VenueBooking.objects.find_conflicts(venue, start, duration)
+                for start, duration in windows
+            ]
+            indexed_elapsed = time.perf_counter() - started
+
+            started = time.perf_counter()
+            scanned = [
+                self._full_scan(venue, start, duration) for start, duration in windows
+            ]
+            scan_elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+
+        if indexed != scanned:
+            self.stderr.write("Indexed lookup disagrees with the full scan!")
+        lookups = options["lookups"]
+        self.stdout.write(
+            f"{options['bookings']} bookings, {lookups} lookups\n"
+            f"  indexed range query: {indexed_elapsed / lookups * 1000:.3f} ms/lookup\n"
+            f"  full scan:           {scan_elapsed / lookups * 1000:.3f} ms/lookup"
+        )
+
+    def _seed(self, rng, count):
+        role = Role.objects.create(name="benchmark-role", description="")
+        user = User.objects.create(
+            username="benchmark-user", name="benchmark", role=role
+        )
+        venue = Venue.objects.create(
+            name="benchmark-venue", address="", description="", capacity=100
+        )
+        self.origin = timezone.now().replace(minute=0, second=0, microsecond=0)
+        bookings = []
+        for slot in range(count):
+            # Mostly back-to-back hour slots with a few gaps and short bookings
+            start = self.origin + timedelta(hours=slot)
+            duration = rng.choice([30, 45, 60])
+            bookings.append(
+                VenueBooking(
+                    requester=user,
+                    venue=venue,
+                    booking_date=start,
+                    booking_duration=duration,
+                    status=rng.choice(
+                        [VenueBooking.STATUS_PENDING, VenueBooking.STATUS_APPROVED]
+                    ),
+                )
+            )
+        VenueBooking.objects.bulk_create(bookings, batch_size=5000)
+        self.span_hours = count
+        return venue
+
+    def _random_window(self, rng):
+        start = self.origin + timedelta(minutes=rng.randrange(self.span_hours * 60))
+        return start, rng.choice([15, 60, 180])
+
+    def _full_scan(self, venue, start, duration):
+        end = booking_end(start, duration)
+        return [
+            booking_id
+            for booking_id, booking_start, stored_end in VenueBooking.objects.active()
+            .filter(venue=venue)
+            .order_by("booking_date")
+            .values_list("id", "booking_date", "booking_end")
+            if booking_start < end and stored_end > start
+        ]
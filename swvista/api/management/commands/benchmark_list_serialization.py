@@ -0,0 +1,148 @@
+import random
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+from rbac.models import Role, User
+
+from ...models import BookingApproval, Proposal, Venue, VenueBooking
+
+# List endpoints served through api.values_serializers, relative to /api/v1/
+ENDPOINTS = [
+    "api/booking/get-all/",
+    "api/booking/get-all/?fields=id,venue_name,booking_date,status_display",
+    "api/approvals/get-pending/",
+    "api/venue/get-all/",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the .values() fast path of the hot list endpoints against "
+        "DRF serializers: seed --bookings bookings over --venues venues, fetch "
+        "each endpoint --repeat times both ways and check the responses are "
+        "byte-identical. Runs inside a transaction that is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=2_000)
+        parser.add_argument("--venues", type=int, default=200)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        # Every seeded row in one page, past the usual ?limit= cap
+        limit = max(options["bookings"], options["venues"])
+        with transaction.atomic(), override_settings(PAGINATION_MAX_PAGE_SIZE=limit):
+            client = self._login()
+            self._seed(options)
+            results = [
+                (endpoint, *self._compare(client, endpoint, limit, options["repeat"]))
+                for endpoint in ENDPOINTS
+            ]
+            transaction.set_rollback(True)
+
+        width = max(len(endpoint) for endpoint in ENDPOINTS)
+        self.stdout.write(
+            f"{options['bookings']} bookings, {options['venues']} venues, "
+            f"one page of up to {limit} rows, best of {options['repeat']}"
+        )
+        self.stdout.write(f"{'endpoint':<{width}}  {'DRF ms':>8}  {'fast ms':>8}")
+        differing = []
+        for endpoint, drf_elapsed, fast_elapsed, identical in results:
+            if not identical:
+                differing.append(endpoint)
+            self.stdout.write(
+                f"{endpoint:<{width}}  {drf_elapsed * 1000:>8.1f}  "
+                f"{fast_elapsed * 1000:>8.1f}  {drf_elapsed / fast_elapsed:.1f}x"
+                + ("" if identical else "  DIFFERS")
+            )
+        if differing:
+            raise CommandError(
+                f"{len(differing)} endpoints answer differently on the fast path."
+            )
+        self.stdout.write(self.style.SUCCESS("Responses are byte-identical"))
+
+    def _compare(self, client, endpoint, limit, repeat):
+        separator = "&" if "?" in endpoint else "?"
+        path = f"/api/v1/{endpoint}{separator}limit={limit}"
+        timings = {}
+        for fast in (False, True):
+            with override_settings(FAST_LIST_SERIALIZATION=fast):
+                best = float("inf")
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    best = min(best, time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise CommandError(f"{path} answered {response.status_code}")
+                timings[fast] = best, response.content
+        return (
+            timings[False][0],
+            timings[True][0],
+            timings[False][1] == timings[True][1],
+        )
+
+    def _login(self):
+        role = Role.objects.create(name="benchmark-admin", description="")
+        self.user = User.objects.create(
+            username="benchmark-admin", name="benchmark", role=role
+        )
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host[0] not in "*."),
+            "localhost",
+        )
+        client = Client(HTTP_HOST=host)
+        session = client.session
+        session["user_id"] = self.user.id
+        session["username"] = "admin"
+        session["role"] = settings.APPROVAL_DEFAULT_STAGE_ROLES[0]
+        session["permissions"] = []
+        session.save()
+        return client
+
+    def _seed(self, options):
+        rng = random.Random(options["seed"])
+        venues = Venue.objects.bulk_create(
+            Venue(
+                name=f"benchmark-{index}",
+                address=f"{index} Campus Road",
+                description="Seminar hall",
+                capacity=rng.randrange(10, 500),
+                latitude=12.5 + rng.random() if index % 3 else None,
+                longitude=77.0 + rng.random() if index % 3 else None,
+                image=f"venues/benchmark-{index}.png" if index % 2 else None,
+            )
+            for index in range(options["venues"])
+        )
+        origin = timezone.now() + timedelta(days=1)
+        proposals = Proposal.objects.bulk_create(
+            Proposal(user=self.user, name=f"benchmark-{index}", requested_date=origin)
+            for index in range(20)
+        )
+        bookings = VenueBooking.objects.bulk_create(
+            VenueBooking(
+                requester=self.user,
+                venue=rng.choice(venues),
+                proposal=rng.choice(proposals) if index % 4 == 0 else None,
+                event_type=rng.choice(VenueBooking.EVENT_TYPE)[0],
+                booking_date=origin + timedelta(minutes=30 * index),
+                booking_duration=rng.randrange(15, 240),
+            )
+            for index in range(options["bookings"])
+        )
+        # A third decided, so the last_* summary is filled in for some rows
+        decided = [booking.id for booking in bookings[::3]]
+        VenueBooking.objects.filter(id__in=decided).update(
+            status=VenueBooking.STATUS_APPROVED,
+            last_approver=self.user,
+            last_decision=BookingApproval.APPROVAL_STATUS[1][0],
+            last_comment="Looks fine",
+            last_decided_at=timezone.now(),
+        )
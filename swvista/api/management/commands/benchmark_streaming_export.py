@@ -0,0 +1,152 @@
+import os
+import resource
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.http import JsonResponse
+from django.test import Client
+from django.utils import timezone
+from rbac.models import Role, User
+
+from ...models import Venue, VenueBooking
+from ...serializers import VenueBookingSerializer
+from ...values_serializers import serialize_all
+
+SEED_BATCH_SIZE = 10_000
+
+
+def _rss_mb():
+    """Resident set size now, or the peak where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the memory of streaming booking/export/: seed --rows "
+        "bookings, stream them all and sample the resident set size as the "
+        "response is written. For comparison, the first --buffered-rows are "
+        "then serialized into one list and JsonResponse (0 skips this). Runs "
+        "inside a transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--buffered-rows", type=int, default=100_000)
+        parser.add_argument("--samples", type=int, default=10)
+
+    def handle(self, *args, **options):
+        rows, samples = options["rows"], options["samples"]
+        if rows < 1 or samples < 1:
+            raise CommandError("Expected --rows and --samples of at least 1.")
+        with transaction.atomic():
+            client = self._login()
+            started = time.perf_counter()
+            self._seed(rows)
+            self.stdout.write(
+                f"Seeded {rows} bookings in {time.perf_counter() - started:.1f} s"
+            )
+            self._stream(client, VenueBooking.objects.count(), samples)
+            if options["buffered_rows"]:
+                self._buffered(min(options["buffered_rows"], rows))
+            transaction.set_rollback(True)
+
+    def _stream(self, client, rows, samples):
+        before = _rss_mb()
+        started = time.perf_counter()
+        response = client.get("/api/v1/api/booking/export/")
+        if response.status_code != 200:
+            raise CommandError(f"booking/export/ answered {response.status_code}")
+        written = streamed = 0
+        peak = before
+        readings = []
+        for chunk in response.streaming_content:
+            written += len(chunk)
+            streamed += chunk.count(b'{"id": ')
+            peak = max(peak, _rss_mb())
+            if streamed >= rows * (len(readings) + 1) / samples:
+                readings.append((streamed, _rss_mb()))
+        response.close()
+        elapsed = time.perf_counter() - started
+        if streamed != rows:
+            raise CommandError(f"Streamed {streamed} of {rows} bookings.")
+
+        self.stdout.write(
+            f"Streamed {streamed} bookings ({written / 2**20:.1f} MB of JSON) "
+            f"in {elapsed:.1f} s"
+        )
+        self.stdout.write(f"{'rows':>10}  {'RSS MB':>8}")
+        self.stdout.write(f"{0:>10}  {before:>8.1f}")
+        for count, rss in readings:
+            self.stdout.write(f"{count:>10}  {rss:>8.1f}")
+        self.stdout.write(
+            f"Peak RSS while streaming: {peak:.1f} MB ({peak - before:+.1f} MB)"
+        )
+
+    def _buffered(self, rows):
+        before = _rss_mb()
+        started = time.perf_counter()
+        bookings = VenueBooking.objects.order_by("booking_date", "id")[:rows]
+        data = list(
+            serialize_all(
+                bookings, VenueBookingSerializer, {"include_approvals": False}
+            )
+        )
+        response = JsonResponse(data, safe=False)
+        after = _rss_mb()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Buffered {len(data)} bookings ({len(response.content) / 2**20:.1f} MB "
+            f"of JSON) in {elapsed:.1f} s: RSS {before:.1f} -> {after:.1f} MB "
+            f"({after - before:+.1f} MB)"
+        )
+
+    def _login(self):
+        role = Role.objects.create(name="export-benchmark-admin", description="")
+        self.user = User.objects.create(
+            username="export-benchmark-admin", name="benchmark", role=role
+        )
+        host = next(
+            (host for host in settings.ALLOWED_HOSTS if host[0] not in "*."),
+            "localhost",
+        )
+        client = Client(HTTP_HOST=host)
+        session = client.session
+        session["user_id"] = self.user.id
+        session["username"] = "admin"
+        session["role"] = settings.APPROVAL_DEFAULT_STAGE_ROLES[0]
+        session["permissions"] = []
+        session.save()
+        return client
+
+    def _seed(self, rows):
+        venues = Venue.objects.bulk_create(
+            Venue(
+                name=f"export-benchmark-{index}",
+                address="",
+                description="",
+                capacity=100,
+            )
+            for index in range(100)
+        )
+        origin = timezone.now() + timedelta(days=1)
+        # Seeded a batch at a time, so the rows are not all in memory before
+        # streaming starts either
+        for first in range(0, rows, SEED_BATCH_SIZE):
+            VenueBooking.objects.bulk_create(
+                VenueBooking(
+                    requester=self.user,
+                    venue=venues[index % len(venues)],
+                    event_type=index % 3,
+                    booking_date=origin + timedelta(minutes=index),
+                    booking_duration=30,
+                )
+                for index in range(first, min(first + SEED_BATCH_SIZE, rows))
+            )
@@ -0,0 +1,88 @@
+import random
+import time
+from heapq import nsmallest
+
+from django.core.management.base import BaseCommand
+
+from ...venue_index import SpatialIndex, VenueEntry, haversine_km
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the venue spatial index against a full scan for radius and "
+        "k-nearest searches over synthetic venues (no database access)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--venues", type=int, default=10_000)
+        parser.add_argument("--queries", type=int, default=1_000)
+        parser.add_argument("--radius", type=float, default=2.0)
+        parser.add_argument("--k", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # Venues scattered over a ~100 km square around a campus
+        entries = [
+            VenueEntry(
+                rng.randrange(10, 1000),
+                venue_id,
+                f"venue-{venue_id}",
+                12.5 + rng.random(),
+                77.0 + rng.random(),
+            )
+            for venue_id in range(options["venues"])
+        ]
+        points = [
+            (12.5 + rng.random(), 77.0 + rng.random())
+            for _ in range(options["queries"])
+        ]
+        radius, k = options["radius"], options["k"]
+
+        started = time.perf_counter()
+        index = SpatialIndex(entries)
+        build_elapsed = time.perf_counter() - started
+
+        indexed_radius, radius_elapsed = self._time(
+            lambda lat, lng: index.within_radius(lat, lng, radius), points
+        )
+        scanned_radius, scan_radius_elapsed = self._time(
+            lambda lat, lng: self._scan_radius(entries, lat, lng, radius), points
+        )
+        indexed_nearest, nearest_elapsed = self._time(
+            lambda lat, lng: index.nearest(lat, lng, k), points
+        )
+        scanned_nearest, scan_nearest_elapsed = self._time(
+            lambda lat, lng: self._scan_nearest(entries, lat, lng, k), points
+        )
+
+        if indexed_radius != scanned_radius or indexed_nearest != scanned_nearest:
+            self.stderr.write("Spatial index disagrees with the full scan!")
+        queries = len(points)
+        self.stdout.write(
+            f"{len(entries)} venues, {queries} queries "
+            f"(index built in {build_elapsed * 1000:.1f} ms)\n"
+            f"  radius {radius} km: index {radius_elapsed / queries * 1000:.3f} ms/query, "
+            f"full scan {scan_radius_elapsed / queries * 1000:.3f} ms/query\n"
+            f"  {k} nearest:      index {nearest_elapsed / queries * 1000:.3f} ms/query, "
+            f"full scan {scan_nearest_elapsed / queries * 1000:.3f} ms/query"
+        )
+
+    def _time(self, search, points):
+        started = time.perf_counter()
+        results = [search(lat, lng) for lat, lng in points]
+        return results, time.perf_counter() - started
+
+    def _distances(self, entries, lat, lng):
+        return [
+            (haversine_km(lat, lng, entry.latitude, entry.longitude), entry)
+            for entry in entries
+        ]
+
+    def _scan_radius(self, entries, lat, lng, radius):
+        return sorted(
+            pair for pair in self._distances(entries, lat, lng) if pair[0] <= radius
+        )
+
+    def _scan_nearest(self, entries, lat, lng, k):
+        return nsmallest(k, self._distances(entries, lat, lng))
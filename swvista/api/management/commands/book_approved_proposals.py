@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...locks import locked_venues
+from ...proposal_bookings import book_proposals, unbooked_approved
+
+
+class Command(BaseCommand):
+    help = (
+        "Book the events of approved proposals that have no booking or "
+        "waitlist entry yet, e.g. proposals approved outside "
+        "proposal/approve/, in one batch. Run it from cron, or keep it "
+        "running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep running and book every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            proposals = list(unbooked_approved())
+            with locked_venues(*(proposal.venue_id for proposal in proposals)):
+                # Proposals booked by someone else while the venues were
+                # being locked drop out here
+                proposals = list(
+                    unbooked_approved().filter(
+                        id__in=[proposal.id for proposal in proposals]
+                    )
+                )
+                outcomes = book_proposals(proposals)
+            if outcomes or options["verbosity"] > 1:
+                booked = sum(
+                    1 for outcome in outcomes.values() if outcome["status"] == "booked"
+                )
+                self.stdout.write(
+                    f"Booked {booked} proposals, waitlisted {len(outcomes) - booked}"
+                )
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
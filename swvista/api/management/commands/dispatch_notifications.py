@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ... import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued booking notifications in batches, one digest per "
+        "recipient, retrying failures with exponential backoff. Run it from "
+        "cron, or keep it running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.NOTIFICATION_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--backend",
+            default=None,
+            help="Dotted path of the backend class (default NOTIFICATION_BACKEND).",
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep running and dispatch every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        backend = notifications.get_backend(options["backend"])
+        while True:
+            # Drain everything that is due before sleeping
+            while True:
+                sent, failed, claimed = notifications.dispatch(
+                    backend, options["batch_size"]
+                )
+                if claimed or options["verbosity"] > 1:
+                    self.stdout.write(
+                        f"Sent {sent} digests ({claimed} notifications), "
+                        f"{failed} failed"
+                    )
+                if claimed < options["batch_size"]:
+                    break
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
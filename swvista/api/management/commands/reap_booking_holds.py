@@ -0,0 +1,62 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ...locks import VenueLockTimeout, locked_venues
+from ...models import BookingHold
+from ...waitlist import promote
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired booking holds and promote the waitlist behind them. "
+        "Expired holds already stop blocking their slot, but waiting entries "
+        "are only promoted when a hold is reaped. Run it from cron, or keep "
+        "it running with --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=None,
+            help="Keep running and reap every N seconds.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            reaped = self.reap()
+            if reaped or options["verbosity"] > 1:
+                self.stdout.write(f"Reaped {reaped} expired holds")
+            if not options["every"]:
+                return
+            time.sleep(options["every"])
+
+    def reap(self):
+        """Reap expired holds one venue at a time, under that venue's lock"""
+        reaped = 0
+        venue_ids = list(
+            BookingHold.objects.expired()
+            .order_by()
+            .values_list("venue_id", flat=True)
+            .distinct()
+        )
+        for venue_id in venue_ids:
+            try:
+                with locked_venues(venue_id):
+                    # Re-read under the lock: the holds may have been released
+                    holds = list(
+                        BookingHold.objects.expired()
+                        .filter(venue_id=venue_id)
+                        .order_by("booking_date")
+                    )
+                    BookingHold.objects.filter(
+                        id__in=[hold.id for hold in holds]
+                    ).delete()
+                    for hold in holds:
+                        promote(venue_id, hold.booking_date, hold.booking_end)
+            except VenueLockTimeout:
+                # Busy venue: its holds are reaped on the next run
+                continue
+            reaped += len(holds)
+        return reaped
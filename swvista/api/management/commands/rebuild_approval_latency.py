@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ... import approval_latency
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the ApprovalLatencyWeekly rollup from the approval records. "
+        "The rollup is kept up to date as bookings are reviewed; run this after "
+        "bulk imports or raw SQL edits, ideally while no one is reviewing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = approval_latency.rebuild(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Rebuilt {rows} approval latency rows")
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from ...models import BookingApproval, VenueBooking
+
+
+def _summary_of(approvals):
+    """Summary field updates taken from the latest of `approvals`"""
+    latest = approvals.filter(booking=OuterRef("pk")).order_by("-approval_date", "-id")
+    return {
+        "last_approver_id": Subquery(latest.values("approver_id")[:1]),
+        "last_decision": Subquery(latest.values("status")[:1]),
+        "last_comment": Subquery(latest.values("comments")[:1]),
+        # Records from before decided_at existed fall back to approval_date
+        "last_decided_at": Subquery(
+            latest.annotate(decided=Coalesce("decided_at", "approval_date")).values(
+                "decided"
+            )[:1]
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the last_* decision summary of every booking from its latest "
+        "reviewer decision, or its automatic approvals if no one reviewed it "
+        "yet. Reviews keep the summary up to date; run this once after adding "
+        "the columns, or after editing approval records by hand."
+    )
+
+    def handle(self, *args, **options):
+        updated = VenueBooking.objects.update(
+            **_summary_of(BookingApproval.objects.all())
+        )
+        reviewed = BookingApproval.objects.filter(approver__isnull=False)
+        VenueBooking.objects.filter(
+            Exists(reviewed.filter(booking=OuterRef("pk")))
+        ).update(**_summary_of(reviewed))
+        self.stdout.write(f"Updated the decision summary of {updated} bookings")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from ... import usage
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the VenueDailyUsage rollup from the bookings table. The rollup "
+        "is kept up to date as bookings change; run this after bulk imports or "
+        "raw SQL edits, ideally while bookings are not being written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        rows = usage.rebuild(chunk_size=options["chunk_size"])
+        self.stdout.write(f"Rebuilt {rows} venue usage rows")
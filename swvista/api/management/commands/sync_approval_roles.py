@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...pipelines import sync_approval_roles
+
+
+class Command(BaseCommand):
+    help = (
+        "Set the approval role of every pending booking from its approval "
+        "pipeline. Pipeline edits do this automatically; run it once after "
+        "adding the approval_role column, or after editing pipelines outside "
+        "the ORM."
+    )
+
+    def handle(self, *args, **options):
+        updated = sync_approval_roles()
+        self.stdout.write(f"Updated the approval role of {updated} pending bookings")
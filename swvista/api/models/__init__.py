@@ -1,6 +1,30 @@
+from .approval_latency import ApprovalLatencyWeekly
+from .approval_pipeline import ApprovalPipeline, ApprovalStage
 from .booking_approval import BookingApproval
+from .booking_hold import BookingHold
+from .booking_series import BookingSeries
+from .club import Club
+from .club_members import ClubMember
+from .notification_outbox import NotificationOutbox
 from .proposal import Proposal
 from .venue import Venue
+from .venue_daily_usage import VenueDailyUsage
 from .venuebooking import VenueBooking
+from .waitlist_entry import WaitlistEntry
 
-__all__ = ["Venue", "Proposal", "VenueBooking", "BookingApproval"]
+__all__ = [
+    "Venue",
+    "Proposal",
+    "VenueBooking",
+    "BookingApproval",
+    "BookingSeries",
+    "BookingHold",
+    "VenueDailyUsage",
+    "ApprovalPipeline",
+    "ApprovalStage",
+    "ApprovalLatencyWeekly",
+    "NotificationOutbox",
+    "WaitlistEntry",
+    "Club",
+    "ClubMember",
+]
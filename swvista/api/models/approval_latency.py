@@ -0,0 +1,61 @@
+from django.db import models
+
+from .venue import Venue
+
+# Upper bounds in seconds of the time-in-stage histogram buckets; a last
+# bucket counts everything longer
+HOUR = 3600
+LATENCY_BUCKETS = [
+    60,
+    5 * 60,
+    15 * 60,
+    30 * 60,
+    HOUR,
+    2 * HOUR,
+    4 * HOUR,
+    8 * HOUR,
+    12 * HOUR,
+    24 * HOUR,
+    36 * HOUR,
+    48 * HOUR,
+    72 * HOUR,
+    96 * HOUR,
+    120 * HOUR,
+    168 * HOUR,
+    336 * HOUR,
+    720 * HOUR,
+]
+
+
+def empty_latency_histogram():
+    return [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+class ApprovalLatencyWeekly(models.Model):
+    """
+    Pre-aggregated time bookings spent in one approval stage before a
+    reviewer decided it, per venue, reviewing role and local week (starting
+    Monday) of the decision. Automatic approvals are not counted. Maintained
+    by api.approval_latency as decisions are recorded, and rebuilt by the
+    rebuild_approval_latency command.
+    """
+
+    venue = models.ForeignKey(
+        Venue, on_delete=models.CASCADE, related_name="approval_latency"
+    )
+    week = models.DateField()
+    approver_role = models.CharField(max_length=255)
+    stage = models.IntegerField()
+    decision_count = models.IntegerField(default=0)
+    total_seconds = models.BigIntegerField(default=0)
+    # Decisions per LATENCY_BUCKETS bucket
+    histogram = models.JSONField(default=empty_latency_histogram)
+
+    class Meta:
+        unique_together = ["venue", "week", "approver_role", "stage"]
+        indexes = [models.Index(fields=["week"], name="latency_week_idx")]
+
+    def __str__(self):
+        return (
+            f"{self.venue.name} - {self.week} {self.approver_role} stage {self.stage}"
+        )
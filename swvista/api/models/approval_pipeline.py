@@ -0,0 +1,54 @@
+from django.db import models
+
+from .venue import Venue
+from .venuebooking import VenueBooking
+
+
+class ApprovalPipeline(models.Model):
+    """
+    The approval stages a booking of one event type goes through, optionally
+    for one venue only. A venue-specific pipeline wins over the event type's
+    default (venue left empty); without either, the default pipeline from
+    APPROVAL_DEFAULT_STAGE_ROLES applies. A pipeline needs at least one stage.
+    """
+
+    name = models.CharField(max_length=255)
+    event_type = models.IntegerField(choices=VenueBooking.EVENT_TYPE)
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, null=True, blank=True)
+    # Touched whenever the pipeline or one of its stages changes, so the
+    # in-process pipeline cache can tell it is stale
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ["event_type", "venue"]
+
+    def __str__(self):
+        return self.name
+
+
+class ApprovalStage(models.Model):
+    """
+    One stage of an ApprovalPipeline, reviewed by users with `approver_role`.
+
+    A stage with auto-approve limits is skipped (approved automatically)
+    for bookings within all of the limits that are set.
+    """
+
+    pipeline = models.ForeignKey(
+        ApprovalPipeline, on_delete=models.CASCADE, related_name="stages"
+    )
+    position = models.PositiveIntegerField()
+    approver_role = models.CharField(max_length=255)
+    auto_approve_max_duration = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Booking length in minutes"
+    )
+    auto_approve_max_capacity = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Venue capacity"
+    )
+
+    class Meta:
+        unique_together = ["pipeline", "position"]
+        ordering = ["position"]
+
+    def __str__(self):
+        return f"{self.pipeline.name} - stage {self.position} ({self.approver_role})"
@@ -2,17 +2,57 @@ from django.db import models
 
 
 class BookingApproval(models.Model):
+    """
+    One decision on one approval stage of a booking or of a recurring
+    booking series. Records are only ever inserted, so the full history is
+    kept; the current state lives on VenueBooking (or BookingSeries) itself.
+    """
+
     APPROVAL_STATUS = [(0, "Pending"), (1, "Approved"), (2, "Rejected")]
 
+    # Exactly one of booking and series is set
     booking = models.ForeignKey(
-        "api.venuebooking", on_delete=models.CASCADE, related_name="approvals"
+        "api.venuebooking",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="approvals",
+    )
+    series = models.ForeignKey(
+        "api.bookingseries",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="approvals",
+    )
+    # Empty for stages the approval pipeline approved automatically
+    approver = models.ForeignKey(
+        "rbac.User", on_delete=models.CASCADE, null=True, blank=True
     )
-    approver = models.ForeignKey("rbac.User", on_delete=models.CASCADE)
     stage = models.IntegerField()
     status = models.IntegerField(choices=APPROVAL_STATUS, default=0)
     comments = models.TextField(blank=True, null=True)
-    approval_date = models.DateTimeField(auto_now=True)
+    approval_date = models.DateTimeField(auto_now_add=True)
+    # Role that reviewed the stage, and when the booking entered and left it
+    approver_role = models.CharField(max_length=255, blank=True, default="")
+    entered_at = models.DateTimeField(null=True, blank=True)
+    decided_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        unique_together = ["booking", "stage"]
-        ordering = ["stage"]
+        ordering = ["approval_date", "id"]
+        indexes = [
+            # A booking's history in order, as one range scan
+            models.Index(
+                fields=["booking", "approval_date"], name="approval_booking_date_idx"
+            ),
+            models.Index(
+                fields=["series", "approval_date"], name="approval_series_date_idx"
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(booking__isnull=False, series__isnull=True)
+                | models.Q(booking__isnull=True, series__isnull=False),
+                name="approval_booking_xor_series",
+            ),
+        ]
@@ -0,0 +1,71 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from ..scheduling import booking_end
+from .proposal import Proposal
+from .venue import Venue
+
+
+class BookingHoldQuerySet(models.QuerySet):
+    def live(self):
+        """Holds that have not expired yet"""
+        return self.filter(expires_at__gt=timezone.now())
+
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+    def overlapping(self, start, end):
+        """Holds overlapping [start, end), bounded like VenueBooking.overlapping"""
+        max_duration = timedelta(minutes=settings.BOOKING_MAX_DURATION_MINUTES)
+        return self.filter(
+            booking_date__gt=start - max_duration,
+            booking_date__lt=end,
+            booking_end__gt=start,
+        )
+
+
+class BookingHold(models.Model):
+    """
+    A short-lived reservation of a venue slot, e.g. while the proposal for
+    an event is being drafted. A live hold blocks the slot like a booking
+    until it expires, is released, or is converted into a VenueBooking.
+    Expired rows are ignored by conflict checks and deleted by the
+    reap_booking_holds command.
+    """
+
+    holder = models.ForeignKey("rbac.User", on_delete=models.CASCADE)
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE)
+    proposal = models.ForeignKey(
+        Proposal, on_delete=models.CASCADE, null=True, blank=True
+    )
+    booking_date = models.DateTimeField()
+    booking_duration = models.IntegerField()
+    booking_end = models.DateTimeField(editable=False)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BookingHoldQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["venue", "booking_date"], name="hold_venue_start_idx"),
+            models.Index(fields=["expires_at"], name="hold_expires_idx"),
+            # Keyset pages of booking/hold/get-mine/
+            models.Index(
+                fields=["holder", "created_at", "id"], name="hold_holder_created_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.booking_end = booking_end(self.booking_date, self.booking_duration)
+        super().save(*args, **kwargs)
+
+    @property
+    def is_live(self):
+        return self.expires_at > timezone.now()
+
+    def __str__(self):
+        return f"{self.venue.name} held until {self.expires_at:%Y-%m-%d %H:%M}"
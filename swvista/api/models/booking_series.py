@@ -0,0 +1,345 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.utils import timezone
+
+from ..scheduling import LRUCache
+from .booking_approval import BookingApproval
+from .proposal import Proposal
+from .venue import Venue
+from .venuebooking import VenueBooking
+
+# Expanded occurrences keyed by (series id, version, window start, window end)
+_expansions = LRUCache(maxsize=settings.BOOKING_SERIES_CACHE_SIZE)
+
+
+class BookingSeriesQuerySet(models.QuerySet):
+    def active(self):
+        """Series that hold their slots (pending or approved)"""
+        return self.filter(
+            status__in=[self.model.STATUS_PENDING, self.model.STATUS_APPROVED]
+        )
+
+    def overlapping(self, start, end):
+        """Series whose first and last occurrences span part of [start, end)"""
+        return self.filter(start__lt=end, series_end__gt=start)
+
+
+class BookingSeries(models.Model):
+    """
+    A recurring booking stored once as a rule (e.g. weekly practice) instead
+    of one VenueBooking row per session. Occurrences are expanded on demand
+    for the window being looked at.
+    """
+
+    FREQUENCY_DAILY = "daily"
+    FREQUENCY_WEEKLY = "weekly"
+
+    FREQUENCY_CHOICES = [
+        (FREQUENCY_DAILY, "Daily"),
+        (FREQUENCY_WEEKLY, "Weekly"),
+    ]
+
+    STATUS_PENDING = VenueBooking.STATUS_PENDING
+    STATUS_APPROVED = VenueBooking.STATUS_APPROVED
+    STATUS_REJECTED = VenueBooking.STATUS_REJECTED
+
+    # Fields that change which occurrences the series expands to
+    RULE_FIELDS = {
+        "start",
+        "duration",
+        "frequency",
+        "interval",
+        "until",
+        "count",
+        "exceptions",
+    }
+
+    requester = models.ForeignKey("rbac.User", on_delete=models.CASCADE)
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE)
+    proposal = models.ForeignKey(
+        Proposal, on_delete=models.CASCADE, null=True, blank=True
+    )
+    event_type = models.IntegerField(choices=VenueBooking.EVENT_TYPE, default=0)
+    approval_stage = models.IntegerField(default=0)
+    # Role reviewing the current stage and when the series reached it, as
+    # on VenueBooking, so pending series share the bookings' approval queue
+    approval_role = models.CharField(
+        max_length=255, blank=True, default="", editable=False
+    )
+    stage_entered_at = models.DateTimeField(null=True, blank=True, editable=False)
+    status = models.IntegerField(
+        choices=VenueBooking.STATUS_CHOICES, default=STATUS_PENDING
+    )
+    rejection_comments = models.TextField(blank=True, null=True)
+    # Start of the first occurrence and length of every occurrence in minutes
+    start = models.DateTimeField()
+    duration = models.IntegerField()
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveIntegerField(default=1)
+    # No occurrence starts after `until`; at most `count` occurrences
+    until = models.DateTimeField(null=True, blank=True)
+    count = models.PositiveIntegerField(null=True, blank=True)
+    # Local dates ("YYYY-MM-DD") of skipped occurrences
+    exceptions = models.JSONField(default=list, blank=True)
+    # End of the last occurrence, stored so series can be range-queried
+    series_end = models.DateTimeField(editable=False)
+    # Bumped whenever the rule changes; keys the expansion cache
+    version = models.PositiveIntegerField(default=1, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = BookingSeriesQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["venue", "start"], name="series_venue_start_idx"),
+            # Keyset pages of series/get-all/
+            models.Index(fields=["start", "id"], name="series_start_id_idx"),
+            # Approval queue: pending series awaiting a role, soonest first
+            models.Index(
+                fields=["status", "approval_role", "start"], name="series_queue_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or self.RULE_FIELDS.intersection(update_fields):
+            self.series_end = self.last_end()
+            if self.pk is not None:
+                self.version += 1
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "series_end", "version"}
+        auto_approved = self.enter_pipeline() if self._enters_pipeline() else ()
+        super().save(*args, **kwargs)
+        if auto_approved:
+            from ..pipelines import auto_approval_records
+
+            BookingApproval.objects.bulk_create(
+                auto_approval_records(
+                    None, auto_approved, self.stage_entered_at, series_id=self.id
+                )
+            )
+
+    def _enters_pipeline(self):
+        return (
+            self._state.adding
+            and self.status == self.STATUS_PENDING
+            and not self.approval_role
+        )
+
+    def _next_transition(self, stage):
+        """Where approving `stage` takes this series in its pipeline"""
+        from ..pipelines import next_transition, stages_for
+
+        return next_transition(
+            stages_for(self.event_type, self.venue_id),
+            stage,
+            self.duration,
+            self.venue.capacity,
+        )
+
+    def enter_pipeline(self):
+        """
+        Place a new series at its first stage that is not auto-approved (or
+        approve it outright), as VenueBooking.enter_pipeline() does. Returns
+        the stages that were skipped.
+        """
+        transition = self._next_transition(self.approval_stage - 1)
+        self.approval_stage = transition.stage
+        self.approval_role = transition.role
+        self.stage_entered_at = timezone.now()
+        if transition.approved:
+            self.status = self.STATUS_APPROVED
+        return transition.auto_approved
+
+    @property
+    def step(self):
+        days = 7 if self.frequency == self.FREQUENCY_WEEKLY else 1
+        return timedelta(days=days * self.interval)
+
+    def occurrence_start(self, index):
+        # Step in local wall time so a 6pm practice stays at 6pm across DST
+        local_start = timezone.localtime(self.start).replace(tzinfo=None)
+        return timezone.make_aware(local_start + index * self.step)
+
+    def last_index(self):
+        """Index of the last occurrence allowed by `count` and `until`"""
+        last = []
+        if self.count:
+            last.append(self.count - 1)
+        if self.until:
+            local_start = timezone.localtime(self.start).replace(tzinfo=None)
+            local_until = timezone.localtime(self.until).replace(tzinfo=None)
+            last.append((local_until - local_start) // self.step)
+        if not last:
+            raise ValidationError("A series needs either 'until' or 'count'.")
+        return max(min(last), 0)
+
+    def last_end(self):
+        return self.occurrence_start(self.last_index()) + timedelta(
+            minutes=self.duration
+        )
+
+    def occurrences(self, window_start, window_end):
+        """(start, end) of each occurrence overlapping [window_start, window_end)"""
+        if self.pk is None:
+            return self._expand(window_start, window_end)
+        key = (self.pk, self.version, window_start, window_end)
+        occurrences = _expansions.get(key)
+        if occurrences is None:
+            occurrences = self._expand(window_start, window_end)
+            _expansions.set(key, occurrences)
+        return occurrences
+
+    def _expand(self, window_start, window_end):
+        duration = timedelta(minutes=self.duration)
+        skipped = set(self.exceptions)
+        # Jump straight to the window; back off one step for DST drift
+        index = max((window_start - duration - self.start) // self.step - 1, 0)
+        last = self.last_index()
+        occurrences = []
+        while index <= last:
+            start = self.occurrence_start(index)
+            if start >= window_end:
+                break
+            end = start + duration
+            if end > window_start and (
+                timezone.localtime(start).date().isoformat() not in skipped
+            ):
+                occurrences.append((start, end))
+            index += 1
+        return tuple(occurrences)
+
+    def _transition(self, status=None, stage=None, role=None, **changes):
+        """Compare-and-swap on (status, approval_stage), as VenueBooking does"""
+        changes["updated_at"] = timezone.now()
+        if status is not None:
+            changes["status"] = status
+        if stage is not None:
+            changes["approval_stage"] = stage
+            changes["approval_role"] = role
+            changes["stage_entered_at"] = changes["updated_at"]
+        won = BookingSeries.objects.filter(
+            id=self.id,
+            status=self.STATUS_PENDING,
+            approval_stage=self.approval_stage,
+        ).update(**changes)
+        if not won:
+            return False
+        for name, value in changes.items():
+            setattr(self, name, value)
+        from ..approval_queue import invalidate_stage_counts
+
+        transaction.on_commit(invalidate_stage_counts)
+        return True
+
+    def _decision(self, approver, status, comments):
+        """Approval record of the current stage; see VenueBooking._decision()"""
+        return BookingApproval(
+            series=self,
+            stage=self.approval_stage,
+            approver_id=getattr(approver, "pk", approver),
+            approver_role=self.approval_role,
+            status=status,
+            comments=comments,
+            entered_at=self.stage_entered_at or self.created_at,
+            decided_at=timezone.now(),
+        )
+
+    def _record(self, approvals, comments):
+        """
+        Insert approval records, count the reviewed ones' latency and queue
+        the notifications, all in the caller's transaction
+        """
+        from ..approval_latency import LatencyDelta
+        from ..notifications import enqueue_reviews, review_of_series
+
+        BookingApproval.objects.bulk_create(approvals)
+        latency = LatencyDelta()
+        for approval in approvals:
+            if approval.approver_id is not None:
+                latency.add(
+                    self.venue_id,
+                    approval.approver_role,
+                    approval.stage,
+                    approval.entered_at,
+                    approval.decided_at,
+                )
+        latency.save()
+        enqueue_reviews([review_of_series(self, comments)])
+
+    def approve(self, approver, comments=None):
+        """
+        Approve the current stage as `approver` (a User or user ID), and any
+        following stages the approval pipeline auto-approves; approves every
+        occurrence at once. Returns False if the series is no longer pending
+        at that stage.
+        """
+        if self.status != self.STATUS_PENDING:
+            return False
+        transition = self._next_transition(self.approval_stage)
+        decision = self._decision(approver, 1, comments)  # Approved
+        with transaction.atomic():
+            won = self._transition(
+                status=self.STATUS_APPROVED if transition.approved else None,
+                stage=transition.stage,
+                role=transition.role,
+            )
+            if not won:
+                return False
+            from ..pipelines import auto_approval_records
+
+            self._record(
+                [
+                    decision,
+                    *auto_approval_records(
+                        None,
+                        transition.auto_approved,
+                        decision.decided_at,
+                        series_id=self.id,
+                    ),
+                ],
+                comments,
+            )
+        return True
+
+    def reject(self, approver, comments=None):
+        """
+        Reject the series at its current stage as `approver` and promote the
+        waitlist behind its occurrences. Returns False when it is no longer
+        pending at that stage. Raises locks.VenueLockTimeout when the venue
+        stays locked.
+        """
+        if not comments:
+            raise ValidationError("Comments are required when rejecting a series")
+        if self.status != self.STATUS_PENDING:
+            return False
+        from ..locks import locked_venues
+        from ..waitlist import promote
+
+        decision = self._decision(approver, 2, comments)  # Rejected
+        # The freed occurrences go to the waitlist in the same transaction
+        with locked_venues(self.venue_id):
+            if not self._transition(
+                status=self.STATUS_REJECTED, rejection_comments=comments
+            ):
+                return False
+            self._record([decision], comments)
+            promote(self.venue_id, self.start, self.series_end)
+        return True
+
+    def get_approval_history(self):
+        """Get the full approval history"""
+        return self.approvals.all()
+
+    def clean(self):
+        if self.event_type == 2 and self.proposal is None:
+            raise ValidationError(
+                {"proposal": "Proposal is required for event type 'event'."}
+            )
+
+    def __str__(self):
+        return f"{self.venue.name} - {self.get_frequency_display()} from {self.start:%Y-%m-%d}"
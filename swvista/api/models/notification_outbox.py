@@ -0,0 +1,63 @@
+from django.db import models
+from django.utils import timezone
+
+from .venuebooking import VenueBooking
+
+
+class NotificationOutbox(models.Model):
+    """
+    A notification written in the same transaction as the booking (or
+    series) change it reports, and delivered later by the
+    dispatch_notifications command. Payloads are self-contained so they
+    survive the booking being deleted.
+    """
+
+    EVENT_STAGE_ADVANCED = "stage_advanced"
+    EVENT_REVIEW_REQUESTED = "review_requested"
+    EVENT_APPROVED = "approved"
+    EVENT_REJECTED = "rejected"
+    EVENT_WAITLIST_PROMOTED = "waitlist_promoted"
+
+    EVENT_CHOICES = [
+        (EVENT_STAGE_ADVANCED, "Moved to the next approval stage"),
+        (EVENT_REVIEW_REQUESTED, "Waiting for your review"),
+        (EVENT_APPROVED, "Approved"),
+        (EVENT_REJECTED, "Rejected"),
+        (EVENT_WAITLIST_PROMOTED, "Booked from the waitlist"),
+    ]
+
+    STATUS_PENDING = 0
+    STATUS_SENT = 1
+    STATUS_FAILED = 2
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    recipient = models.ForeignKey("rbac.User", on_delete=models.CASCADE)
+    event = models.CharField(max_length=32, choices=EVENT_CHOICES)
+    booking = models.ForeignKey(
+        VenueBooking, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    series = models.ForeignKey(
+        "api.bookingseries", on_delete=models.SET_NULL, null=True, blank=True
+    )
+    payload = models.JSONField(default=dict)
+    status = models.IntegerField(choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    # Not delivered before this; pushed back while a worker holds the row
+    # and after every failed attempt
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_event_display()} for {self.recipient_id}"
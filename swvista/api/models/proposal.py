@@ -1,6 +1,8 @@
 from django.db import models
 from rbac.models import User
 
+from .venue import Venue
+
 
 class Proposal(models.Model):
     PROPOSAL_STATUS = [
@@ -14,9 +16,21 @@ class Proposal(models.Model):
     requested_date = models.DateTimeField(auto_now=False, auto_now_add=False)
     duration_in_minutes = models.IntegerField(default=0)
     attendees = models.IntegerField(default=0)
+    # Venue to book for the event once the proposal is approved
+    venue = models.ForeignKey(Venue, on_delete=models.SET_NULL, null=True, blank=True)
     status = models.IntegerField(choices=PROPOSAL_STATUS, default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pages of proposal/get-all/ and of one user's proposals,
+            # newest first
+            models.Index(fields=["created_at", "id"], name="proposal_created_idx"),
+            models.Index(
+                fields=["user", "created_at", "id"], name="proposal_user_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.name
@@ -0,0 +1,33 @@
+from django.db import models
+
+from .venue import Venue
+
+
+def empty_histogram():
+    return [0] * 24
+
+
+class VenueDailyUsage(models.Model):
+    """
+    Pre-aggregated occupancy of one venue on one local day, counting pending
+    and approved bookings. Maintained incrementally by api.usage whenever a
+    booking is saved or deleted, and rebuilt by the rebuild_venue_usage
+    command.
+    """
+
+    venue = models.ForeignKey(
+        Venue, on_delete=models.CASCADE, related_name="daily_usage"
+    )
+    date = models.DateField()
+    booking_count = models.IntegerField(default=0)
+    booked_minutes = models.IntegerField(default=0)
+    approved_minutes = models.IntegerField(default=0)
+    # Booked minutes within each local hour of the day, 0-23
+    hourly_minutes = models.JSONField(default=empty_histogram)
+
+    class Meta:
+        unique_together = ["venue", "date"]
+        indexes = [models.Index(fields=["date"], name="usage_date_idx")]
+
+    def __str__(self):
+        return f"{self.venue.name} - {self.date}: {self.booked_minutes} min"
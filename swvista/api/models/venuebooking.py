@@ -1,11 +1,103 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
+from ..scheduling import booking_end
 from .booking_approval import BookingApproval
 from .proposal import Proposal
 from .venue import Venue
 
 
+def decision_summary(decision):
+    """VenueBooking summary fields describing a BookingApproval"""
+    return {
+        "last_approver_id": decision.approver_id,
+        "last_decision": decision.status,
+        "last_comment": decision.comments,
+        "last_decided_at": decision.decided_at,
+    }
+
+
+class VenueBookingQuerySet(models.QuerySet):
+    def active(self):
+        """Bookings that hold their slot (pending or approved)"""
+        return self.filter(
+            status__in=[self.model.STATUS_PENDING, self.model.STATUS_APPROVED]
+        )
+
+    def overlapping(self, start, end):
+        """
+        Bookings overlapping [start, end).
+
+        No booking is longer than BOOKING_MAX_DURATION_MINUTES, so the lower
+        bound on booking_date keeps this a bounded range scan over the
+        (venue, booking_date) index instead of every earlier booking.
+        """
+        max_duration = timedelta(minutes=settings.BOOKING_MAX_DURATION_MINUTES)
+        return self.filter(
+            booking_date__gt=start - max_duration,
+            booking_date__lt=end,
+            booking_end__gt=start,
+        )
+
+    def find_conflicts(self, venue, start, duration, exclude_id=None):
+        """Return the IDs of active bookings clashing with the requested slot"""
+        conflicts = (
+            self.active()
+            .filter(venue=venue)
+            .overlapping(start, booking_end(start, duration))
+        )
+        if exclude_id is not None:
+            conflicts = conflicts.exclude(id=exclude_id)
+        return list(conflicts.order_by("booking_date").values_list("id", flat=True))
+
+    def for_listing(self, include_approvals=False):
+        """
+        Everything VenueBookingSerializer reads, in a constant number of
+        queries however many bookings are listed
+        """
+        bookings = self.select_related("venue", "requester", "last_approver")
+        if include_approvals:
+            bookings = bookings.prefetch_related(
+                models.Prefetch(
+                    "approvals",
+                    queryset=BookingApproval.objects.select_related("approver"),
+                )
+            )
+        return bookings
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create bypasses save(), so derive the stored end here as well
+        objs = list(objs)
+        auto_approved = {}
+        for obj in objs:
+            obj.booking_end = booking_end(obj.booking_date, obj.booking_duration)
+            if obj._enters_pipeline():
+                auto_approved[id(obj)] = obj.enter_pipeline()
+        created = super().bulk_create(objs, *args, **kwargs)
+
+        # ...and count them in the daily usage rollup and record their
+        # automatic approvals, which save() does as well
+        from ..pipelines import auto_approval_records
+        from ..usage import UsageDelta
+
+        delta = UsageDelta()
+        approvals = []
+        for obj in created:
+            obj._counted_usage = obj.usage_snapshot()
+            delta.add(obj._counted_usage)
+            approvals += auto_approval_records(
+                obj.id, auto_approved.get(id(obj), ()), obj.stage_entered_at
+            )
+        delta.save()
+        if approvals:
+            BookingApproval.objects.bulk_create(approvals)
+        return created
+
+
 class VenueBooking(models.Model):
     # Your existing fields...
     EVENT_TYPE = [
@@ -33,58 +125,266 @@ class VenueBooking(models.Model):
     # can be updated by the admin
     approval_stage = models.IntegerField(
         default=0,
-    )  # Tracks current approval stage (0-3)
+    )  # Tracks current approval stage of the booking's pipeline
+    # Role reviewing the current stage, copied from the approval pipeline so
+    # the approval queue is a single index range per role
+    approval_role = models.CharField(
+        max_length=255, blank=True, default="", editable=False
+    )
+    # When the booking reached its current stage, for stage latency and SLAs
+    stage_entered_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Latest reviewer decision, kept with every transition so listings need
+    # not load the approval history
+    last_approver = models.ForeignKey(
+        "rbac.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="+",
+    )
+    last_decision = models.IntegerField(
+        choices=BookingApproval.APPROVAL_STATUS, null=True, blank=True, editable=False
+    )
+    last_comment = models.TextField(null=True, blank=True, editable=False)
+    last_decided_at = models.DateTimeField(null=True, blank=True, editable=False)
     status = models.IntegerField(choices=STATUS_CHOICES, default=STATUS_PENDING)
     booking_date = models.DateTimeField()
     booking_duration = models.IntegerField()
+    # booking_date + booking_duration, stored so overlaps can be range-queried.
+    # Rows from before the column existed get the one-off default the
+    # migration asks for; run the backfill_booking_end command right after
+    # it to set their real ends.
+    booking_end = models.DateTimeField(editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    def approve(self, approver, comments=None):
-        """Process an approval at the current stage"""
-        if self.status == self.STATUS_REJECTED:
+    # Fields the daily usage rollup (api.usage) is computed from
+    USAGE_FIELDS = ("venue_id", "booking_date", "booking_duration", "status")
+
+    objects = VenueBookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["venue", "booking_date"], name="booking_venue_start_idx"
+            ),
+            # Keyset pages of booking/get-all/ and approvals/get-pending/
+            models.Index(fields=["booking_date", "id"], name="booking_date_id_idx"),
+            models.Index(
+                fields=["status", "booking_date", "id"], name="booking_status_date_idx"
+            ),
+            # Approval queue: pending bookings awaiting a role, soonest first
+            models.Index(
+                fields=["status", "approval_role", "booking_date"],
+                name="booking_queue_idx",
+            ),
+            # Pending bookings longest in their stage, for SLA breaches
+            models.Index(
+                fields=["status", "stage_entered_at"], name="booking_stage_entered_idx"
+            ),
+            # Cheap max(updated_at) validators for the calendar feeds
+            models.Index(
+                fields=["venue", "updated_at"], name="booking_venue_updated_idx"
+            ),
+            models.Index(
+                fields=["requester", "updated_at"],
+                name="booking_requester_updated_idx",
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the usage rollup counted for this row, so saving or
+        # deleting it can adjust the rollup without re-reading the row
+        if not instance.get_deferred_fields().intersection(cls.USAGE_FIELDS):
+            instance._counted_usage = instance.usage_snapshot()
+        return instance
+
+    def usage_snapshot(self):
+        return tuple(getattr(self, name) for name in self.USAGE_FIELDS)
+
+    def save(self, *args, **kwargs):
+        self.booking_end = booking_end(self.booking_date, self.booking_duration)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            "booking_date" in update_fields or "booking_duration" in update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "booking_end"}
+        auto_approved = self.enter_pipeline() if self._enters_pipeline() else ()
+        super().save(*args, **kwargs)
+        if auto_approved:
+            from ..pipelines import auto_approval_records
+
+            BookingApproval.objects.bulk_create(
+                auto_approval_records(self.id, auto_approved, self.stage_entered_at)
+            )
+
+    def _enters_pipeline(self):
+        return (
+            self._state.adding
+            and self.status == self.STATUS_PENDING
+            and not self.approval_role
+        )
+
+    def _next_transition(self, stage):
+        """Where approving `stage` takes this booking in its pipeline"""
+        from ..pipelines import next_transition, stages_for
+
+        return next_transition(
+            stages_for(self.event_type, self.venue_id),
+            stage,
+            self.booking_duration,
+            self.venue.capacity,
+        )
+
+    def enter_pipeline(self):
+        """
+        Place a new booking at the first stage of its approval pipeline from
+        approval_stage on that it is not auto-approved for (or approve it
+        outright). Returns the stages that were skipped.
+        """
+        transition = self._next_transition(self.approval_stage - 1)
+        self.approval_stage = transition.stage
+        self.approval_role = transition.role
+        self.stage_entered_at = timezone.now()
+        if transition.approved:
+            self.status = self.STATUS_APPROVED
+        if transition.auto_approved:
+            from ..pipelines import AUTO_APPROVAL_COMMENT
+
+            self.last_decision = 1  # Approved
+            self.last_comment = AUTO_APPROVAL_COMMENT
+            self.last_decided_at = self.stage_entered_at
+        return transition.auto_approved
+
+    def _transition(self, status=None, stage=None, role=None, decision=None):
+        """
+        Set `status` and/or move to `stage` (reviewed by `role`), and make
+        `decision` the latest one, but only if the row is still pending at
+        the stage this instance holds (compare-and-swap). Returns whether
+        this call won; if so the instance matches the row.
+        """
+        changes = {"updated_at": timezone.now()}
+        if status is not None:
+            changes["status"] = status
+        if stage is not None:
+            changes["approval_stage"] = stage
+            changes["approval_role"] = role
+            changes["stage_entered_at"] = changes["updated_at"]
+        if decision is not None:
+            changes.update(decision_summary(decision))
+        won = VenueBooking.objects.filter(
+            id=self.id, status=self.STATUS_PENDING, approval_stage=self.approval_stage
+        ).update(**changes)
+        if not won:
             return False
 
-        # Create or update approval record
-        approval, created = BookingApproval.objects.update_or_create(
+        before = self.usage_snapshot()
+        for name, value in changes.items():
+            setattr(self, name, value)
+        # update() bypasses the signals keeping these up to date
+        from ..approval_queue import invalidate_stage_counts
+        from ..usage import record_change
+
+        record_change(before, self.usage_snapshot())
+        self._counted_usage = self.usage_snapshot()
+        transaction.on_commit(invalidate_stage_counts)
+        return True
+
+    def _decision(self, approver, status, comments):
+        """
+        Approval record of the current stage, timed from when the booking
+        entered it. Call before the transition moves the booking on.
+        """
+        return BookingApproval(
             booking=self,
             stage=self.approval_stage,
-            defaults={
-                "approver": approver,
-                "status": 1,  # Approved
-                "comments": comments,
-            },
+            approver_id=getattr(approver, "pk", approver),
+            approver_role=self.approval_role,
+            status=status,
+            comments=comments,
+            entered_at=self.stage_entered_at or self.created_at,
+            decided_at=timezone.now(),
         )
 
-        # If this is the final approval (stage 3, becoming 4)
-        if self.approval_stage == 3:
-            self.status = self.STATUS_APPROVED
-            self.save()
-            return True
+    def _record(self, approvals, comments):
+        """
+        Insert approval records, count the reviewed ones' latency and queue
+        the notifications, all in the caller's transaction
+        """
+        from ..approval_latency import LatencyDelta
+        from ..notifications import enqueue_reviews, review_of
+
+        BookingApproval.objects.bulk_create(approvals)
+        latency = LatencyDelta()
+        for approval in approvals:
+            if approval.approver_id is not None:
+                latency.add(
+                    self.venue_id,
+                    approval.approver_role,
+                    approval.stage,
+                    approval.entered_at,
+                    approval.decided_at,
+                )
+        latency.save()
+        enqueue_reviews([review_of(self, comments)])
+
+    def approve(self, approver, comments=None):
+        """
+        Approve the current stage as `approver` (a User or user ID), along
+        with any following stages the pipeline auto-approves for this
+        booking. Returns False when the booking is no longer pending at that
+        stage, e.g. another approver acted first.
+        """
+        if self.status != self.STATUS_PENDING:
+            return False
+        transition = self._next_transition(self.approval_stage)
+        decision = self._decision(approver, 1, comments)  # Approved
+        with transaction.atomic():
+            won = self._transition(
+                status=self.STATUS_APPROVED if transition.approved else None,
+                stage=transition.stage,
+                role=transition.role,
+                decision=decision,
+            )
+            if not won:
+                return False
+            # Only the winner of the stage writes its approval records
+            from ..pipelines import auto_approval_records
 
-        # Move to next approval stage
-        self.approval_stage += 1
-        self.save()
+            self._record(
+                [
+                    decision,
+                    *auto_approval_records(
+                        self.id, transition.auto_approved, decision.decided_at
+                    ),
+                ],
+                comments,
+            )
         return True
 
     def reject(self, approver, comments=None):
-        """Reject the booking at any stage"""
+        """
+        Reject the booking at its current stage and promote the waitlist
+        behind it. Returns False when it is no longer pending at that stage.
+        Raises locks.VenueLockTimeout when the venue stays locked.
+        """
         if not comments:
             raise ValidationError("Comments are required when rejecting a booking")
+        if self.status != self.STATUS_PENDING:
+            return False
+        from ..locks import locked_venues
+        from ..waitlist import promote
 
-        # Create or update approval record
-        approval, created = BookingApproval.objects.update_or_create(
-            booking=self,
-            stage=self.approval_stage,
-            defaults={
-                "approver": approver,
-                "status": 2,  # Rejected
-                "comments": comments,
-            },
-        )
-
-        self.status = self.STATUS_REJECTED
-        self.save()
+        decision = self._decision(approver, 2, comments)  # Rejected
+        # The freed slot goes to the waitlist in the same transaction
+        with locked_venues(self.venue_id):
+            if not self._transition(status=self.STATUS_REJECTED, decision=decision):
+                return False
+            self._record([decision], comments)
+            promote(self.venue_id, self.booking_date, self.booking_end)
         return True
 
     def get_approval_history(self):
@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+
+from ..scheduling import booking_end
+from .proposal import Proposal
+from .venue import Venue
+from .venuebooking import VenueBooking
+
+
+class WaitlistEntryQuerySet(models.QuerySet):
+    def waiting(self):
+        return self.filter(status=WaitlistEntry.STATUS_WAITING)
+
+    def overlapping(self, start, end):
+        """Entries overlapping [start, end), bounded like VenueBooking.overlapping"""
+        max_duration = timedelta(minutes=settings.BOOKING_MAX_DURATION_MINUTES)
+        return self.filter(
+            booking_date__gt=start - max_duration,
+            booking_date__lt=end,
+            booking_end__gt=start,
+        )
+
+    def in_promotion_order(self):
+        return self.order_by("-priority", "created_at", "id")
+
+
+class WaitlistEntry(models.Model):
+    """
+    A booking request queued behind the bookings, series or holds taking its
+    slot. When one of them is rejected, deleted, released or reaped, the
+    first waiting entry (highest priority, then oldest) whose slot is now
+    free becomes a pending VenueBooking in the same transaction (see
+    api.waitlist).
+    """
+
+    STATUS_WAITING = 0
+    STATUS_PROMOTED = 1
+    STATUS_CANCELLED = 2
+
+    STATUS_CHOICES = [
+        (STATUS_WAITING, "Waiting"),
+        (STATUS_PROMOTED, "Promoted"),
+        (STATUS_CANCELLED, "Cancelled"),
+    ]
+
+    requester = models.ForeignKey("rbac.User", on_delete=models.CASCADE)
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE)
+    proposal = models.ForeignKey(
+        Proposal, on_delete=models.CASCADE, null=True, blank=True
+    )
+    event_type = models.IntegerField(choices=VenueBooking.EVENT_TYPE, default=0)
+    booking_date = models.DateTimeField()
+    booking_duration = models.IntegerField()
+    booking_end = models.DateTimeField(editable=False)
+    # Higher goes first; equal priorities are served oldest first
+    priority = models.IntegerField(default=0)
+    status = models.IntegerField(choices=STATUS_CHOICES, default=STATUS_WAITING)
+    # The booking this entry was promoted to
+    booking = models.OneToOneField(
+        VenueBooking,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="waitlist_entry",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = WaitlistEntryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Promotion: waiting entries of a venue starting in a window, in
+            # the order they are served. Only waiting rows are indexed.
+            models.Index(
+                fields=["venue", "booking_date", "-priority", "created_at"],
+                condition=models.Q(status=0),
+                name="waitlist_promotion_idx",
+            ),
+            models.Index(fields=["requester", "status"], name="waitlist_requester_idx"),
+            # Keyset pages of booking/waitlist/get-mine/
+            models.Index(
+                fields=["requester", "created_at", "id"],
+                name="waitlist_requester_created_idx",
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.booking_end = booking_end(self.booking_date, self.booking_duration)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.venue.name} waitlist - {self.booking_date:%Y-%m-%d %H:%M}"
@@ -0,0 +1,93 @@
+import json
+import urllib.request
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+
+def render_digest(recipient, notifications):
+    """JSON-serializable digest of a recipient's notifications"""
+    return {
+        "recipient": {
+            "id": recipient.id,
+            "username": recipient.username,
+            "email": recipient.email,
+        },
+        "notifications": [
+            {
+                "id": notification.id,
+                "event": notification.event,
+                "created_at": notification.created_at.isoformat(),
+                **notification.payload,
+            }
+            for notification in notifications
+        ],
+    }
+
+
+def _subject(payload):
+    if payload.get("series"):
+        return (
+            f"Series {payload['series']} at {payload['venue']} "
+            f"from {payload['booking_date']}"
+        )
+    return f"Booking {payload['booking']} at {payload['venue']} on {payload['booking_date']}"
+
+
+class MemoryBackend:
+    """
+    Keeps digests in MemoryBackend.outbox instead of sending them, like
+    Django's locmem email backend. For tests and local development.
+    """
+
+    outbox = []
+
+    def send_digest(self, recipient, notifications):
+        MemoryBackend.outbox.append(render_digest(recipient, notifications))
+
+
+class EmailBackend:
+    """
+    One email per digest through Django's EMAIL_BACKEND; the console or
+    locmem email backends make it a local stand-in.
+    """
+
+    def send_digest(self, recipient, notifications):
+        if not recipient.email:
+            return
+        lines = [
+            f"- {_subject(notification.payload)}: "
+            f"{notification.get_event_display()}"
+            + (
+                f" ({notification.payload['comments']})"
+                if notification.payload.get("comments")
+                else ""
+            )
+            for notification in notifications
+        ]
+        send_mail(
+            f"{len(notifications)} booking update(s)",
+            "\n".join(lines),
+            None,
+            [recipient.email],
+        )
+
+
+class WebhookBackend:
+    """
+    POSTs each digest as JSON to NOTIFICATION_WEBHOOK_URL. The
+    notification_sink command runs a local receiver to point it at.
+    """
+
+    def send_digest(self, recipient, notifications):
+        request = urllib.request.Request(
+            settings.NOTIFICATION_WEBHOOK_URL,
+            data=json.dumps(render_digest(recipient, notifications)).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        # Non-2xx responses raise HTTPError, which schedules a retry
+        with urllib.request.urlopen(
+            request, timeout=settings.NOTIFICATION_WEBHOOK_TIMEOUT
+        ):
+            pass
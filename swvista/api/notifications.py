@@ -0,0 +1,190 @@
+import random
+from datetime import timedelta
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rbac.models import User
+
+from .models.notification_outbox import NotificationOutbox
+from .models.venuebooking import VenueBooking
+
+
+class Review(NamedTuple):
+    """
+    A booking (or, with series_id set, a recurring series starting at
+    booking_date) right after one approval step, as the outbox reports it
+    """
+
+    booking_id: Optional[int]
+    requester_id: int
+    venue_name: str
+    booking_date: object
+    status: int
+    # Stage the booking is at now, and the role reviewing it
+    stage: int
+    role: str
+    comments: str
+    series_id: Optional[int] = None
+
+
+def review_of(booking, comments):
+    return Review(
+        booking.id,
+        booking.requester_id,
+        booking.venue.name,
+        booking.booking_date,
+        booking.status,
+        booking.approval_stage,
+        booking.approval_role,
+        comments or "",
+    )
+
+
+def review_of_series(series, comments):
+    return Review(
+        None,
+        series.requester_id,
+        series.venue.name,
+        series.start,
+        series.status,
+        series.approval_stage,
+        series.approval_role,
+        comments or "",
+        series.id,
+    )
+
+
+def enqueue_reviews(reviews, requester_event=None):
+    """
+    Write the outbox rows for approval steps: the requester hears of every
+    step (as `requester_event` when given), and the users with the next
+    stage's role are asked to review. Call inside the transaction making the
+    change, so the notifications are committed (or rolled back) with it.
+    """
+    reviews = list(reviews)
+    waiting_roles = {
+        review.role
+        for review in reviews
+        if review.status == VenueBooking.STATUS_PENDING
+    }
+    reviewers = {}
+    for user_id, role in User.objects.filter(role__name__in=waiting_roles).values_list(
+        "id", "role__name"
+    ):
+        reviewers.setdefault(role, []).append(user_id)
+
+    rows = []
+    for review in reviews:
+        payload = {
+            "booking": review.booking_id,
+            "venue": review.venue_name,
+            "booking_date": review.booking_date.isoformat(),
+            "status": dict(VenueBooking.STATUS_CHOICES)[review.status],
+            "stage": review.stage,
+            "comments": review.comments,
+        }
+        if review.series_id is not None:
+            payload["series"] = review.series_id
+        if review.status == VenueBooking.STATUS_APPROVED:
+            event = NotificationOutbox.EVENT_APPROVED
+        elif review.status == VenueBooking.STATUS_REJECTED:
+            event = NotificationOutbox.EVENT_REJECTED
+        else:
+            event = NotificationOutbox.EVENT_STAGE_ADVANCED
+            rows += [
+                NotificationOutbox(
+                    recipient_id=user_id,
+                    event=NotificationOutbox.EVENT_REVIEW_REQUESTED,
+                    booking_id=review.booking_id,
+                    series_id=review.series_id,
+                    payload=payload,
+                )
+                for user_id in reviewers.get(review.role, ())
+            ]
+        rows.append(
+            NotificationOutbox(
+                recipient_id=review.requester_id,
+                event=requester_event or event,
+                booking_id=review.booking_id,
+                series_id=review.series_id,
+                payload=payload,
+            )
+        )
+    NotificationOutbox.objects.bulk_create(rows)
+
+
+def get_backend(path=None):
+    return import_string(path or settings.NOTIFICATION_BACKEND)()
+
+
+def _claim(batch_size):
+    """
+    Take up to `batch_size` due notifications. They are leased by pushing
+    next_attempt_at NOTIFICATION_LEASE_SECONDS ahead, so other workers skip
+    them and a crashed worker's rows become due again.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationOutbox.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        NotificationOutbox.objects.filter(id__in=ids).update(
+            next_attempt_at=now + timedelta(seconds=settings.NOTIFICATION_LEASE_SECONDS)
+        )
+    return list(
+        NotificationOutbox.objects.filter(id__in=ids)
+        .select_related("recipient")
+        .order_by("created_at", "id")
+    )
+
+
+def retry_delay(attempts):
+    """Exponential backoff with jitter after `attempts` failed attempts"""
+    delay = min(
+        settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.NOTIFICATION_RETRY_MAX_SECONDS,
+    )
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def dispatch(backend, batch_size):
+    """
+    Deliver one batch of due notifications, coalesced into one digest per
+    recipient. Returns (digests sent, digests failed, notifications).
+    """
+    notifications = _claim(batch_size)
+    digests = {}
+    for notification in notifications:
+        digests.setdefault(notification.recipient, []).append(notification)
+
+    sent = failed = 0
+    for recipient, digest in digests.items():
+        ids = [notification.id for notification in digest]
+        try:
+            backend.send_digest(recipient, digest)
+        except Exception as e:
+            failed += 1
+            attempts = max(notification.attempts for notification in digest) + 1
+            NotificationOutbox.objects.filter(id__in=ids).update(
+                attempts=F("attempts") + 1,
+                last_error=str(e)[:1000],
+                next_attempt_at=timezone.now() + retry_delay(attempts),
+            )
+            NotificationOutbox.objects.filter(
+                id__in=ids, attempts__gte=settings.NOTIFICATION_MAX_ATTEMPTS
+            ).update(status=NotificationOutbox.STATUS_FAILED)
+        else:
+            sent += 1
+            NotificationOutbox.objects.filter(id__in=ids).update(
+                status=NotificationOutbox.STATUS_SENT,
+                attempts=F("attempts") + 1,
+                sent_at=timezone.now(),
+            )
+    return sent, failed, len(notifications)
@@ -0,0 +1,179 @@
+import time
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+
+from .approval_queue import invalidate_stage_counts
+from .models.approval_pipeline import ApprovalPipeline, ApprovalStage
+from .models.booking_approval import BookingApproval
+from .models.booking_series import BookingSeries
+from .models.venuebooking import VenueBooking
+
+AUTO_APPROVAL_COMMENT = "Approved automatically by the approval pipeline."
+
+
+class StageSpec(NamedTuple):
+    role: str
+    max_duration: Optional[int] = None
+    max_capacity: Optional[int] = None
+
+    def auto_approves(self, duration, capacity):
+        """Whether a booking within this stage's auto-approve limits skips it"""
+        if self.max_duration is None and self.max_capacity is None:
+            return False
+        return (self.max_duration is None or duration <= self.max_duration) and (
+            self.max_capacity is None or capacity <= self.max_capacity
+        )
+
+
+class Transition(NamedTuple):
+    """Where a booking moves to once a stage is approved"""
+
+    stage: int
+    role: str
+    approved: bool
+    # (stage, role) of the stages skipped on the way by their auto-approve rules
+    auto_approved: tuple
+
+
+def default_pipeline():
+    return tuple(StageSpec(role) for role in settings.APPROVAL_DEFAULT_STAGE_ROLES)
+
+
+# Pipelines by (event_type, venue_id), with the version they were loaded at
+_cache = {"pipelines": None, "version": None, "checked_at": 0.0}
+_cache_lock = Lock()
+
+
+def _version():
+    """Changes whenever a pipeline or stage is added, edited or deleted"""
+    state = ApprovalPipeline.objects.aggregate(
+        count=Count("id"), changed=Max("updated_at")
+    )
+    return state["count"], state["changed"]
+
+
+def _load():
+    pipelines = {}
+    for stage in ApprovalStage.objects.select_related("pipeline").order_by(
+        "pipeline_id", "position"
+    ):
+        key = (stage.pipeline.event_type, stage.pipeline.venue_id)
+        pipelines.setdefault(key, []).append(
+            StageSpec(
+                stage.approver_role,
+                stage.auto_approve_max_duration,
+                stage.auto_approve_max_capacity,
+            )
+        )
+    return {key: tuple(stages) for key, stages in pipelines.items()}
+
+
+def _pipelines():
+    """
+    All pipelines, cached in process. The version is re-checked at most every
+    APPROVAL_PIPELINE_CHECK_SECONDS with one aggregate query, and the
+    pipelines are reloaded only when it changed.
+    """
+    now = time.monotonic()
+    with _cache_lock:
+        pipelines = _cache["pipelines"]
+        if (
+            pipelines is not None
+            and now - _cache["checked_at"] < settings.APPROVAL_PIPELINE_CHECK_SECONDS
+        ):
+            return pipelines
+    # Read the version before the rows: a change in between is picked up by
+    # the next check instead of being cached under the new version
+    version = _version()
+    with _cache_lock:
+        if pipelines is not None and _cache["version"] == version:
+            _cache["checked_at"] = now
+            return pipelines
+    pipelines = _load()
+    with _cache_lock:
+        _cache.update(pipelines=pipelines, version=version, checked_at=now)
+    return pipelines
+
+
+def invalidate_pipelines():
+    with _cache_lock:
+        _cache["pipelines"] = None
+
+
+def stages_for(event_type, venue_id):
+    """Stages of the pipeline for a venue and event type"""
+    pipelines = _pipelines()
+    return (
+        pipelines.get((event_type, venue_id))
+        or pipelines.get((event_type, None))
+        or default_pipeline()
+    )
+
+
+def next_transition(stages, stage, duration, capacity):
+    """
+    Transition of a booking whose `stage` was just approved (-1 for a new
+    booking): on to the next stage it is not auto-approved for, or approved.
+    """
+    auto_approved = []
+    stage += 1
+    while stage < len(stages) and stages[stage].auto_approves(duration, capacity):
+        auto_approved.append((stage, stages[stage].role))
+        stage += 1
+    if stage >= len(stages):
+        final = len(stages) - 1
+        return Transition(final, stages[final].role, True, tuple(auto_approved))
+    return Transition(stage, stages[stage].role, False, tuple(auto_approved))
+
+
+def auto_approval_records(booking_id, auto_approved, decided_at, series_id=None):
+    """
+    Approval rows for the (stage, role) pairs a Transition auto-approved, for
+    a booking or (with booking_id None) a series
+    """
+    return [
+        BookingApproval(
+            booking_id=booking_id,
+            series_id=series_id,
+            stage=stage,
+            approver=None,
+            approver_role=role,
+            status=BookingApproval.APPROVAL_STATUS[1][0],
+            comments=AUTO_APPROVAL_COMMENT,
+            entered_at=decided_at,
+            decided_at=decided_at,
+        )
+        for stage, role in auto_approved
+    ]
+
+
+def sync_approval_roles():
+    """
+    Re-derive the denormalized approval_role of pending bookings and series,
+    e.g. after a pipeline changed. One UPDATE per (event type, venue, stage)
+    in use.
+    """
+    updated = 0
+    for model in (VenueBooking, BookingSeries):
+        pending = model.objects.filter(status=model.STATUS_PENDING)
+        for event_type, venue_id, stage in (
+            pending.values_list("event_type", "venue_id", "approval_stage")
+            .distinct()
+            .order_by()
+        ):
+            stages = stages_for(event_type, venue_id)
+            role = stages[min(stage, len(stages) - 1)].role
+            updated += (
+                pending.filter(
+                    event_type=event_type, venue_id=venue_id, approval_stage=stage
+                )
+                .exclude(approval_role=role)
+                .update(approval_role=role)
+            )
+    if updated:
+        transaction.on_commit(invalidate_stage_counts)
+    return updated
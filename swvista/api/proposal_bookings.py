@@ -0,0 +1,134 @@
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .conflicts import Conflicts, busy_index
+from .locks import locked_venues
+from .models.proposal import Proposal
+from .models.venuebooking import VenueBooking
+from .models.waitlist_entry import WaitlistEntry
+from .scheduling import IntervalIndex, booking_end
+
+PROPOSAL_PENDING = Proposal.PROPOSAL_STATUS[0][0]
+PROPOSAL_APPROVED = Proposal.PROPOSAL_STATUS[1][0]
+EVENT = VenueBooking.EVENT_TYPE[2][0]
+
+
+def is_bookable(proposal):
+    """Whether the proposal names a venue and a slot to book"""
+    return proposal.venue_id is not None and proposal.duration_in_minutes > 0
+
+
+def unbooked_approved():
+    """Approved proposals with a slot that have no booking or waitlist entry yet"""
+    return (
+        Proposal.objects.filter(
+            status=PROPOSAL_APPROVED,
+            venue__isnull=False,
+            duration_in_minutes__gt=0,
+        )
+        .exclude(Exists(VenueBooking.objects.filter(proposal=OuterRef("pk"))))
+        .exclude(Exists(WaitlistEntry.objects.filter(proposal=OuterRef("pk"))))
+        .select_related("venue")
+    )
+
+
+def book_proposals(proposals):
+    """
+    Book the slots of approved proposals as pending "event" bookings
+    requested by the proposals' authors. Slots that are taken, by existing
+    bookings or by earlier proposals of the batch, are queued on the
+    waitlist instead. Everything is checked against one busy_index per
+    venue and written with one insert per model, so call with the venues
+    locked (locks.locked_venues). Returns {proposal id: outcome}.
+    """
+    by_venue = {}
+    for proposal in proposals:
+        if is_bookable(proposal):
+            by_venue.setdefault(proposal.venue, []).append(proposal)
+
+    outcomes = {}
+    bookings = []
+    entries = []
+    for venue, venue_proposals in by_venue.items():
+        venue_proposals.sort(
+            key=lambda proposal: (proposal.requested_date, proposal.id)
+        )
+        spans = {
+            proposal.id: (
+                proposal.requested_date,
+                booking_end(proposal.requested_date, proposal.duration_in_minutes),
+            )
+            for proposal in venue_proposals
+        }
+        existing = busy_index(
+            venue,
+            min(start for start, _ in spans.values()),
+            max(end for _, end in spans.values()),
+        )
+        batch = IntervalIndex()
+        for proposal in venue_proposals:
+            start, end = spans[proposal.id]
+            conflicts = existing.overlapping(start, end)
+            batch_conflicts = batch.overlapping(start, end)
+            fields = {
+                "requester_id": proposal.user_id,
+                "venue": venue,
+                "proposal": proposal,
+                "event_type": EVENT,
+                "booking_date": start,
+                "booking_duration": proposal.duration_in_minutes,
+            }
+            if conflicts or batch_conflicts:
+                # bulk_create skips save(), which derives booking_end
+                entries.append(WaitlistEntry(**fields, booking_end=end))
+                outcomes[proposal.id] = {
+                    "status": "waitlisted",
+                    **Conflicts.from_keys(conflicts).as_dict(),
+                    "batch_conflicts": sorted(batch_conflicts),
+                }
+            else:
+                batch.add(start, end, proposal.id)
+                bookings.append(VenueBooking(**fields))
+
+    for booking in VenueBooking.objects.bulk_create(bookings):
+        outcomes[booking.proposal_id] = {"status": "booked", "booking": booking.id}
+    for entry in WaitlistEntry.objects.bulk_create(entries):
+        outcomes[entry.proposal_id]["waitlist_entry"] = entry.id
+    return outcomes
+
+
+def approve_proposals(proposal_ids):
+    """
+    Approve the pending proposals among `proposal_ids` and book their slots
+    (see book_proposals) in the same transaction, so an approved proposal
+    never lacks its booking. Returns {proposal id: outcome}. Raises
+    locks.VenueLockTimeout when a venue stays locked.
+    """
+    outcomes = {
+        proposal_id: {"error": "Proposal not found."} for proposal_id in proposal_ids
+    }
+    venue_ids = Proposal.objects.filter(
+        id__in=proposal_ids, venue__isnull=False
+    ).values_list("venue_id", flat=True)
+    with locked_venues(*venue_ids):
+        proposals = list(
+            Proposal.objects.select_for_update(of=("self",))
+            .filter(id__in=proposal_ids)
+            .select_related("venue")
+        )
+        pending = []
+        for proposal in proposals:
+            if proposal.status != PROPOSAL_PENDING:
+                outcomes[proposal.id] = {
+                    "error": f"Proposal is already {proposal.get_status_display()}."
+                }
+            else:
+                pending.append(proposal)
+                outcomes[proposal.id] = {"status": "approved"}
+        Proposal.objects.filter(
+            id__in=[proposal.id for proposal in pending], status=PROPOSAL_PENDING
+        ).update(status=PROPOSAL_APPROVED, updated_at=timezone.now())
+        for proposal in pending:
+            proposal.status = PROPOSAL_APPROVED
+        outcomes.update(book_proposals(pending))
+    return outcomes
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+def get_datetime_param(request, name, required=True):
+    """Read an ISO 8601 datetime from the query string, assuming the current timezone when naive"""
+    raw = request.GET.get(name)
+    if not raw:
+        if required:
+            raise ValueError(f"'{name}' is required.")
+        return None
+    value = parse_datetime(raw)
+    if value is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 datetime.")
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def get_date_param(request, name, required=True):
+    """Read an ISO 8601 date (YYYY-MM-DD) from the query string"""
+    raw = request.GET.get(name)
+    if not raw:
+        if required:
+            raise ValueError(f"'{name}' is required.")
+        return None
+    try:
+        value = parse_date(raw)
+    except ValueError:
+        value = None
+    if value is None:
+        raise ValueError(f"'{name}' must be an ISO 8601 date.")
+    return value
+
+
+def get_int_param(request, name, default=None, minimum=None):
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer.")
+    if minimum is not None and value < minimum:
+        raise ValueError(f"'{name}' must be at least {minimum}.")
+    return value
+
+
+def get_window_params(request, max_days=None):
+    """Read a ?start=&end= datetime window, optionally capped to `max_days`"""
+    start = get_datetime_param(request, "start")
+    end = get_datetime_param(request, "end")
+    if end <= start:
+        raise ValueError("'end' must be after 'start'.")
+    if max_days is not None and end - start > timedelta(days=max_days):
+        raise ValueError(f"Range cannot exceed {max_days} days.")
+    return start, end
+
+
+def get_float_param(request, name, default=None):
+    raw = request.GET.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be a number.")
@@ -0,0 +1,87 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import timedelta
+from threading import Lock
+
+
+def booking_end(start, duration_in_minutes):
+    return start + timedelta(minutes=duration_in_minutes)
+
+
+class IntervalIndex:
+    """
+    In-memory index of half-open [start, end) intervals, e.g. the bookings of
+    one venue.
+
+    Intervals are kept sorted by start. Because the index remembers the
+    longest interval it holds, an overlap lookup only has to look at starts
+    in [start - longest, end), which bisect finds in O(log n).
+    """
+
+    def __init__(self, intervals=()):
+        self._starts = []
+        self._items = []
+        self._longest = timedelta(0)
+        for start, end, key in intervals:
+            self.add(start, end, key)
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, start, end, key=None):
+        position = bisect_right(self._starts, start)
+        self._starts.insert(position, start)
+        self._items.insert(position, (start, end, key))
+        self._longest = max(self._longest, end - start)
+
+    def overlapping(self, start, end):
+        """Return the keys of all intervals overlapping [start, end)"""
+        low = bisect_left(self._starts, start - self._longest)
+        high = bisect_left(self._starts, end)
+        return [key for _, item_end, key in self._items[low:high] if item_end > start]
+
+
+def free_slots(busy, start, end, min_duration):
+    """
+    Sweep busy intervals sorted by start and return the gaps inside
+    [start, end) that are at least `min_duration` long.
+    """
+    slots = []
+    cursor = start
+    for busy_start, busy_end in busy:
+        if cursor >= end:
+            break
+        gap_end = min(busy_start, end)
+        if gap_end - cursor >= min_duration:
+            slots.append((cursor, gap_end))
+        cursor = max(cursor, busy_end)
+    if end - cursor >= min_duration:
+        slots.append((cursor, end))
+    return slots
+
+
+class LRUCache:
+    """Small thread-safe least-recently-used cache"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
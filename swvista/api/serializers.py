@@ -1,21 +1,38 @@
 # serializers.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
+from swvista.fieldsets import SparseFieldsetsMixin
+
 from .models.booking_approval import BookingApproval
+from .models.booking_hold import BookingHold
+from .models.booking_series import BookingSeries
 from .models.club import Club
 from .models.club_members import ClubMember
 from .models.proposal import Proposal
 from .models.venue import Venue
 from .models.venuebooking import VenueBooking
+from .models.waitlist_entry import WaitlistEntry
+
+
+def validate_booking_duration(value):
+    """Length in minutes of a booking, hold, waitlist entry or occurrence"""
+    if not 0 < value <= settings.BOOKING_MAX_DURATION_MINUTES:
+        raise serializers.ValidationError(
+            f"Duration must be between 1 and {settings.BOOKING_MAX_DURATION_MINUTES} minutes."
+        )
 
 
-class VenueSerializer(serializers.ModelSerializer):
+class VenueSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Venue
         fields = "__all__"
 
 
-class ProposalSerializer(serializers.ModelSerializer):
+class ProposalSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Proposal
         fields = [
@@ -23,13 +40,16 @@ class ProposalSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "requested_date",
+            "duration_in_minutes",
+            "attendees",
+            "venue",
             "status",
             "created_at",
             "updated_at",
         ]
 
 
-# class VenueBookingSerializer(serializers.ModelSerializer):
+# class VenueBookingSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
 #     class Meta:
 #         model = VenueBooking
 #         fields = "__all__"
@@ -44,7 +64,7 @@ class ProposalSerializer(serializers.ModelSerializer):
 #         return attrs
 
 
-class BookingApprovalSerializer(serializers.ModelSerializer):
+class BookingApprovalSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     approver_name = serializers.ReadOnlyField(source="approver.username")
 
     class Meta:
@@ -52,17 +72,26 @@ class BookingApprovalSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "booking",
+            "series",
             "approver",
             "approver_name",
             "stage",
+            "approver_role",
             "status",
             "comments",
             "approval_date",
+            "entered_at",
+            "decided_at",
+        ]
+        read_only_fields = [
+            "approval_date",
+            "approver_role",
+            "entered_at",
+            "decided_at",
         ]
-        read_only_fields = ["approval_date"]
 
 
-class VenueBookingSerializer(serializers.ModelSerializer):
+class VenueBookingSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     approvals = BookingApprovalSerializer(many=True, read_only=True)
     venue_name = serializers.ReadOnlyField(source="venue.name")
     requester_name = serializers.ReadOnlyField(
@@ -70,6 +99,7 @@ class VenueBookingSerializer(serializers.ModelSerializer):
     )  # Fixed source path
     status_display = serializers.ReadOnlyField(source="get_status_display")
     event_type_display = serializers.ReadOnlyField(source="get_event_type_display")
+    last_approver_name = serializers.ReadOnlyField(source="last_approver.username")
 
     class Meta:
         model = VenueBooking
@@ -83,15 +113,43 @@ class VenueBookingSerializer(serializers.ModelSerializer):
             "requester",
             "requester_name",
             "approval_stage",
+            "approval_role",
+            "stage_entered_at",
             "status",
             "status_display",
             "booking_date",
             "booking_duration",
+            "booking_end",
             "created_at",
             "updated_at",
+            "last_approver",
+            "last_approver_name",
+            "last_decision",
+            "last_comment",
+            "last_decided_at",
             "approvals",
         ]
-        read_only_fields = ["approval_stage", "status", "created_at", "updated_at"]
+        expandable_fields = ["approvals"]
+        read_only_fields = [
+            "approval_stage",
+            "approval_role",
+            "stage_entered_at",
+            "status",
+            "created_at",
+            "updated_at",
+            "last_approver",
+            "last_decision",
+            "last_comment",
+            "last_decided_at",
+        ]
+        extra_kwargs = {"booking_duration": {"validators": [validate_booking_duration]}}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Listings leave the history out unless asked (?expand=approvals or
+        # ?include_approvals=true); the last_* fields summarize it
+        if not self.context.get("include_approvals", True):
+            self.fields.pop("approvals", None)
 
     def validate(self, attrs):
         event_type = attrs.get("event_type")
@@ -103,13 +161,201 @@ class VenueBookingSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ClubSerializer(serializers.ModelSerializer):
+class ApprovalQueueSerializer(VenueBookingSerializer):
+    """A queued booking with only its latest approval instead of all of them"""
+
+    approvals = None
+    latest_approval = serializers.SerializerMethodField()
+
+    class Meta(VenueBookingSerializer.Meta):
+        fields = [
+            field
+            for field in VenueBookingSerializer.Meta.fields
+            if field != "approvals"
+        ] + ["latest_approval"]
+        expandable_fields = []
+
+    def get_latest_approval(self, obj):
+        approval = self.context["latest_approvals"].get(obj.latest_approval_id)
+        return BookingApprovalSerializer(approval).data if approval else None
+
+
+class BookingSeriesSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    venue_name = serializers.ReadOnlyField(source="venue.name")
+    requester_name = serializers.ReadOnlyField(source="requester.username")
+    status_display = serializers.ReadOnlyField(source="get_status_display")
+    event_type_display = serializers.ReadOnlyField(source="get_event_type_display")
+    exceptions = serializers.ListField(
+        child=serializers.DateField(), required=False, default=list
+    )
+
+    class Meta:
+        model = BookingSeries
+        fields = [
+            "id",
+            "venue",
+            "venue_name",
+            "proposal",
+            "event_type",
+            "event_type_display",
+            "requester",
+            "requester_name",
+            "approval_stage",
+            "approval_role",
+            "stage_entered_at",
+            "status",
+            "status_display",
+            "rejection_comments",
+            "start",
+            "duration",
+            "frequency",
+            "interval",
+            "until",
+            "count",
+            "exceptions",
+            "series_end",
+            "version",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "approval_stage",
+            "approval_role",
+            "stage_entered_at",
+            "status",
+            "rejection_comments",
+            "created_at",
+            "updated_at",
+        ]
+        extra_kwargs = {"duration": {"validators": [validate_booking_duration]}}
+
+    def validate_interval(self, value):
+        if value < 1:
+            raise serializers.ValidationError("Interval must be at least 1.")
+        return value
+
+    def validate_exceptions(self, value):
+        return sorted({day.isoformat() for day in value})
+
+    def validate(self, attrs):
+        if attrs.get("event_type") == 2 and attrs.get("proposal") is None:
+            raise serializers.ValidationError(
+                {"proposal": "Proposal is required for event type 'event'."}
+            )
+        if not attrs.get("until") and not attrs.get("count"):
+            raise serializers.ValidationError(
+                "A series needs either 'until' or 'count'."
+            )
+        rule = BookingSeries(
+            start=attrs["start"],
+            duration=attrs["duration"],
+            frequency=attrs["frequency"],
+            interval=attrs.get("interval", 1),
+            until=attrs.get("until"),
+            count=attrs.get("count"),
+        )
+        if rule.duration > rule.step.total_seconds() // 60:
+            raise serializers.ValidationError(
+                {"duration": "Occurrences of a series cannot overlap each other."}
+            )
+        if rule.last_index() + 1 > settings.BOOKING_SERIES_MAX_OCCURRENCES:
+            raise serializers.ValidationError(
+                f"A series cannot have more than {settings.BOOKING_SERIES_MAX_OCCURRENCES} occurrences."
+            )
+        return attrs
+
+
+class SeriesApprovalQueueSerializer(BookingSeriesSerializer):
+    """A queued series with its latest approval"""
+
+    latest_approval = serializers.SerializerMethodField()
+
+    class Meta(BookingSeriesSerializer.Meta):
+        fields = BookingSeriesSerializer.Meta.fields + ["latest_approval"]
+
+    def get_latest_approval(self, obj):
+        approval = self.context["latest_approvals"].get(obj.latest_approval_id)
+        return BookingApprovalSerializer(approval).data if approval else None
+
+
+class BookingHoldSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    venue_name = serializers.ReadOnlyField(source="venue.name")
+    ttl_minutes = serializers.IntegerField(
+        write_only=True,
+        required=False,
+        min_value=1,
+        max_value=settings.BOOKING_HOLD_MAX_TTL_MINUTES,
+    )
+
+    class Meta:
+        model = BookingHold
+        fields = [
+            "id",
+            "holder",
+            "venue",
+            "venue_name",
+            "proposal",
+            "booking_date",
+            "booking_duration",
+            "booking_end",
+            "ttl_minutes",
+            "expires_at",
+            "created_at",
+        ]
+        read_only_fields = ["expires_at", "created_at"]
+        extra_kwargs = {"booking_duration": {"validators": [validate_booking_duration]}}
+
+    def create(self, validated_data):
+        ttl = validated_data.pop("ttl_minutes", settings.BOOKING_HOLD_TTL_MINUTES)
+        validated_data["expires_at"] = timezone.now() + timedelta(minutes=ttl)
+        return super().create(validated_data)
+
+
+class WaitlistEntrySerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    venue_name = serializers.ReadOnlyField(source="venue.name")
+
+    class Meta:
+        model = WaitlistEntry
+        fields = [
+            "id",
+            "requester",
+            "venue",
+            "venue_name",
+            "proposal",
+            "event_type",
+            "booking_date",
+            "booking_duration",
+            "booking_end",
+            "priority",
+            "status",
+            "booking",
+            "created_at",
+        ]
+        read_only_fields = ["status", "booking", "created_at"]
+        extra_kwargs = {"booking_duration": {"validators": [validate_booking_duration]}}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Only staff may move a request up the queue; everyone else's
+        # requests wait at the default priority
+        if "priority" in self.fields and not self.context.get("can_set_priority"):
+            self.fields["priority"].read_only = True
+
+    def validate(self, attrs):
+        if attrs.get("event_type") == 2 and attrs.get("proposal") is None:
+            raise serializers.ValidationError(
+                {"proposal": "Proposal is required for event type 'event'."}
+            )
+        return attrs
+
+
+class ClubSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Club
         fields = "__all__"
 
 
-class ClubMemberSerializer(serializers.ModelSerializer):
+class ClubMemberSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = ClubMember
         fields = "__all__"
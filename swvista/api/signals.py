@@ -0,0 +1,86 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import usage
+from .approval_queue import invalidate_stage_counts
+from .models.approval_pipeline import ApprovalPipeline, ApprovalStage
+from .models.booking_series import BookingSeries
+from .models.venue import Venue
+from .models.venuebooking import VenueBooking
+from .pipelines import invalidate_pipelines, sync_approval_roles
+from .venue_index import invalidate_capacity_index, venue_deleted, venue_saved
+
+
+# Index updates run after commit, so a concurrent rebuild cannot cache rows
+# that are later rolled back or miss rows that are about to be committed.
+@receiver(post_save, sender=Venue)
+def venue_post_save(sender, instance, created, **kwargs):
+    transaction.on_commit(invalidate_capacity_index)
+    transaction.on_commit(lambda: venue_saved(instance, created))
+
+
+@receiver(post_delete, sender=Venue)
+def venue_post_delete(sender, instance, **kwargs):
+    venue_id = instance.id
+    transaction.on_commit(invalidate_capacity_index)
+    transaction.on_commit(lambda: venue_deleted(venue_id))
+
+
+@receiver(pre_save, sender=VenueBooking)
+def booking_pre_save(sender, instance, **kwargs):
+    # Instances not loaded through from_db (or loaded with deferred fields)
+    # need the stored row to know what the usage rollup counted
+    if not instance._state.adding and "_counted_usage" not in instance.__dict__:
+        instance._counted_usage = (
+            VenueBooking.objects.filter(id=instance.id)
+            .values_list(*VenueBooking.USAGE_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=VenueBooking)
+def booking_post_save(sender, instance, created, **kwargs):
+    snapshot = instance.usage_snapshot()
+    usage.record_change(
+        None if created else instance.__dict__.get("_counted_usage"), snapshot
+    )
+    instance._counted_usage = snapshot
+    transaction.on_commit(invalidate_stage_counts)
+
+
+@receiver(post_delete, sender=VenueBooking)
+def booking_post_delete(sender, instance, origin=None, **kwargs):
+    transaction.on_commit(invalidate_stage_counts)
+    if isinstance(origin, Venue) or getattr(origin, "model", None) is Venue:
+        return  # The venue's usage rows are deleted along with it
+    usage.record_change(
+        instance.__dict__.get("_counted_usage", instance.usage_snapshot()), None
+    )
+
+
+@receiver(post_save, sender=BookingSeries)
+@receiver(post_delete, sender=BookingSeries)
+def series_changed(sender, **kwargs):
+    transaction.on_commit(invalidate_stage_counts)
+
+
+# Other processes notice pipeline changes through the pipeline's updated_at
+# (see pipelines._version); this one drops its cache straight away. Pending
+# bookings are re-routed to the roles of the changed pipeline after commit.
+@receiver(post_save, sender=ApprovalPipeline)
+@receiver(post_delete, sender=ApprovalPipeline)
+def pipeline_changed(sender, **kwargs):
+    invalidate_pipelines()
+    transaction.on_commit(invalidate_pipelines)
+    transaction.on_commit(sync_approval_roles)
+
+
+@receiver(post_save, sender=ApprovalStage)
+@receiver(post_delete, sender=ApprovalStage)
+def pipeline_stage_changed(sender, instance, **kwargs):
+    ApprovalPipeline.objects.filter(id=instance.pipeline_id).update(
+        updated_at=timezone.now()
+    )
+    pipeline_changed(sender)
@@ -0,0 +1,101 @@
+import random
+from datetime import timedelta
+
+from django.db import OperationalError
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rbac.models import Role, User
+
+from ..models import BookingApproval, BookingSeries, Venue, VenueBooking
+from ..pipelines import stages_for
+from .utils import run_threads
+
+
+class ApprovalRaceTests(TransactionTestCase):
+    """
+    Parallel approvers load and approve the same bookings (or series). The
+    compare-and-swap transitions must let every stage be won exactly once,
+    so no approval is lost or repeated.
+    """
+
+    approvers = 50
+
+    def setUp(self):
+        role = Role.objects.create(name="approval-race", description="")
+        self.users = [
+            User.objects.create(username=f"approver-{i}", name="approver", role=role)
+            for i in range(self.approvers)
+        ]
+        self.venue = Venue.objects.create(
+            name="approval-race", address="", description="", capacity=10
+        )
+        self.stages = stages_for(0, self.venue.id)
+        # No stage may be auto-approved, or the expected counts are off
+        self.assertFalse(
+            any(stage.auto_approves(30, self.venue.capacity) for stage in self.stages)
+        )
+
+    def race(self, model, ids):
+        """Every approver approves random pending rows until none are left"""
+
+        def approver(index):
+            rng = random.Random(index)
+            remaining = list(ids)
+            outcomes = []
+            while remaining:
+                row_id = rng.choice(remaining)
+                row = model.objects.select_related("venue").get(id=row_id)
+                if row.status != model.STATUS_PENDING:
+                    remaining.remove(row_id)
+                    continue
+                try:
+                    won = row.approve(self.users[index], f"approver {index}")
+                except OperationalError:
+                    outcomes.append("busy")  # SQLite gave up on its write lock
+                    continue
+                outcomes.append("won" if won else "lost")
+            return outcomes
+
+        return run_threads(self.approvers, approver)
+
+    def assertEveryStageApprovedOnce(self, model, field, ids, outcomes):
+        self.assertEqual(outcomes.count("won"), len(ids) * len(self.stages))
+        for row in model.objects.filter(id__in=ids):
+            self.assertEqual(row.status, model.STATUS_APPROVED)
+            recorded = sorted(
+                BookingApproval.objects.filter(**{field: row}).values_list(
+                    "stage", flat=True
+                )
+            )
+            self.assertEqual(recorded, list(range(len(self.stages))))
+
+    def test_booking_stages_are_won_once(self):
+        start = timezone.now() + timedelta(days=1)
+        bookings = VenueBooking.objects.bulk_create(
+            VenueBooking(
+                requester=self.users[0],
+                venue=self.venue,
+                booking_date=start + timedelta(hours=i),
+                booking_duration=30,
+            )
+            for i in range(20)
+        )
+        ids = [booking.id for booking in bookings]
+        outcomes = self.race(VenueBooking, ids)
+        self.assertEveryStageApprovedOnce(VenueBooking, "booking", ids, outcomes)
+
+    def test_series_stages_are_won_once(self):
+        start = timezone.now() + timedelta(days=1)
+        ids = [
+            BookingSeries.objects.create(
+                requester=self.users[0],
+                venue=self.venue,
+                start=start + timedelta(hours=i),
+                duration=30,
+                frequency=BookingSeries.FREQUENCY_WEEKLY,
+                count=4,
+            ).id
+            for i in range(5)
+        ]
+        outcomes = self.race(BookingSeries, ids)
+        self.assertEveryStageApprovedOnce(BookingSeries, "series", ids, outcomes)
@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from rbac.models import Role, User
+
+from ..models import Venue, VenueBooking
+
+
+class BackfillBookingEndTests(TestCase):
+    def test_replaces_the_migration_default_on_every_row(self):
+        user = User.objects.create(
+            username="backfill",
+            name="backfill",
+            role=Role.objects.create(name="backfill", description=""),
+        )
+        venue = Venue.objects.create(
+            name="Hall", address="", description="", capacity=10
+        )
+        start = datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+        for index in range(5):
+            VenueBooking.objects.create(
+                requester=user,
+                venue=venue,
+                booking_date=start + timedelta(days=index),
+                booking_duration=30 + index,
+            )
+        # What the one-off default of the AddField migration leaves behind
+        VenueBooking.objects.update(booking_end=start)
+
+        out = StringIO()
+        call_command("backfill_booking_end", chunk_size=2, stdout=out)
+        self.assertIn("fixed booking_end on 5", out.getvalue())
+        for booking in VenueBooking.objects.all():
+            self.assertEqual(
+                booking.booking_end,
+                booking.booking_date + timedelta(minutes=booking.booking_duration),
+            )
+
+        out = StringIO()
+        call_command("backfill_booking_end", stdout=out)
+        self.assertIn("fixed booking_end on 0", out.getvalue())
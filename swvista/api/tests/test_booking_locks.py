@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.test import TransactionTestCase
+from django.utils import timezone
+from rbac.models import Role, User
+
+from ..conflicts import find_conflicts
+from ..locks import VenueLockTimeout, locked_venues
+from ..models import Venue, VenueBooking
+from .utils import run_threads
+
+
+class VenueLockTests(TransactionTestCase):
+    """
+    The check-then-insert of booking creation under locked_venues(), raced
+    from many threads. A TransactionTestCase, so the threads' own connections
+    see the committed venues.
+    """
+
+    threads = 8
+
+    def setUp(self):
+        role = Role.objects.create(name="lock-test", description="")
+        self.user = User.objects.create(username="lock-test", name="lock", role=role)
+        self.venues = [
+            Venue.objects.create(
+                name=f"lock-test-{i}", address="", description="", capacity=10
+            )
+            for i in range(self.threads)
+        ]
+
+    def book(self, venue, start, duration=60):
+        """The check-then-insert done by create_booking"""
+        try:
+            with locked_venues(venue.id):
+                if find_conflicts(venue, start, duration):
+                    return "conflict"
+                VenueBooking.objects.create(
+                    requester=self.user,
+                    venue=venue,
+                    booking_date=start,
+                    booking_duration=duration,
+                )
+                return "created"
+        except VenueLockTimeout:
+            return "timeout"
+
+    def test_one_booking_wins_a_contended_slot(self):
+        venue = self.venues[0]
+        origin = timezone.now().replace(microsecond=0) + timedelta(days=1)
+        for round_number in range(5):
+            start = origin + timedelta(hours=round_number)
+            results = run_threads(self.threads, lambda _: [self.book(venue, start)])
+            self.assertEqual(results.count("created"), 1, results)
+        self.assertEqual(VenueBooking.objects.filter(venue=venue).count(), 5)
+
+    def test_separate_venues_do_not_block_each_other(self):
+        origin = timezone.now().replace(microsecond=0) + timedelta(days=30)
+        results = run_threads(
+            self.threads,
+            lambda index: [
+                self.book(self.venues[index], origin + timedelta(hours=slot))
+                for slot in range(5)
+            ],
+        )
+        self.assertEqual(results.count("created"), self.threads * 5, results)
@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from ..ical import recurrence_lines
+from ..models import BookingSeries
+
+
+class RecurrenceLinesTests(SimpleTestCase):
+    def series(self, **rule):
+        return BookingSeries(
+            start=datetime(2030, 1, 7, 18, tzinfo=timezone.utc),
+            duration=60,
+            frequency=BookingSeries.FREQUENCY_WEEKLY,
+            **rule,
+        )
+
+    def test_count_only(self):
+        self.assertEqual(
+            recurrence_lines(self.series(count=4)),
+            ["RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=4"],
+        )
+
+    def test_until_only(self):
+        until = datetime(2030, 2, 1, tzinfo=timezone.utc)
+        self.assertEqual(
+            recurrence_lines(self.series(until=until)),
+            ["RRULE:FREQ=WEEKLY;INTERVAL=1;UNTIL=20300201T000000Z"],
+        )
+
+    def test_count_and_until_emit_only_count(self):
+        until = datetime(2030, 1, 22, 18, tzinfo=timezone.utc)
+        # `until` ends the series first: occurrences on the 7th, 14th and 21st
+        self.assertEqual(
+            recurrence_lines(self.series(count=10, until=until)),
+            ["RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=3"],
+        )
+        # `count` ends it first
+        self.assertEqual(
+            recurrence_lines(self.series(count=2, until=until)),
+            ["RRULE:FREQ=WEEKLY;INTERVAL=1;COUNT=2"],
+        )
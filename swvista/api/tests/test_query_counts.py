@@ -0,0 +1,207 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rbac.models import ClubMemberProfile, Permission, Role, User, UserRole
+
+from ..approval_queue import invalidate_stage_counts
+from ..models import (
+    BookingApproval,
+    BookingHold,
+    BookingSeries,
+    Club,
+    ClubMember,
+    Proposal,
+    Venue,
+    VenueBooking,
+    WaitlistEntry,
+)
+from .utils import login
+
+# GET endpoints checked, relative to /api/v1/. "{club}", "{booking}" and
+# "{series}" are filled in with seeded rows whose related rows grow too.
+ENDPOINTS = [
+    "api/venue/get-all/",
+    "api/proposal/get-all/",
+    "api/proposal/get-all-by-user/",
+    "api/booking/get-all/",
+    "api/booking/get-all/?include_approvals=true",
+    "api/booking/get-by-id/{booking}/",
+    "api/approvals/get-pending/",
+    "api/approvals/get-pending/?include_approvals=true",
+    "api/approvals/queue/",
+    "api/approvals/queue/?kind=series",
+    "api/approvals/history/{booking}/",
+    "api/series/get-all/",
+    "api/series/history/{series}/",
+    "api/booking/hold/get-mine/",
+    "api/booking/waitlist/get-mine/",
+    "api/club/get-all/",
+    "api/club/get-all-members/{club}/",
+    "api/club/get-my-clubs/",
+    "auth/user/",
+    "auth/role/",
+    "auth/permission/",
+    "auth/user_role/",
+]
+
+# Rows of every kind listed when the query counts are compared
+FEW = 1
+MANY = 20
+
+
+class QueryCountTests(TestCase):
+    """
+    List and detail endpoints run a fixed number of queries: their counts
+    with FEW rows of every kind must hold with MANY, or some row is loading
+    its relations one query at a time (N+1).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        role = Role.objects.create(name="query-count-admin", description="")
+        # The rbac views only let the "admin" username through
+        cls.user = User.objects.create(username="admin", name="admin", role=role)
+        cls.club = Club.objects.create(name="query-count-club", description="")
+        venue = Venue.objects.create(
+            name="query-count-venue", address="", description="", capacity=10
+        )
+        start = timezone.now() + timedelta(days=1)
+        cls.booking = VenueBooking.objects.create(
+            requester=cls.user, venue=venue, booking_date=start, booking_duration=30
+        )
+        cls.series = BookingSeries.objects.create(
+            requester=cls.user,
+            venue=venue,
+            start=start - timedelta(days=1),
+            duration=15,
+            frequency=BookingSeries.FREQUENCY_WEEKLY,
+            count=1,
+        )
+        cls.seed(0, FEW)
+
+    @classmethod
+    def seed(cls, start, stop):
+        """Rows number `start` to `stop` of every kind"""
+        origin = timezone.now() + timedelta(days=2)
+        member_role = Role.objects.get_or_create(
+            name="clubMember", defaults={"description": ""}
+        )[0]
+        for index in range(start, stop):
+            role = Role.objects.create(name=f"query-count-{index}", description="")
+            role.permissions.set(
+                Permission.objects.create(
+                    name=f"query-count-{index}-{action}", description=""
+                )
+                for action in ("read", "write")
+            )
+            user = User.objects.create(
+                username=f"query-count-{index}",
+                name=f"query count {index}",
+                role=member_role,
+            )
+            ClubMemberProfile.objects.create(
+                user=user, learner_id="", reg_number="", post="", club_name=""
+            )
+            UserRole.objects.create(user=user, role=role)
+            ClubMember.objects.create(club=cls.club, user=user)
+            ClubMember.objects.create(
+                club=Club.objects.create(
+                    name=f"query-count-club-{index}", description=""
+                ),
+                user=cls.user,
+            )
+
+            venue = Venue.objects.create(
+                name=f"query-count-{index}", address="", description="", capacity=10
+            )
+            slot = origin + timedelta(hours=index)
+            Proposal.objects.create(
+                user=cls.user, name=f"query-count-{index}", requested_date=slot
+            )
+            booking = VenueBooking.objects.create(
+                requester=user, venue=venue, booking_date=slot, booking_duration=30
+            )
+            # Every booking and series gets a reviewer of its own
+            booking.approve(user, "checked")
+            series = BookingSeries.objects.create(
+                requester=user,
+                venue=venue,
+                start=slot + timedelta(minutes=30),
+                duration=15,
+                frequency=BookingSeries.FREQUENCY_WEEKLY,
+                count=2,
+            )
+            series.approve(user, "checked")
+            for approvals_of in ({"booking": cls.booking}, {"series": cls.series}):
+                BookingApproval.objects.create(
+                    approver=user,
+                    stage=0,
+                    status=BookingApproval.APPROVAL_STATUS[1][0],
+                    comments="checked",
+                    **approvals_of,
+                )
+            BookingHold.objects.create(
+                holder=cls.user,
+                venue=venue,
+                booking_date=slot + timedelta(minutes=45),
+                booking_duration=10,
+                expires_at=timezone.now() + timedelta(hours=1),
+            )
+            WaitlistEntry.objects.create(
+                requester=cls.user,
+                venue=venue,
+                booking_date=slot,
+                booking_duration=30,
+            )
+
+    def setUp(self):
+        login(self.client, self.user)
+        # Bookings and series past their first stage wait for its role
+        session = self.client.session
+        session["role"] = settings.APPROVAL_DEFAULT_STAGE_ROLES[1]
+        session.save()
+
+    def get(self, endpoint):
+        path = "/api/v1/" + endpoint.format(
+            club=self.club.id, booking=self.booking.id, series=self.series.id
+        )
+        separator = "&" if "?" in path else "?"
+        # Counted with the per-stage queue counts cache cold
+        invalidate_stage_counts()
+        response = self.client.get(f"{path}{separator}limit={2 * MANY}")
+        self.assertEqual(response.status_code, 200, endpoint)
+        return response
+
+    def count_queries(self, endpoint):
+        with CaptureQueriesContext(connection) as queries:
+            self.get(endpoint)
+        return len(queries)
+
+    def test_query_counts_do_not_grow_with_the_data(self):
+        few = {endpoint: self.count_queries(endpoint) for endpoint in ENDPOINTS}
+        self.seed(FEW, MANY)
+        for endpoint in ENDPOINTS:
+            with self.subTest(endpoint=endpoint):
+                with self.assertNumQueries(few[endpoint]):
+                    self.get(endpoint)
+
+    def test_listings_include_the_seeded_rows(self):
+        # The seeded rows plus the booking and series from setUpTestData,
+        # all pending for the default pipeline's role
+        self.seed(FEW, MANY)
+        self.assertEqual(
+            len(self.get("api/booking/get-all/").json()["results"]), MANY + 1
+        )
+        self.assertEqual(
+            len(self.get("api/approvals/queue/?kind=series").json()["results"]),
+            MANY + 1,
+        )
+
+
+@override_settings(FAST_LIST_SERIALIZATION=False)
+class SerializerQueryCountTests(QueryCountTests):
+    """The same endpoints through DRF serializers instead of .values() rows"""
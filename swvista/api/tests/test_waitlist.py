@@ -0,0 +1,175 @@
+import json
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone as django_timezone
+from rbac.models import Role, User
+
+from ..models import BookingHold, BookingSeries, Venue, VenueBooking, WaitlistEntry
+from .utils import login
+
+JOIN_URL = "/api/v1/api/booking/waitlist/join/"
+
+
+class WaitlistPriorityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username="admin",
+            name="admin",
+            role=Role.objects.create(name="admin", description=""),
+        )
+        cls.requester = User.objects.create(
+            username="requester",
+            name="requester",
+            role=Role.objects.create(name="user", description=""),
+        )
+        cls.venue = Venue.objects.create(
+            name="Hall", address="", description="", capacity=10
+        )
+        cls.start = datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+        VenueBooking.objects.create(
+            requester=cls.admin,
+            venue=cls.venue,
+            booking_date=cls.start,
+            booking_duration=60,
+        )
+
+    def join(self, user, **data):
+        client = login(self.client_class(), user, [{"P1": "venue", "P2": "write"}])
+        return client.post(
+            JOIN_URL,
+            json.dumps(
+                {
+                    "venue": self.venue.id,
+                    "event_type": 0,
+                    "booking_date": self.start.isoformat(),
+                    "booking_duration": 60,
+                    **data,
+                }
+            ),
+            content_type="application/json",
+        )
+
+    def test_requesters_cannot_set_their_priority(self):
+        response = self.join(self.requester, priority=100)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WaitlistEntry.objects.get().priority, 0)
+
+    def test_admins_can_set_a_priority(self):
+        response = self.join(self.admin, priority=100)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(WaitlistEntry.objects.get().priority, 100)
+
+    def test_duration_is_validated(self):
+        response = self.join(self.requester, booking_duration=0)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("booking_duration", response.json())
+
+
+class WaitlistPromotionTests(TestCase):
+    """Every way a slot is freed books the entry waiting behind it"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username="admin",
+            name="admin",
+            role=Role.objects.create(name="admin", description=""),
+        )
+        cls.venue = Venue.objects.create(
+            name="Hall", address="", description="", capacity=10
+        )
+        cls.start = datetime(2030, 1, 1, 10, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.entry = WaitlistEntry.objects.create(
+            requester=self.admin,
+            venue=self.venue,
+            booking_date=self.start,
+            booking_duration=60,
+        )
+
+    def assertPromoted(self):
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.status, WaitlistEntry.STATUS_PROMOTED)
+        self.assertEqual(self.entry.booking.booking_date, self.start)
+
+    def booking(self):
+        return VenueBooking.objects.create(
+            requester=self.admin,
+            venue=self.venue,
+            booking_date=self.start,
+            booking_duration=60,
+        )
+
+    def series(self):
+        return BookingSeries.objects.create(
+            requester=self.admin,
+            venue=self.venue,
+            start=self.start - timedelta(days=7),
+            duration=60,
+            frequency=BookingSeries.FREQUENCY_WEEKLY,
+            count=3,
+        )
+
+    def hold(self, expires_in):
+        return BookingHold.objects.create(
+            holder=self.admin,
+            venue=self.venue,
+            booking_date=self.start,
+            booking_duration=60,
+            expires_at=django_timezone.now() + expires_in,
+        )
+
+    def test_booking_reject(self):
+        booking = self.booking()
+        self.assertTrue(booking.reject(self.admin.id, "Double booked"))
+        self.assertPromoted()
+
+    def test_booking_delete(self):
+        booking = self.booking()
+        client = login(
+            self.client_class(), self.admin, [{"P1": "venue", "P2": "delete"}]
+        )
+        response = client.delete(f"/api/v1/api/booking/delete/{booking.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertPromoted()
+
+    def test_series_reject(self):
+        series = self.series()
+        self.assertTrue(series.reject(self.admin.id, "Double booked"))
+        self.assertPromoted()
+
+    def test_series_delete(self):
+        series = self.series()
+        client = login(
+            self.client_class(), self.admin, [{"P1": "venue", "P2": "delete"}]
+        )
+        response = client.delete(f"/api/v1/api/series/delete/{series.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(BookingSeries.objects.exists())
+        self.assertPromoted()
+
+    def test_hold_release(self):
+        hold = self.hold(timedelta(minutes=10))
+        client = login(self.client_class(), self.admin)
+        response = client.delete(f"/api/v1/api/booking/hold/release/{hold.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertPromoted()
+
+    def test_expired_hold_reaped(self):
+        self.hold(timedelta(minutes=-1))
+        call_command("reap_booking_holds", stdout=StringIO())
+        self.assertFalse(BookingHold.objects.exists())
+        self.assertPromoted()
+
+    def test_no_promotion_while_the_slot_is_still_taken(self):
+        self.booking()
+        hold = self.hold(timedelta(minutes=10))
+        client = login(self.client_class(), self.admin)
+        client.delete(f"/api/v1/api/booking/hold/release/{hold.id}/")
+        self.entry.refresh_from_db()
+        self.assertEqual(self.entry.status, WaitlistEntry.STATUS_WAITING)
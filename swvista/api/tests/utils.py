@@ -0,0 +1,42 @@
+import threading
+
+from django.db import connections
+
+
+def run_threads(threads, work):
+    """Start `threads` threads at once on work(index); the lists they return"""
+    barrier = threading.Barrier(threads)
+    results = []
+    errors = []
+    lock = threading.Lock()
+
+    def target(index):
+        try:
+            barrier.wait()
+            outcomes = work(index)
+            with lock:
+                results.extend(outcomes)
+        except Exception as e:  # Re-raised in the test's thread
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def login(client, user, permissions=()):
+    """Give `client` the session the login view sets up for `user`"""
+    session = client.session
+    session["user_id"] = user.id
+    session["username"] = user.username
+    session["role"] = user.role.name
+    session["permissions"] = list(permissions)
+    session.save()
+    return client
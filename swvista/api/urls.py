@@ -5,6 +5,12 @@ from . import views
 urlpatterns = [
     # Venue API
     path("venue/get-all/", views.get_all_venues_view, name="get_all_venues"),
+    path("venue/nearby/", views.get_nearby_venues_view, name="get_nearby_venues"),
+    path(
+        "venue/utilization/",
+        views.get_venue_utilization_view,
+        name="get_venue_utilization",
+    ),
     path(
         "venue/get-by-id/<int:id>/", views.get_venue_by_id_view, name="get_venue_by_id"
     ),
@@ -13,6 +19,7 @@ urlpatterns = [
     path("venue/delete/<int:id>/", views.delete_venue_view, name="delete_venue"),
     # Proposal API
     path("proposal/get-all/", views.get_all_proposals_view, name="get_all_proposals"),
+    path("proposal/export/", views.export_proposals_view, name="export_proposals"),
     path(
         "proposal/get-by-id/<int:id>/",
         views.get_proposal_by_id_view,
@@ -30,17 +37,44 @@ urlpatterns = [
         views.get_all_proposals_by_user_view,
         name="get_all_proposals_by_user",
     ),
+    path(
+        "proposal/recommend-venues/<int:id>/",
+        views.recommend_venues_view,
+        name="recommend_venues",
+    ),
+    path(
+        "proposal/approve/<int:id>/",
+        views.approve_proposal_view,
+        name="approve_proposal",
+    ),
+    path(
+        "proposal/approve-bulk/",
+        views.bulk_approve_proposals_view,
+        name="bulk_approve_proposals",
+    ),
     # Venue Booking API
     path(
         "booking/create/", views.create_venue_booking_view, name="create_venue_booking"
     ),
+    path(
+        "booking/bulk-create/",
+        views.bulk_create_bookings_view,
+        name="bulk_create_bookings",
+    ),
     path("booking/get-all/", views.get_all_bookings_view, name="get_all_bookings"),
+    path("booking/export/", views.export_bookings_view, name="export_bookings"),
     path(
         "booking/get-by-id/<int:id>/",
         views.get_booking_by_id_view,
         name="get_booking_by_id",
     ),
     path("booking/update/<int:id>/", views.update_booking_view, name="update_booking"),
+    path("booking/delete/<int:id>/", views.delete_booking_view, name="delete_booking"),
+    path(
+        "booking/availability/",
+        views.get_availability_view,
+        name="get_availability",
+    ),
     # Booking Approvals API
     path(
         "approvals/get-pending/",
@@ -55,6 +89,99 @@ urlpatterns = [
     path(
         "approvals/reject/<int:id>/", views.reject_booking_view, name="reject_booking"
     ),
+    path(
+        "approvals/history/<int:id>/",
+        views.get_approval_history_view,
+        name="get_approval_history",
+    ),
+    path(
+        "approvals/queue/",
+        views.get_approval_queue_view,
+        name="get_approval_queue",
+    ),
+    path(
+        "approvals/analytics/",
+        views.get_approval_analytics_view,
+        name="get_approval_analytics",
+    ),
+    path(
+        "approvals/sla-breaches/",
+        views.get_sla_breaches_view,
+        name="get_sla_breaches",
+    ),
+    path(
+        "approvals/bulk/",
+        views.bulk_review_bookings_view,
+        name="bulk_review_bookings",
+    ),
+    # Booking Series API
+    path("series/create/", views.create_series_view, name="create_series"),
+    path("series/get-all/", views.get_all_series_view, name="get_all_series"),
+    path(
+        "series/get-by-id/<int:id>/",
+        views.get_series_by_id_view,
+        name="get_series_by_id",
+    ),
+    path("series/update/<int:id>/", views.update_series_view, name="update_series"),
+    path("series/delete/<int:id>/", views.delete_series_view, name="delete_series"),
+    path(
+        "series/occurrences/",
+        views.get_series_occurrences_view,
+        name="get_series_occurrences",
+    ),
+    path("series/approve/<int:id>/", views.approve_series_view, name="approve_series"),
+    path("series/reject/<int:id>/", views.reject_series_view, name="reject_series"),
+    path(
+        "series/history/<int:id>/",
+        views.get_series_approval_history_view,
+        name="get_series_approval_history",
+    ),
+    # Booking Hold API
+    path("booking/hold/create/", views.create_hold_view, name="create_hold"),
+    path("booking/hold/get-mine/", views.get_my_holds_view, name="get_my_holds"),
+    path(
+        "booking/hold/release/<int:id>/",
+        views.release_hold_view,
+        name="release_hold",
+    ),
+    path(
+        "booking/hold/convert/<int:id>/",
+        views.convert_hold_view,
+        name="convert_hold",
+    ),
+    # Booking Waitlist API
+    path("booking/waitlist/join/", views.join_waitlist_view, name="join_waitlist"),
+    path(
+        "booking/waitlist/get-mine/",
+        views.get_my_waitlist_view,
+        name="get_my_waitlist",
+    ),
+    path(
+        "booking/waitlist/leave/<int:id>/",
+        views.leave_waitlist_view,
+        name="leave_waitlist",
+    ),
+    # Calendar Feed API
+    path(
+        "booking/ics/venue/<int:id>/",
+        views.get_venue_calendar_view,
+        name="get_venue_calendar",
+    ),
+    path(
+        "booking/ics/club/<int:id>/",
+        views.get_club_calendar_view,
+        name="get_club_calendar",
+    ),
+    path(
+        "booking/ics/user/<int:id>/",
+        views.get_user_calendar_view,
+        name="get_user_calendar",
+    ),
+    path(
+        "booking/ics/token/<str:feed>/<int:id>/",
+        views.get_calendar_token_view,
+        name="get_calendar_token",
+    ),
     # Club API
     path("club/create/", views.create_club_view, name="create_club"),
     path("club/get-all/", views.get_all_clubs_view, name="get_all_clubs"),
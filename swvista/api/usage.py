@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models.venue_daily_usage import VenueDailyUsage, empty_histogram
+from .models.venuebooking import VenueBooking
+
+ACTIVE_STATUSES = (VenueBooking.STATUS_PENDING, VenueBooking.STATUS_APPROVED)
+
+
+def minutes_by_local_hour(start, minutes):
+    """{local date: [minutes in each local hour]} covered by a booking"""
+    usage = {}
+    cursor = start
+    end = start + timedelta(minutes=minutes)
+    while cursor < end:
+        local = timezone.localtime(cursor)
+        # Step in absolute time to the next local hour boundary
+        next_hour = cursor + timedelta(
+            minutes=60 - local.minute,
+            seconds=-local.second,
+            microseconds=-local.microsecond,
+        )
+        step_end = min(next_hour, end)
+        hours = usage.setdefault(local.date(), empty_histogram())
+        hours[local.hour] += round((step_end - cursor) / timedelta(minutes=1))
+        cursor = step_end
+    return usage
+
+
+class UsageDelta:
+    """Changes to VenueDailyUsage rows, summed in memory per (venue, day)"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def add(self, snapshot, sign=1):
+        """Count (sign=1) or uncount (sign=-1) a booking's usage snapshot"""
+        if snapshot is None:
+            return
+        venue_id, start, minutes, status = snapshot
+        if status not in ACTIVE_STATUSES:
+            return
+        approved = status == VenueBooking.STATUS_APPROVED
+        for day, hours in minutes_by_local_hour(start, minutes).items():
+            row = self.rows.setdefault(
+                (venue_id, day),
+                {
+                    "booking_count": 0,
+                    "booked_minutes": 0,
+                    "approved_minutes": 0,
+                    "hourly_minutes": empty_histogram(),
+                },
+            )
+            booked = sum(hours)
+            row["booking_count"] += sign
+            row["booked_minutes"] += sign * booked
+            if approved:
+                row["approved_minutes"] += sign * booked
+            row["hourly_minutes"] = [
+                total + sign * value
+                for total, value in zip(row["hourly_minutes"], hours)
+            ]
+
+    def save(self):
+        """Apply the changes, locking each touched row"""
+        with transaction.atomic():
+            for (venue_id, day), change in sorted(self.rows.items()):
+                usage, _ = VenueDailyUsage.objects.select_for_update().get_or_create(
+                    venue_id=venue_id, date=day
+                )
+                usage.booking_count += change["booking_count"]
+                usage.booked_minutes += change["booked_minutes"]
+                usage.approved_minutes += change["approved_minutes"]
+                usage.hourly_minutes = [
+                    total + value
+                    for total, value in zip(
+                        usage.hourly_minutes, change["hourly_minutes"]
+                    )
+                ]
+                if usage.booking_count:
+                    usage.save()
+                else:
+                    # Keep the rollup identical to what rebuild() produces
+                    usage.delete()
+        self.rows.clear()
+
+
+def record_change(before, after):
+    """Move a booking's counted usage from snapshot `before` to `after`"""
+    if before == after:
+        return
+    delta = UsageDelta()
+    delta.add(before, sign=-1)
+    delta.add(after)
+    delta.save()
+
+
+def rebuild(chunk_size=2000):
+    """Recompute every VenueDailyUsage row from the bookings table"""
+    delta = UsageDelta()
+    rows = (
+        VenueBooking.objects.active()
+        .values_list(*VenueBooking.USAGE_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+    for snapshot in rows:
+        delta.add(snapshot)
+    with transaction.atomic():
+        VenueDailyUsage.objects.all().delete()
+        VenueDailyUsage.objects.bulk_create(
+            [
+                VenueDailyUsage(venue_id=venue_id, date=day, **change)
+                for (venue_id, day), change in sorted(delta.rows.items())
+            ],
+            batch_size=chunk_size,
+        )
+    return len(delta.rows)
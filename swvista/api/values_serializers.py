@@ -0,0 +1,202 @@
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from django.utils.encoding import force_str
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+
+from swvista.fieldsets import DISPLAY_METHOD
+from swvista.pagination import paginate
+from swvista.streaming import serialize_in_chunks
+
+from .formatting import datetime_formatter
+
+# Fields whose representation of a database value is the value itself
+_AS_IS = (
+    serializers.ReadOnlyField,
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.FloatField,
+)
+_SKIP = object()
+
+
+class ValuesSerializer:
+    """
+    What serializer_class(instances, many=True, context=context).data gives,
+    built straight from .values() rows: each kept field becomes one column
+    read and a precomputed conversion (choice labels from a dict, datetimes
+    with the timezone resolved once) instead of DRF's per-field attribute
+    lookups. The JSON is the same byte for byte.
+
+    Use for_serializer(), which returns None for serializers with fields
+    this cannot read from a row (nested serializers, method fields,
+    properties); serialize those with DRF as before.
+    """
+
+    def __init__(self, model, columns, lookups):
+        self.model = model
+        # [(field name, lookup, convert, null FK lookup, value on null FK)]
+        self.columns = columns
+        self.lookups = lookups
+
+    @classmethod
+    def for_serializer(cls, serializer_class, context=None):
+        if not settings.FAST_LIST_SERIALIZATION:
+            return None
+        context = context or {}
+        meta = serializer_class.Meta.model._meta
+        as_json = datetime_formatter()
+        columns = []
+        lookups = {meta.pk.name}
+        for name, field in serializer_class(context=context).fields.items():
+            if field.write_only:
+                continue
+            column = cls._column(meta, field, context, as_json)
+            if column is None:
+                return None
+            lookup, convert, null_fk = column
+            lookups.add(lookup)
+            on_null_fk = None
+            if null_fk:
+                lookups.add(null_fk)
+                on_null_fk = cls._on_missing(field)
+                if on_null_fk is None:
+                    return None
+            columns.append((name, lookup, convert, null_fk, on_null_fk))
+        return cls(serializer_class.Meta.model, columns, sorted(lookups))
+
+    @staticmethod
+    def _column(meta, field, context, as_json):
+        """(lookup, convert, nullable FK lookup) for `field`, or None"""
+        attrs = field.source_attrs
+        if not attrs or len(attrs) > 2:
+            return None
+        display = DISPLAY_METHOD.fullmatch(attrs[0])
+        try:
+            model_field = meta.get_field(display.group(1) if display else attrs[0])
+        except FieldDoesNotExist:
+            return None
+        if not model_field.concrete:
+            return None
+
+        if display:
+            if len(attrs) > 1 or not model_field.choices:
+                return None
+            labels = {
+                value: force_str(label, strings_only=True)
+                for value, label in model_field.flatchoices
+            }
+            return model_field.name, lambda value: labels.get(value, value), None
+        if len(attrs) == 2:
+            # A column of a related row, e.g. venue.name
+            if not model_field.is_relation or not isinstance(
+                field, serializers.ReadOnlyField
+            ):
+                return None
+            try:
+                model_field.related_model._meta.get_field(attrs[1])
+            except FieldDoesNotExist:
+                return None
+            null_fk = model_field.attname if model_field.null else None
+            return f"{model_field.name}__{attrs[1]}", None, null_fk
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            if field.pk_field is not None:
+                return None
+            return model_field.attname, None, None
+        if model_field.is_relation:
+            return None
+        if isinstance(field, serializers.DateTimeField):
+            if getattr(field, "format", api_settings.DATETIME_FORMAT) != ISO_8601:
+                return model_field.name, field.to_representation, None
+            return model_field.name, as_json, None
+        if isinstance(field, serializers.FileField):
+            if not isinstance(model_field, models.FileField):
+                return None
+            return model_field.name, _file_url(model_field, field, context), None
+        if isinstance(field, _AS_IS):
+            return model_field.name, None, None
+        if isinstance(field, serializers.Field) and not isinstance(
+            field, (serializers.BaseSerializer, serializers.SerializerMethodField)
+        ):
+            return model_field.name, field.to_representation, None
+        return None
+
+    @staticmethod
+    def _on_missing(field):
+        """What DRF gives for `field` when its related row is missing"""
+        if field.default is not empty:
+            return None  # Rare enough to leave to DRF
+        if field.allow_null:
+            return (None,)
+        if not field.required:
+            return _SKIP
+        return None
+
+    def values(self, queryset, *extra):
+        """`queryset` as the rows to_representation() reads, plus `extra`"""
+        return queryset.values(*self.lookups, *extra)
+
+    def to_representation(self, rows):
+        data = []
+        for row in rows:
+            item = {}
+            for name, lookup, convert, null_fk, on_null_fk in self.columns:
+                if null_fk and row[null_fk] is None:
+                    if on_null_fk is not _SKIP:
+                        item[name] = on_null_fk[0]
+                    continue
+                value = row[lookup]
+                if value is None or convert is None:
+                    item[name] = value
+                else:
+                    item[name] = convert(value)
+            data.append(item)
+        return data
+
+
+def serialize_page(request, queryset, serializer_class, context, ordering=("id",)):
+    """
+    One page of `queryset` (see swvista.pagination) as serializer_class
+    would serialize it, through a ValuesSerializer when one can be built.
+    Returns the data and the page fields; raises ValueError like paginate().
+    """
+    fast = ValuesSerializer.for_serializer(serializer_class, context)
+    if fast is None:
+        instances, page = paginate(request, queryset, ordering=ordering)
+        return serializer_class(instances, many=True, context=context).data, page
+    rows, page = paginate(request, fast.values(queryset), ordering=ordering)
+    return fast.to_representation(rows), page
+
+
+def serialize_all(queryset, serializer_class, context):
+    """
+    Every row of `queryset` as serializer_class would serialize it, a chunk
+    at a time (see swvista.streaming), through a ValuesSerializer when one
+    can be built.
+    """
+    fast = ValuesSerializer.for_serializer(serializer_class, context)
+    if fast is None:
+        return serialize_in_chunks(
+            queryset,
+            lambda chunk: serializer_class(chunk, many=True, context=context).data,
+        )
+    return serialize_in_chunks(fast.values(queryset), fast.to_representation)
+
+
+def _file_url(model_field, field, context):
+    use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+    request = context.get("request")
+
+    def convert(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = model_field.storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return convert
@@ -0,0 +1,333 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from heapq import nsmallest
+from math import asin, cos, floor, radians, sin, sqrt
+from threading import Lock
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .models.venue import Venue
+
+EARTH_RADIUS_KM = 6371.0088
+# Length of one degree of latitude
+KM_PER_DEGREE = 111.195
+
+
+class VenueEntry(NamedTuple):
+    capacity: int
+    id: int
+    name: str
+    latitude: float
+    longitude: float
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two coordinates in kilometres"""
+    lat1, lng1, lat2, lng2 = map(radians, (lat1, lng1, lat2, lng2))
+    a = (
+        sin((lat2 - lat1) / 2) ** 2
+        + cos(lat1) * cos(lat2) * sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * asin(sqrt(a))
+
+
+def entry_for(venue):
+    return VenueEntry(
+        venue.capacity, venue.id, venue.name, venue.latitude, venue.longitude
+    )
+
+
+class CapacityIndex:
+    """Venues sorted by capacity, so venues seating at least N are a bisect away"""
+
+    def __init__(self, entries):
+        self._entries = sorted(entries)
+        self._capacities = [entry.capacity for entry in self._entries]
+
+    def fitting(self, attendees):
+        """Venues with capacity >= attendees, smallest first"""
+        return self._entries[bisect_left(self._capacities, attendees) :]
+
+
+# Venue table version both indexes were built at, and when it was checked
+_venues = {"version": None, "checked_at": 0.0}
+_venues_lock = Lock()
+
+
+def _version():
+    """Changes whenever a venue is added, edited or deleted"""
+    state = Venue.objects.aggregate(count=Count("id"), changed=Max("updated_at"))
+    return state["count"], state["changed"]
+
+
+def _drop_if_stale():
+    """
+    Drop both indexes when the venue table changed, e.g. in another process
+    whose signals this one never sees. As with the approval pipelines
+    (api.pipelines), the version is re-checked at most every
+    VENUE_INDEX_CHECK_SECONDS with one aggregate query.
+    """
+    now = time.monotonic()
+    with _venues_lock:
+        if now - _venues["checked_at"] < settings.VENUE_INDEX_CHECK_SECONDS:
+            return
+        _venues["checked_at"] = now
+    # Read before the indexes are rebuilt from the rows: a change in between
+    # is picked up by the next check
+    version = _version()
+    with _venues_lock:
+        if _venues["version"] == version:
+            return
+        _venues["version"] = version
+    invalidate_capacity_index()
+    invalidate_spatial_index()
+
+
+_capacity_index = None
+_capacity_lock = Lock()
+
+
+def get_capacity_index():
+    """
+    Process-wide CapacityIndex, built from the venue table on first use and
+    dropped by invalidate_capacity_index() whenever a venue is saved or
+    deleted, or by the periodic version check when another process did so.
+    """
+    global _capacity_index
+    _drop_if_stale()
+    index = _capacity_index
+    if index is None:
+        with _capacity_lock:
+            if _capacity_index is None:
+                _capacity_index = CapacityIndex(
+                    VenueEntry(*row)
+                    for row in Venue.objects.values_list(
+                        "capacity", "id", "name", "latitude", "longitude"
+                    )
+                )
+            index = _capacity_index
+    return index
+
+
+def invalidate_capacity_index():
+    global _capacity_index
+    with _capacity_lock:
+        _capacity_index = None
+
+
+class SpatialIndex:
+    """
+    Uniform latitude/longitude grid over venues with coordinates.
+
+    Radius searches only visit the cells overlapping the search circle's
+    bounding box, and nearest-neighbour searches walk outwards ring by ring
+    until no unvisited cell can hold anything closer. Venues can be added,
+    moved and removed one at a time, so the grid never needs a full rebuild.
+    """
+
+    def __init__(self, entries=(), cell_degrees=0.05):
+        self.cell_degrees = cell_degrees
+        self._cells = defaultdict(dict)
+        self._cell_of = {}
+        self._lock = Lock()
+        for entry in entries:
+            self.upsert(entry)
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def _cell(self, latitude, longitude):
+        return (
+            floor(latitude / self.cell_degrees),
+            floor(longitude / self.cell_degrees),
+        )
+
+    def upsert(self, entry):
+        with self._lock:
+            self._discard(entry.id)
+            if entry.latitude is None or entry.longitude is None:
+                return
+            cell = self._cell(entry.latitude, entry.longitude)
+            self._cells[cell][entry.id] = entry
+            self._cell_of[entry.id] = cell
+
+    def remove(self, venue_id):
+        with self._lock:
+            self._discard(venue_id)
+
+    def _discard(self, venue_id):
+        cell = self._cell_of.pop(venue_id, None)
+        if cell is not None:
+            del self._cells[cell][venue_id]
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def within_radius(self, latitude, longitude, radius_km):
+        """(distance_km, entry) pairs within radius_km, closest first"""
+        lat_span = radius_km / KM_PER_DEGREE
+        # Longitude degrees shrink towards the poles; use the widest latitude
+        widest = min(abs(latitude) + lat_span, 89.9)
+        lng_span = min(radius_km / (KM_PER_DEGREE * cos(radians(widest))), 180)
+        low_row, low_col = self._cell(latitude - lat_span, longitude - lng_span)
+        high_row, high_col = self._cell(latitude + lat_span, longitude + lng_span)
+
+        found = []
+        with self._lock:
+            box_cells = (high_row - low_row + 1) * (high_col - low_col + 1)
+            if box_cells <= len(self._cells):
+                cells = (
+                    self._cells.get((row, col), {})
+                    for row in range(low_row, high_row + 1)
+                    for col in range(low_col, high_col + 1)
+                )
+            else:
+                # Huge radius: cheaper to filter the occupied cells
+                cells = (
+                    venues
+                    for (row, col), venues in self._cells.items()
+                    if low_row <= row <= high_row and low_col <= col <= high_col
+                )
+            for venues in cells:
+                for entry in venues.values():
+                    distance = haversine_km(
+                        latitude, longitude, entry.latitude, entry.longitude
+                    )
+                    if distance <= radius_km:
+                        found.append((distance, entry))
+        found.sort()
+        return found
+
+    def nearest(self, latitude, longitude, k):
+        """The k closest (distance_km, entry) pairs, closest first"""
+        row, col = self._cell(latitude, longitude)
+        best = []
+        with self._lock:
+            if not self._cells:
+                return []
+            rows = [cell[0] for cell in self._cells]
+            cols = [cell[1] for cell in self._cells]
+            max_ring = max(
+                abs(row - min(rows)),
+                abs(row - max(rows)),
+                abs(col - min(cols)),
+                abs(col - max(cols)),
+            )
+            for ring in range(max_ring + 1):
+                if len(best) >= k and best[-1][0] <= self._ring_distance_km(
+                    latitude, ring
+                ):
+                    break
+                for cell in self._ring(row, col, ring):
+                    for entry in self._cells.get(cell, {}).values():
+                        best.append(
+                            (
+                                haversine_km(
+                                    latitude,
+                                    longitude,
+                                    entry.latitude,
+                                    entry.longitude,
+                                ),
+                                entry,
+                            )
+                        )
+                best = nsmallest(k, best)
+        return best
+
+    def _ring_distance_km(self, latitude, ring):
+        """Lower bound on the distance to any cell `ring` steps away"""
+        if ring <= 0:
+            return 0.0
+        steps = (ring - 1) * self.cell_degrees
+        widest = min(abs(latitude) + steps + self.cell_degrees, 89.9)
+        return steps * KM_PER_DEGREE * cos(radians(widest))
+
+    @staticmethod
+    def _ring(row, col, ring):
+        if ring == 0:
+            yield row, col
+            return
+        for offset in range(-ring, ring + 1):
+            yield row - ring, col + offset
+            yield row + ring, col + offset
+        for offset in range(-ring + 1, ring):
+            yield row + offset, col - ring
+            yield row + offset, col + ring
+
+
+_spatial_index = None
+_spatial_lock = Lock()
+
+
+def get_spatial_index():
+    """
+    Process-wide SpatialIndex, built from the venue table on first use and
+    then kept current one venue at a time by the Venue signals. Rebuilt when
+    the periodic version check finds venues changed by another process.
+    """
+    global _spatial_index
+    _drop_if_stale()
+    index = _spatial_index
+    if index is None:
+        with _spatial_lock:
+            if _spatial_index is None:
+                _spatial_index = SpatialIndex(
+                    VenueEntry(*row)
+                    for row in Venue.objects.exclude(latitude=None)
+                    .exclude(longitude=None)
+                    .values_list("capacity", "id", "name", "latitude", "longitude")
+                )
+            index = _spatial_index
+    return index
+
+
+def invalidate_spatial_index():
+    global _spatial_index
+    with _spatial_lock:
+        _spatial_index = None
+
+
+def _advance_version(expected):
+    """
+    Move the remembered version past a change this process has already
+    applied to its indexes, so the periodic check only rebuilds for changes
+    made elsewhere. If the table no longer matches what the local change
+    alone would give, another process wrote too and the stale version is
+    kept for the next check to act on.
+    """
+    with _venues_lock:
+        known = _venues["version"]
+    if known is None:
+        return
+    expected = expected(*known)
+    if expected is not None and _version() == expected:
+        with _venues_lock:
+            if _venues["version"] == known:
+                _venues["version"] = expected
+
+
+def venue_saved(venue, created=False):
+    if _spatial_index is not None:
+        _spatial_index.upsert(entry_for(venue))
+    _advance_version(
+        lambda count, changed: (
+            count + 1 if created else count,
+            max(changed, venue.updated_at) if changed else venue.updated_at,
+        )
+    )
+
+
+def venue_deleted(venue_id):
+    if _spatial_index is not None:
+        _spatial_index.remove(venue_id)
+    # Deleting the most recently updated venue lowers Max(updated_at) to a
+    # value only the database knows; leave that case to the next check
+    _advance_version(
+        lambda count, changed: (
+            (count - 1, changed)
+            if Venue.objects.filter(updated_at=changed).exists()
+            else None
+        )
+    )
@@ -1,9 +1,36 @@
+from .controller.approval_analytics import get_approval_analytics, get_sla_breaches
 from .controller.booking_approvals import (
     approve_booking,
+    bulk_review_bookings,
     get_approval_history,
+    get_approval_queue,
     get_pending_approvals,
     reject_booking,
 )
+from .controller.booking_hold import (
+    convert_hold,
+    create_hold,
+    get_my_holds,
+    release_hold,
+)
+from .controller.booking_series import (
+    approve_series,
+    create_series,
+    delete_series,
+    get_all_series,
+    get_series_approval_history,
+    get_series_by_id,
+    get_series_occurrences,
+    reject_series,
+    update_series,
+)
+from .controller.booking_waitlist import get_my_waitlist, join_waitlist, leave_waitlist
+from .controller.calendar_feed import (
+    get_calendar_token,
+    get_club_calendar,
+    get_user_calendar,
+    get_venue_calendar,
+)
 from .controller.club import (
     add_member_to_club,
     create_club,
@@ -16,23 +43,33 @@ from .controller.club import (
     update_club,
 )
 from .controller.proposal import (
+    approve_proposal,
+    bulk_approve_proposals,
     create_proposal,
     delete_proposal,
+    export_proposals,
     get_all_proposals,
     get_all_proposals_by_user,
     get_proposal_by_id,
+    recommend_venues,
     update_proposal,
 )
 from .controller.venue import (
     create_venue,
     delete_venue,
     get_all_venues,
+    get_nearby_venues,
     get_venue_by_id,
+    get_venue_utilization,
     update_venue,
 )
 from .controller.venue_booking import (
+    bulk_create_bookings,
     create_booking,
+    delete_booking,
+    export_bookings,
     get_all_bookings,
+    get_availability,
     get_booking_by_id,
     update_booking,
 )
@@ -43,6 +80,14 @@ def get_all_venues_view(request):
     return get_all_venues(request)
 
 
+def get_nearby_venues_view(request):
+    return get_nearby_venues(request)
+
+
+def get_venue_utilization_view(request):
+    return get_venue_utilization(request)
+
+
 def get_venue_by_id_view(request, id):
     return get_venue_by_id(request, id)
 
@@ -68,6 +113,10 @@ def get_all_proposals_by_user_view(request):
     return get_all_proposals_by_user(request)
 
 
+def export_proposals_view(request):
+    return export_proposals(request)
+
+
 def get_proposal_by_id_view(request, id):
     return get_proposal_by_id(request, id)
 
@@ -84,15 +133,35 @@ def delete_proposal_view(request, id):
     return delete_proposal(request, id)
 
 
+def approve_proposal_view(request, id):
+    return approve_proposal(request, id)
+
+
+def bulk_approve_proposals_view(request):
+    return bulk_approve_proposals(request)
+
+
+def recommend_venues_view(request, id):
+    return recommend_venues(request, id)
+
+
 # Venue Booking API
 def create_venue_booking_view(request):
     return create_booking(request)
 
 
+def bulk_create_bookings_view(request):
+    return bulk_create_bookings(request)
+
+
 def get_all_bookings_view(request):
     return get_all_bookings(request)
 
 
+def export_bookings_view(request):
+    return export_bookings(request)
+
+
 def get_booking_by_id_view(request, id):
     return get_booking_by_id(request, id)
 
@@ -101,6 +170,14 @@ def update_booking_view(request, id):
     return update_booking(request, id)
 
 
+def delete_booking_view(request, id):
+    return delete_booking(request, id)
+
+
+def get_availability_view(request):
+    return get_availability(request)
+
+
 # Booking Approvals API
 def approve_booking_view(request, id):
     return approve_booking(request, id)
@@ -110,6 +187,22 @@ def reject_booking_view(request, id):
     return reject_booking(request, id)
 
 
+def bulk_review_bookings_view(request):
+    return bulk_review_bookings(request)
+
+
+def get_approval_queue_view(request):
+    return get_approval_queue(request)
+
+
+def get_approval_analytics_view(request):
+    return get_approval_analytics(request)
+
+
+def get_sla_breaches_view(request):
+    return get_sla_breaches(request)
+
+
 def get_pending_approvals_view(request):
     return get_pending_approvals(request)
 
@@ -118,6 +211,90 @@ def get_approval_history_view(request, id):
     return get_approval_history(request, id)
 
 
+# Booking Series API
+def create_series_view(request):
+    return create_series(request)
+
+
+def get_all_series_view(request):
+    return get_all_series(request)
+
+
+def get_series_by_id_view(request, id):
+    return get_series_by_id(request, id)
+
+
+def update_series_view(request, id):
+    return update_series(request, id)
+
+
+def delete_series_view(request, id):
+    return delete_series(request, id)
+
+
+def get_series_occurrences_view(request):
+    return get_series_occurrences(request)
+
+
+def approve_series_view(request, id):
+    return approve_series(request, id)
+
+
+def reject_series_view(request, id):
+    return reject_series(request, id)
+
+
+def get_series_approval_history_view(request, id):
+    return get_series_approval_history(request, id)
+
+
+# Booking Hold API
+def create_hold_view(request):
+    return create_hold(request)
+
+
+def get_my_holds_view(request):
+    return get_my_holds(request)
+
+
+def release_hold_view(request, id):
+    return release_hold(request, id)
+
+
+def convert_hold_view(request, id):
+    return convert_hold(request, id)
+
+
+# Booking Waitlist API
+def join_waitlist_view(request):
+    return join_waitlist(request)
+
+
+def get_my_waitlist_view(request):
+    return get_my_waitlist(request)
+
+
+def leave_waitlist_view(request, id):
+    return leave_waitlist(request, id)
+
+
+# Calendar Feed API
+def get_venue_calendar_view(request, id):
+    return get_venue_calendar(request, id)
+
+
+def get_club_calendar_view(request, id):
+    return get_club_calendar(request, id)
+
+
+def get_user_calendar_view(request, id):
+    return get_user_calendar(request, id)
+
+
+def get_calendar_token_view(request, feed, id):
+    return get_calendar_token(request, feed, id)
+
+
 # Club API
 def create_club_view(request):
     return create_club(request)
@@ -0,0 +1,55 @@
+from .conflicts import find_conflicts
+from .models.notification_outbox import NotificationOutbox
+from .models.venuebooking import VenueBooking
+from .models.waitlist_entry import WaitlistEntry
+from .notifications import enqueue_reviews, review_of
+
+
+def promote(venue_id, start, end):
+    """
+    Turn waiting entries for `venue_id` overlapping the freed slot
+    [start, end) into pending bookings, best first, as long as their slot is
+    free now. Call with the venue locked (locks.locked_venues) in the
+    transaction that freed the slot, so the promotion commits with it.
+    Returns the new bookings.
+
+    Candidates come from one range scan of the partial
+    (venue, booking_date, -priority, created_at) index.
+    """
+    candidates = (
+        WaitlistEntry.objects.waiting()
+        .filter(venue_id=venue_id)
+        .overlapping(start, end)
+        .select_related("venue")
+        .in_promotion_order()
+    )
+    promoted = []
+    for entry in candidates:
+        # Bookings promoted earlier in this loop are conflicts too
+        if find_conflicts(entry.venue, entry.booking_date, entry.booking_duration):
+            continue
+        booking = VenueBooking.objects.create(
+            requester_id=entry.requester_id,
+            venue=entry.venue,
+            proposal_id=entry.proposal_id,
+            event_type=entry.event_type,
+            booking_date=entry.booking_date,
+            booking_duration=entry.booking_duration,
+        )
+        entry.status = WaitlistEntry.STATUS_PROMOTED
+        entry.booking = booking
+        entry.save(update_fields=["status", "booking"])
+        promoted.append(booking)
+    enqueue_reviews(
+        [review_of(booking, "") for booking in promoted],
+        requester_event=NotificationOutbox.EVENT_WAITLIST_PROMOTED,
+    )
+    return promoted
+
+
+def promote_freed(slots):
+    """promote() for every (venue_id, start, end) slot freed by a change"""
+    promoted = []
+    for venue_id, start, end in slots:
+        promoted += promote(venue_id, start, end)
+    return promoted
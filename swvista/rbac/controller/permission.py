@@ -2,6 +2,9 @@ import json
 
 from django.http import JsonResponse
 
+from swvista.fieldsets import fieldset_context
+from swvista.pagination import paginate
+
 from ..decorators import check_user_permission, session_login_required
 from ..models import Permission
 from ..serializers import PermissionSerializer
@@ -21,9 +24,16 @@ def create_permission(request):
 @session_login_required
 @check_user_permission([{"subject": "permission", "action": "read"}])
 def get_permission(request):
-    permissions = Permission.objects.all()
-    serializer = PermissionSerializer(permissions, many=True)
-    return JsonResponse(serializer.data, safe=False, status=200)
+    try:
+        fieldsets = fieldset_context(request, PermissionSerializer)
+        permissions, page = paginate(
+            request,
+            PermissionSerializer.sparse_queryset(Permission.objects.all(), fieldsets),
+        )
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
+    serializer = PermissionSerializer(permissions, many=True, context=fieldsets)
+    return JsonResponse({"results": serializer.data, **page}, status=200)
 
 
 @session_login_required
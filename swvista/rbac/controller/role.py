@@ -2,6 +2,8 @@ import json
 
 from django.http import JsonResponse
 
+from swvista.pagination import paginate
+
 from ..decorators import check_user_permission, session_login_required
 from ..models import Role, RolePermission
 from ..serializers import RolePermissionSerializer, RoleSerializer
@@ -34,7 +36,10 @@ def create_role(request):
 @session_login_required
 @check_user_permission([{"subject": "role", "action": "read"}])
 def get_role(request):
-    roles = Role.objects.all()
+    try:
+        roles, page = paginate(request, Role.objects.prefetch_related("permissions"))
+    except ValueError as e:
+        return JsonResponse({"message": str(e)}, status=400)
     all_roles_data = []
     for role in roles:
         role_data = {
@@ -48,7 +53,7 @@ def get_role(request):
         }
         all_roles_data.append(role_data)
 
-    return JsonResponse(all_roles_data, safe=False, status=200)
+    return JsonResponse({"results": all_roles_data, **page}, status=200)
 
 
 @session_login_required
@@ -2,6 +2,9 @@ import json
 
 from django.http import JsonResponse
 
+from swvista.pagination import paginate
+from swvista.streaming import StreamingJsonResponse, serialize_in_chunks
+
 from ..decorators import check_user_permission, session_login_required
 from ..models import User, UserRole
 from ..serializers import (
@@ -86,54 +89,79 @@ def create_user(request):
         return JsonResponse({"error": "Internal server error."}, status=500)
 
 
+# Map user roles to profile serializers and the profile's accessor on User
+PROFILE_MAP = {
+    "clubMember": (ClubMemberProfileSerializer, "clubmemberprofile"),
+    "studentCouncil": (StudentCouncilProfileSerializer, "studentcouncilprofile"),
+    "facultyAdvisor": (FacultyAdvisorProfileSerializer, "facultyadvisorprofile"),
+    "studentWelfare": (StudentWelfareProfileSerializer, "studentwelfareprofile"),
+    "securityHead": (SecurityHeadProfileSerializer, "securityheadprofile"),
+}
+
+
+def _users_with_profiles():
+    # Roles, permissions and profiles come with the users instead of
+    # several queries per user
+    return User.objects.select_related(
+        "role", *(accessor for _, accessor in PROFILE_MAP.values())
+    ).prefetch_related("role__permissions")
+
+
+def _user_data(user):
+    user_data = {
+        "id": user.id,
+        "username": user.username,
+        "name": user.name,
+        "email": user.email,
+        "registration_id": user.registration_id,
+        "role": {
+            "id": user.role.id,
+            "name": user.role.name,
+            "description": user.role.description,
+            "permissions": [
+                {"id": permission.id, "name": permission.name}
+                for permission in user.role.permissions.all()
+            ],
+        },
+    }
+
+    # Try to get related profile based on user type
+    try:
+        role_key = user.role.name  # e.g., "clubMember"
+        serializer_class, accessor = PROFILE_MAP.get(role_key, (None, None))
+        if serializer_class:
+            profile_instance = getattr(user, accessor, None)
+            if profile_instance:
+                user_data["profile"] = serializer_class(profile_instance).data
+    except Exception as e:
+        print(f"⚠️ Error fetching profile for user {user.username}: {e}")
+        user_data["profile"] = None
+    return user_data
+
+
 @session_login_required
 @check_user_permission([{"subject": "user", "action": "read"}])
 def get_user(request):
-    all_users = User.objects.all()
-    all_users_data = []
-
-    # Map user roles to profile models and serializers
-    profile_map = {
-        "clubMember": ClubMemberProfileSerializer,
-        "studentCouncil": StudentCouncilProfileSerializer,
-        "facultyAdvisor": FacultyAdvisorProfileSerializer,
-        "studentWelfare": StudentWelfareProfileSerializer,
-        "securityHead": SecurityHeadProfileSerializer,
-    }
+    try:
+        all_users, page = paginate(request, _users_with_profiles())
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    all_users_data = [_user_data(user) for user in all_users]
+    return JsonResponse({"results": all_users_data, **page}, status=200)
 
-    for user in all_users:
-        user_data = {
-            "id": user.id,
-            "username": user.username,
-            "name": user.name,
-            "email": user.email,
-            "registration_id": user.registration_id,
-            "role": {
-                "id": user.role.id,
-                "name": user.role.name,
-                "description": user.role.description,
-                "permissions": [
-                    {"id": permission.id, "name": permission.name}
-                    for permission in user.role.permissions.all()
-                ],
-            },
-        }
 
-        # Try to get related profile based on user type
-        try:
-            role_key = user.role.name  # e.g., "clubMember"
-            serializer_class = profile_map.get(role_key)
-            if serializer_class:
-                profile_instance = getattr(user, f"{role_key}_profile", None)
-                if profile_instance:
-                    user_data["profile"] = serializer_class(profile_instance).data
-        except Exception as e:
-            print(f"⚠️ Error fetching profile for user {user.username}: {e}")
-            user_data["profile"] = None
-
-        all_users_data.append(user_data)
-
-    return JsonResponse(all_users_data, safe=False, status=200)
+@session_login_required
+@check_user_permission([{"subject": "user", "action": "read"}])
+def export_users(request):
+    # Every user as one JSON array, streamed a chunk at a time
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET method allowed."}, status=405)
+    return StreamingJsonResponse(
+        serialize_in_chunks(
+            _users_with_profiles().order_by("id"),
+            lambda chunk: [_user_data(user) for user in chunk],
+        )
+    )
 
 
 @session_login_required
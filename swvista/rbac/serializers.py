@@ -1,6 +1,8 @@
 from django.contrib.auth.hashers import make_password  # Import hasher
 from rest_framework import serializers
 
+from swvista.fieldsets import SparseFieldsetsMixin
+
 from .models import (
     ClubMemberProfile,
     FacultyAdvisorProfile,
@@ -15,19 +17,19 @@ from .models import (
 )
 
 
-class PermissionSerializer(serializers.ModelSerializer):
+class PermissionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Permission
         fields = "__all__"  # Include all fields from the model
 
 
-class RoleSerializer(serializers.ModelSerializer):
+class RoleSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = Role
         fields = "__all__"
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
 
     password = serializers.CharField(
         write_only=True, required=False, style={"input_type": "password"}
@@ -65,43 +67,49 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 # serializers.py
-class ClubMemberProfileSerializer(serializers.ModelSerializer):
+class ClubMemberProfileSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = ClubMemberProfile
         fields = "__all__"
 
 
-class StudentCouncilProfileSerializer(serializers.ModelSerializer):
+class StudentCouncilProfileSerializer(
+    SparseFieldsetsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = StudentCouncilProfile
         fields = "__all__"
 
 
-class FacultyAdvisorProfileSerializer(serializers.ModelSerializer):
+class FacultyAdvisorProfileSerializer(
+    SparseFieldsetsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = FacultyAdvisorProfile
         fields = "__all__"
 
 
-class StudentWelfareProfileSerializer(serializers.ModelSerializer):
+class StudentWelfareProfileSerializer(
+    SparseFieldsetsMixin, serializers.ModelSerializer
+):
     class Meta:
         model = StudentWelfareProfile
         fields = "__all__"
 
 
-class SecurityHeadProfileSerializer(serializers.ModelSerializer):
+class SecurityHeadProfileSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = SecurityHeadProfile
         fields = "__all__"
 
 
-class UserRoleSerializer(serializers.ModelSerializer):
+class UserRoleSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = UserRole
         fields = "__all__"
 
 
-class RolePermissionSerializer(serializers.ModelSerializer):
+class RolePermissionSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     class Meta:
         model = RolePermission
         fields = "__all__"
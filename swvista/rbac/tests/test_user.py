@@ -0,0 +1,63 @@
+import json
+
+from api.tests.utils import login
+from django.test import TestCase
+
+from ..models import ClubMemberProfile, Role, User
+
+USER_PERMISSIONS = [{"subject": "user", "action": "read"}]
+
+
+class UserProfileTests(TestCase):
+    """User listings include the profile of the user's role, when there is one"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create(
+            username="viewer",
+            name="viewer",
+            role=Role.objects.create(name="viewer", description=""),
+        )
+        cls.member = User.objects.create(
+            username="member",
+            name="member",
+            role=Role.objects.create(name="clubMember", description=""),
+        )
+        cls.profile = ClubMemberProfile.objects.create(
+            user=cls.member,
+            learner_id="L1",
+            reg_number="R1",
+            post="Secretary",
+            club_name="Chess",
+        )
+
+    def listed(self, path):
+        login(self.client, self.viewer, USER_PERMISSIONS)
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            users = json.loads(b"".join(response.streaming_content))
+        else:
+            users = response.json()["results"]
+        return {user["username"]: user for user in users}
+
+    def test_list_includes_the_role_profile(self):
+        users = self.listed("/api/v1/auth/user/")
+        self.assertEqual(
+            users["member"]["profile"],
+            {
+                "id": self.profile.id,
+                "user": self.member.id,
+                "learner_id": "L1",
+                "reg_number": "R1",
+                "post": "Secretary",
+                "club_name": "Chess",
+            },
+        )
+        # Roles without a profile model, and users without a profile row
+        self.assertNotIn("profile", users["viewer"])
+
+    def test_export_includes_the_role_profile(self):
+        users = self.listed("/api/v1/auth/user/export/")
+        self.assertEqual(users["member"]["profile"]["club_name"], "Chess")
+        self.assertNotIn("profile", users["viewer"])
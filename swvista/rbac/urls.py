@@ -8,6 +8,7 @@ urlpatterns = [
     path("logout/", views.logout_view, name="logout"),
     path("me/", views.me_view, name="me"),
     path("user/", views.user, name="users"),
+    path("user/export/", views.user_export, name="user_export"),
     path("role/", views.role, name="roles"),
     path("permission/", views.permission, name="permissions"),
     path("user_role/", views.user_role, name="user_role"),
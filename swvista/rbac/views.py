@@ -4,6 +4,8 @@ from django.contrib.auth.hashers import check_password
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 
+from swvista.pagination import paginate
+
 from .controller.permission import (
     create_permission,
     delete_permission,
@@ -22,6 +24,7 @@ from .controller.role import (
 from .controller.user import (
     create_user,
     delete_user,
+    export_users,
     get_user,
     map_user_to_role,
     unmap_user_role,
@@ -30,7 +33,7 @@ from .controller.user import (
 
 # Import the custom decorator
 from .decorators import session_login_required
-from .models import Role, User, UserRole
+from .models import User, UserRole
 from .serializers import UserRoleSerializer
 
 # Create your views here.
@@ -166,6 +169,12 @@ def user(request):
         return JsonResponse({"message": "test GET"})
 
 
+@ensure_csrf_cookie
+@session_login_required
+def user_export(request):
+    return export_users(request)
+
+
 @ensure_csrf_cookie
 @session_login_required
 def role(request):
@@ -229,17 +238,23 @@ def get_map_role_to_user(request):
 @ensure_csrf_cookie
 def get_users_role(request):
     if request.method == "GET":
-        user_roles = UserRole.objects.all()
-        print("user_roles")
-        serializer = UserRoleSerializer(user_roles, many=True)
-        print("serializer")
-        print(serializer.data)
+        # Users and roles are joined in and permissions prefetched for the
+        # whole page instead of being fetched per mapping
+        try:
+            user_roles, page = paginate(
+                request,
+                UserRole.objects.select_related("user", "role").prefetch_related(
+                    "role__permissions"
+                ),
+            )
+        except ValueError as e:
+            return JsonResponse({"message": str(e)}, status=400)
 
         all_users_data = []
 
         for user_role in user_roles:
-            user = User.objects.get(id=user_role.user_id)
-            role = Role.objects.get(id=user_role.role_id)
+            user = user_role.user
+            role = user_role.role
             all_users_data.append(
                 {
                     "username": user.username,
@@ -256,7 +271,7 @@ def get_users_role(request):
                 }
             )
 
-        return JsonResponse(all_users_data, safe=False, status=200)
+        return JsonResponse({"results": all_users_data, **page}, status=200)
     else:
         return JsonResponse({"message": "test GET"})
 
@@ -264,9 +279,9 @@ def get_users_role(request):
 @ensure_csrf_cookie
 def get_user_role_by_user_id(request, user_id):
     if request.method == "GET":
-        user_role = UserRole.objects.get(user_id=user_id)
-        user = User.objects.get(id=user_id)
-        role = Role.objects.get(id=user_role.role_id)
+        user_role = UserRole.objects.select_related("user", "role").get(user_id=user_id)
+        user = user_role.user
+        role = user_role.role
         user_role_data = {
             "username": user.username,
             "email": user.email,
@@ -288,9 +303,9 @@ def get_user_role_by_user_id(request, user_id):
 @ensure_csrf_cookie
 def get_user_role_by_role_id(request, role_id):
     if request.method == "GET":
-        user_role = UserRole.objects.get(role_id=role_id)
-        user = User.objects.get(id=user_role.user_id)
-        role = Role.objects.get(id=role_id)
+        user_role = UserRole.objects.select_related("user", "role").get(role_id=role_id)
+        user = user_role.user
+        role = user_role.role
         user_role_data = {
             "username": user.username,
             "email": user.email,
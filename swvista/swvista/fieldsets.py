@@ -0,0 +1,117 @@
+import re
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+
+DISPLAY_METHOD = re.compile(r"get_(\w+)_display")
+
+
+def _names(raw):
+    return {name.strip() for name in raw.split(",") if name.strip()}
+
+
+def fieldset_context(request, serializer_class):
+    """
+    Serializer context selecting the ?fields=a,b and ?expand=c requested for
+    `serializer_class` (see SparseFieldsetsMixin). Raises ValueError naming
+    fields the serializer does not have.
+    """
+    context = {}
+    known = {
+        name
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    }
+    expandable = set(getattr(serializer_class.Meta, "expandable_fields", ()))
+    if "fields" in request.GET:
+        fields = _names(request.GET["fields"])
+        unknown = fields - known
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}.")
+        context["fields"] = fields
+    if "expand" in request.GET:
+        expand = _names(request.GET["expand"])
+        unknown = expand - expandable
+        if unknown:
+            raise ValueError(
+                f"Cannot expand: {', '.join(sorted(unknown))}."
+                f" Expandable: {', '.join(sorted(expandable)) or 'nothing'}."
+            )
+        context["expand"] = expand
+    return context
+
+
+class SparseFieldsetsMixin:
+    """
+    Serializer mixin for sparse fieldsets. context["fields"] keeps only the
+    named fields, and the fields in Meta.expandable_fields are only kept when
+    named in context["expand"]. Without either key every field is serialized
+    as before. sparse_queryset() narrows the rows to what is kept.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get("fields")
+        expand = self.context.get("expand")
+        expandable = getattr(self.Meta, "expandable_fields", ())
+        for name in list(self.fields):
+            if expand is not None and name in expandable:
+                keep = name in expand
+            else:
+                keep = fields is None or name in fields
+            if not keep:
+                self.fields.pop(name)
+
+    @classmethod
+    def sparse_queryset(cls, queryset, context):
+        """
+        `queryset` loading only the columns the kept fields read (.only()),
+        and joining and prefetching only the relations they use. Left as it
+        is when a kept field reads something that is not a model field, e.g.
+        a property.
+        """
+        if "fields" not in context and "expand" not in context:
+            return queryset
+        meta = queryset.model._meta
+        joined = queryset.query.select_related
+        joined = joined if isinstance(joined, dict) else {}
+
+        columns = {meta.pk.name}
+        relations = set()
+        for field in cls(context=context).fields.values():
+            if field.write_only:
+                continue
+            attrs = field.source_attrs
+            if not attrs:  # source="*" reads the whole object
+                return queryset
+            display = DISPLAY_METHOD.fullmatch(attrs[0])
+            name = display.group(1) if display else attrs[0]
+            try:
+                model_field = meta.get_field(name)
+            except FieldDoesNotExist:
+                return queryset
+            relations.add(name)
+            if not model_field.concrete:
+                continue  # Reverse relations are prefetched
+            columns.add(name)
+            if len(attrs) > 1:
+                if name not in joined or len(attrs) > 2:
+                    return queryset
+                columns.add(f"{name}__{attrs[1]}")
+
+        prefetches = [
+            lookup
+            for lookup in queryset._prefetch_related_lookups
+            if (
+                lookup.prefetch_through if isinstance(lookup, Prefetch) else lookup
+            ).split("__")[0]
+            in relations
+        ]
+        queryset = queryset.select_related(None)
+        # select_related() without names would join every relation
+        kept_joins = [name for name in joined if name in relations]
+        if kept_joins:
+            queryset = queryset.select_related(*kept_joins)
+        return (
+            queryset.prefetch_related(None).prefetch_related(*prefetches).only(*columns)
+        )
@@ -0,0 +1,134 @@
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+def _parse_limit(request, page_size, max_page_size):
+    raw = request.GET.get("limit")
+    if raw in (None, ""):
+        return page_size
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("'limit' must be an integer.")
+    if limit < 1:
+        raise ValueError("'limit' must be at least 1.")
+    return min(limit, max_page_size)
+
+
+def _keys(ordering):
+    """[(field name, descending)] for `ordering`, ending with the primary key"""
+    keys = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+    if keys[-1][0] != "id":
+        keys.append(("id", keys[-1][1]))
+    return keys
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder rounds to milliseconds, which would skip or
+        # repeat rows whose keys differ by less
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    raw = json.dumps(values, cls=_CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(model, keys, cursor):
+    """The key values of a cursor, converted back to their field types"""
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError()
+        return [
+            model._meta.get_field(name).to_python(value)
+            for (name, _), value in zip(keys, raw)
+        ]
+    except (ValueError, TypeError, ValidationError):
+        raise ValueError("'cursor' is not valid.")
+
+
+def _after(keys, values):
+    """Q for rows after `values` in keyset order"""
+    clauses = []
+    for position, (name, descending) in enumerate(keys):
+        equal = {prefix: value for (prefix, _), value in zip(keys[:position], values)}
+        clauses.append(
+            Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": values[position]})
+        )
+    return reduce(or_, clauses)
+
+
+def _key_value(row, name):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def paginate(
+    request,
+    queryset,
+    ordering=("id",),
+    page_size=None,
+    max_page_size=None,
+):
+    """
+    One page of `queryset` in keyset order: the rows after ?cursor= sorted
+    by `ordering` with the primary key breaking ties, ?limit= at a time
+    (default PAGINATION_PAGE_SIZE, capped at PAGINATION_MAX_PAGE_SIZE).
+    Given an index on the ordering columns followed by the primary key
+    (which every list endpoint's model has), each page is one indexed
+    range read, however deep it is. The total is only counted with
+    ?count=true.
+
+    `queryset` may be of model instances or of .values() dicts.
+    Returns the page and the response fields to send along with it:
+    next_cursor (None on the last page) and, when asked for, count.
+    Raises ValueError for a bad ?limit= or ?cursor=.
+    """
+    limit = _parse_limit(
+        request,
+        page_size or settings.PAGINATION_PAGE_SIZE,
+        max_page_size or settings.PAGINATION_MAX_PAGE_SIZE,
+    )
+    keys = _keys(ordering)
+    cursor = request.GET.get("cursor")
+
+    meta = {}
+    if request.GET.get("count") == "true":
+        meta["count"] = queryset.count()
+    queryset = queryset.order_by(
+        *(f"-{name}" if descending else name for name, descending in keys)
+    )
+    loaded, deferring = queryset.query.deferred_loading
+    if loaded and not deferring:
+        # Under .only() the cursor's columns must be loaded too
+        queryset = queryset.only(*loaded, *(name for name, _ in keys))
+    elif queryset.query.values_select:
+        # ...and so must they be in .values() rows
+        queryset = queryset.values(
+            *dict.fromkeys([*queryset.query.values_select, *(name for name, _ in keys)])
+        )
+    if cursor:
+        queryset = queryset.filter(
+            _after(keys, decode_cursor(queryset.model, keys, cursor))
+        )
+    # One extra row tells whether there is a next page
+    page = list(queryset[: limit + 1])
+    has_next = len(page) > limit
+    page = page[:limit]
+    meta["next_cursor"] = (
+        encode_cursor([_key_value(page[-1], name) for name, _ in keys])
+        if has_next
+        else None
+    )
+    return page, meta
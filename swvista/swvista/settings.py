@@ -86,9 +86,16 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # A file rather than SQLite's shared in-memory test database, which
+        # fails lock waits at once instead of honouring busy_timeout; the
+        # threaded tests in api.tests rely on writers waiting their turn
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
+# Builds the test database from the models; see swvista/test_runner.py
+TEST_RUNNER = "swvista.test_runner.ModelsTestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -160,3 +167,94 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "https://44e4-65-1-123-78.ngrok-free.app",
 ]
+
+# --- Venue Booking Settings ---
+
+# Longest booking allowed, in minutes. Conflict checks rely on this bound to
+# keep their overlap query a bounded range scan.
+BOOKING_MAX_DURATION_MINUTES = 24 * 60
+
+# Widest date range the availability search answers in one request, in days
+BOOKING_AVAILABILITY_MAX_DAYS = 92
+
+# Most bookings accepted by a single booking/bulk-create/ request
+BOOKING_BULK_MAX_ITEMS = 500
+
+# Most occurrences a recurring booking series may expand to
+BOOKING_SERIES_MAX_OCCURRENCES = 366
+
+# Number of (series, window) occurrence expansions kept in the in-process LRU cache
+BOOKING_SERIES_CACHE_SIZE = 2048
+
+# Largest search radius and result count for venue/nearby/
+VENUE_NEARBY_MAX_RADIUS_KM = 100
+VENUE_NEARBY_MAX_RESULTS = 100
+# Most venues proposal/recommend-venues/ returns, whatever ?limit= asks for
+VENUE_RECOMMEND_MAX_RESULTS = 100
+# Seconds a process trusts its in-memory venue indexes (capacity and
+# spatial) before checking the database for venues changed elsewhere
+VENUE_INDEX_CHECK_SECONDS = 5
+
+# Days a calendar feed subscription token (booking/ics/token/) stays valid
+CALENDAR_TOKEN_MAX_AGE_DAYS = 180
+
+# How long a booking request waits for another request holding the same
+# venue before giving up with 409, in milliseconds
+BOOKING_LOCK_TIMEOUT_MS = 3000
+
+# Booking holds: default and longest lifetime in minutes, and how many live
+# holds one user may have at a time
+BOOKING_HOLD_TTL_MINUTES = 15
+BOOKING_HOLD_MAX_TTL_MINUTES = 60
+BOOKING_HOLD_MAX_PER_USER = 5
+
+# Widest date range venue/utilization/ reports on in one request, in days
+VENUE_USAGE_MAX_DAYS = 366
+
+# Roles reviewing each stage of the default approval pipeline, used for
+# event types and venues without an ApprovalPipeline of their own
+APPROVAL_DEFAULT_STAGE_ROLES = ["admin", "admin", "admin", "admin"]
+# Seconds a process trusts its cached approval pipelines before checking
+# the database for changes
+APPROVAL_PIPELINE_CHECK_SECONDS = 5
+APPROVAL_QUEUE_PAGE_SIZE = 50
+APPROVAL_QUEUE_MAX_PAGE_SIZE = 200
+# Seconds the per-stage queue counts may be served from the cache
+APPROVAL_QUEUE_COUNT_TTL = 60
+
+# Hours a booking may wait at one approval stage before approvals/sla-breaches/
+# lists it, with per-role overrides, e.g. {"admin": 24}
+APPROVAL_SLA_HOURS = 48
+APPROVAL_SLA_HOURS_BY_ROLE = {}
+# Widest date range approvals/analytics/ reports on in one request, in days
+APPROVAL_ANALYTICS_MAX_DAYS = 366
+
+# Notification outbox: backend delivering the digests (MemoryBackend,
+# EmailBackend or WebhookBackend in api.notification_backends), how many
+# notifications one dispatch batch takes, and retry policy
+NOTIFICATION_BACKEND = "api.notification_backends.EmailBackend"
+NOTIFICATION_WEBHOOK_URL = "http://127.0.0.1:8025/"
+NOTIFICATION_WEBHOOK_TIMEOUT = 5
+NOTIFICATION_BATCH_SIZE = 200
+NOTIFICATION_MAX_ATTEMPTS = 8
+NOTIFICATION_RETRY_BASE_SECONDS = 30
+NOTIFICATION_RETRY_MAX_SECONDS = 3600
+# Seconds a worker holds claimed notifications before others may retry them
+NOTIFICATION_LEASE_SECONDS = 300
+
+# Waiting booking requests a user can have at once
+WAITLIST_MAX_PER_USER = 10
+
+# Page size of list endpoints (see swvista.pagination) unless ?limit= asks
+# for another, and the largest ?limit= honoured
+PAGINATION_PAGE_SIZE = 50
+PAGINATION_MAX_PAGE_SIZE = 500
+
+# Rows the export endpoints (see swvista.streaming) read and serialize at a
+# time while streaming a whole table
+EXPORT_CHUNK_SIZE = 2000
+
+# Serve the hottest list endpoints from .values() rows (see
+# api.values_serializers) rather than DRF serializer instances; the JSON is
+# the same either way
+FAST_LIST_SERIALIZATION = True
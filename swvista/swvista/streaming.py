@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+
+def serialize_in_chunks(queryset, serialize, chunk_size=None):
+    """
+    The dicts serialize(rows) makes of `queryset`, read with
+    queryset.iterator() and serialized a chunk of rows at a time
+    (default EXPORT_CHUNK_SIZE), so only one chunk is in memory at once.
+    Prefetches are run per chunk.
+    """
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    chunk = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield from serialize(chunk)
+            chunk = []
+    if chunk:
+        yield from serialize(chunk)
+
+
+class StreamingJsonResponse(StreamingHttpResponse):
+    """
+    A JSON array of `items` written while they are produced, e.g. from
+    serialize_in_chunks(). The bytes are those JsonResponse(list(items),
+    safe=False) would send, without holding the list.
+    """
+
+    def __init__(self, items, encoder=DjangoJSONEncoder, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(self._json_array(items, encoder()), **kwargs)
+
+    @staticmethod
+    def _json_array(items, encoder):
+        # Items are written in batches to keep the number of writes down
+        parts = ["["]
+        separator = ""
+        for item in items:
+            parts.append(separator)
+            parts.append(encoder.encode(item))
+            separator = ", "
+            if len(parts) >= 2 * settings.EXPORT_CHUNK_SIZE:
+                yield "".join(parts)
+                parts = []
+        parts.append("]")
+        yield "".join(parts)